@@ -1,26 +1,41 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from datetime import datetime
+import json
+import math
 from app.models import (
     JobAnalysisRequest,
     JobAnalysisResponse,
     HealthCheckResponse,
     MultipleWorkerQuotesResponse,
     WorkerQuote,
+    WorkerQuotesRequest,
+    JobSuggestion,
+    MultipleJobSuggestionsResponse,
     ElectricianQuoteRequest,
     ElectricianQuoteResponse,
     ElectricianSearchResponse,
+    ElectricianLookupRequest,
+    ElectricianLookupResponse,
     SavedQuote,
     QuoteUpdateRequest,
     QuoteResponse
 )
 from app.services.ai_service import ai_service
-from app.services.pricing_service import pricing_service
+from app.services.openai_scheduler import PRIORITY_SELF_QUOTE
+from app.services.rule_estimator import rule_estimator
+from app.services.similarity_service import similarity_service
+from app.services.cache_warmer import cache_warmer
+from app.services.geo_service import PRECISION_AREA, geo_service
+from app.services.pricing_service import normalize_electrician_id, pricing_service
 from app.services.quote_service import quote_service
 from app.services.database_service import database_service
+from app.utils.helpers import decode_quote_cursor, encode_quote_cursor
+from app.utils.request_context import bind_request_context
 from app.config import settings
 
-# Create API router
-router = APIRouter()
+# Create API router (every request gets a time budget for its upstream calls)
+router = APIRouter(dependencies=[Depends(bind_request_context)])
 
 @router.get("/", tags=["Root"])
 async def root():
@@ -68,7 +83,7 @@ async def quick_estimate(request: JobAnalysisRequest):
     """
     try:
         # AI analyzes job and estimates time
-        ai_analysis = ai_service.analyze_job_description(
+        ai_analysis = await ai_service.analyze_job_description(
             job_description=request.job_description,
             is_emergency=request.is_emergency
         )
@@ -101,31 +116,48 @@ async def quick_estimate(request: JobAnalysisRequest):
     status_code=status.HTTP_200_OK,
     tags=["Job Analysis"]
 )
-async def get_worker_quotes(request: JobAnalysisRequest):
+async def get_worker_quotes(request: WorkerQuotesRequest):
     """
-    Analyze job and get quotes from all available workers
+    Analyze job and get quotes from available workers, cheapest first, one page at a time
     
     This endpoint:
     1. Uses AI to analyze the job and estimate hours
-    2. Fetches all active workers from the pricing API
-    3. Calculates a quote for each worker
-    4. Returns all quotes sorted by total price (lowest first)
+    2. Gets all active workers from the roster snapshot (only those within radius_miles of postcode, if given)
+    3. Calculates a quote for each worker in one vectorised pass
+    4. Filters by max_price / location and returns the cheapest page
     
     Args:
-        request: Job description, emergency flag, optional email
+        request: Job description, emergency flag, optional email, paging (limit, offset, cursor), filters and postcode/radius
         
     Returns:
-        MultipleWorkerQuotesResponse: Quotes from all workers
+        MultipleWorkerQuotesResponse: One page of quotes, the matching worker count and the next page's cursor
     """
+    try:
+        after = decode_quote_cursor(request.cursor) if request.cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    limit = min(request.limit or settings.worker_quotes_default_limit, settings.worker_quotes_max_limit)
+    located = geo_service.locate(request.postcode) if request.postcode else None
+    if request.postcode and located is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown postcode or location: {request.postcode}"
+        )
+    # A postcode area centroid can be tens of miles from the customer, so no radius cut on it
+    centre = located[0] if located is not None and located[1] != PRECISION_AREA else None
+    if located is not None and centre is None:
+        print(f"📍 {request.postcode} only matched a postcode area - quoting without a radius")
+    
     try:
         # Step 1: AI analyzes job and estimates time
-        ai_analysis = ai_service.analyze_job_description(
+        ai_analysis = await ai_service.analyze_job_description(
             job_description=request.job_description,
             is_emergency=request.is_emergency
         )
         
-        # Step 2: Fetch all active workers
-        workers = await pricing_service.get_all_workers()
+        # Step 2: Get all active workers (roster snapshot with pricing columns)
+        roster = await pricing_service.get_roster()
+        workers = roster.workers
         
         if not workers:
             raise HTTPException(
@@ -133,36 +165,48 @@ async def get_worker_quotes(request: JobAnalysisRequest):
                 detail="No workers available at this time"
             )
         
-        # Step 3: Calculate quote for each worker
-        worker_quotes = []
-        for worker in workers:
-            quote_data = quote_service.calculate_quote_for_worker(
-                worker=worker,
-                estimatedHours=ai_analysis["estimatedHours"],
-                is_emergency=request.is_emergency
-            )
-            
-            worker_quote = WorkerQuote(
-                electricianId=quote_data["electricianId"],
-                workerName=quote_data["workerName"],
-                workerEmail=quote_data["workerEmail"],
-                workerLocation=quote_data["workerLocation"],
-                workerDescription=quote_data["workerDescription"],
-                estimatedHours=quote_data["estimatedHours"],
-                hourlyRate=quote_data["hourlyRate"],
-                callOutFee=quote_data["callOutFee"],
-                labourCost=quote_data["labourCost"],
-                emergencyUplift=quote_data["emergencyUplift"],
-                minimumCharge=quote_data["minimumCharge"],
-                totalQuote=quote_data["totalQuote"],
+        # Step 3: Narrow to workers near the customer, if a postcode was given
+        # (workers whose location can't be placed are kept, without a distance)
+        columns, rows, distances = roster.columns, None, None
+        if centre is not None:
+            radius = request.radius_miles or settings.worker_quotes_default_radius_miles
+            rows, distances = roster.geo_index.within(*centre, radius, include_unlocated=True)
+            columns = roster.columns.subset(rows)
+        
+        # Step 4: Calculate quotes for those workers in one vectorised pass
+        quotes = quote_service.calculate_quotes_bulk(
+            columns=columns,
+            estimatedHours=ai_analysis["estimatedHours"],
+            is_emergency=request.is_emergency
+        )
+        
+        # Step 5: Select the cheapest matching page (lowest first), then build quotes for it only
+        page, matched, has_more = quote_service.select_cheapest(
+            quotes=quotes,
+            columns=columns,
+            limit=limit,
+            offset=request.offset,
+            max_price=request.max_price,
+            location=request.location,
+            after=after
+        )
+        worker_rows = rows[page].tolist() if rows is not None else page
+        worker_quotes = [
+            WorkerQuote(
+                electricianId=workers[i].electricianId,
+                workerName=workers[i].name,
+                workerEmail=workers[i].email,
+                workerLocation=workers[i].location,
+                workerDescription=workers[i].description,
+                **row,
+                distanceMiles=round(float(distances[j]), 1) if distances is not None and not math.isnan(distances[j]) else None,
                 jobComplexity=ai_analysis["jobComplexity"],
                 matchScore=85.0,
                 recommendedActions=ai_analysis["recommendedActions"]
             )
-            worker_quotes.append(worker_quote)
-        
-        # Step 4: Sort by total price (lowest first)
-        worker_quotes.sort(key=lambda x: x.totalQuote)
+            for i, j, row in zip(worker_rows, page, quotes.rows(page))
+        ]
+        last = worker_quotes[-1] if worker_quotes else None
         
         # Build response
         response = MultipleWorkerQuotesResponse(
@@ -174,7 +218,9 @@ async def get_worker_quotes(request: JobAnalysisRequest):
             aiReasoning=ai_analysis["reasoning"],
             customer_email=request.customer_email,
             worker_quotes=worker_quotes,
-            totalWorkers=len(worker_quotes)
+            totalWorkers=matched,
+            nextCursor=encode_quote_cursor(last.totalQuote, last.electricianId) if has_more and last else None,
+            rosterStale=roster.is_stale()
         )
         
         return response
@@ -188,6 +234,77 @@ async def get_worker_quotes(request: JobAnalysisRequest):
             detail=f"Failed to generate worker quotes: {str(e)}"
         )
 
+def _sse_event(event: str, data: str) -> str:
+    """Format a single server-sent event"""
+    return f"event: {event}\ndata: {data}\n\n"
+
+@router.post(
+    "/api/v1/job-suggestions/stream",
+    status_code=status.HTTP_200_OK,
+    tags=["Job Analysis"]
+)
+async def stream_job_suggestions(request: JobAnalysisRequest):
+    """
+    Stream multiple job interpretations as server-sent events
+    
+    Each suggestion is priced with the default rates and sent as a
+    `suggestion` event (JobSuggestion) as soon as the model has finished it.
+    A final `done` event carries the full MultipleJobSuggestionsResponse,
+    sorted by confidence. Errors are reported as an `error` event.
+    
+    Args:
+        request: Job description, emergency flag, optional email
+        
+    Returns:
+        StreamingResponse: text/event-stream of suggestion events
+    """
+    async def event_stream():
+        suggestions = []
+        try:
+            async for suggestion in ai_service.stream_job_suggestions(
+                job_description=request.job_description,
+                is_emergency=request.is_emergency
+            ):
+                breakdown = quote_service.calculate_quote(
+                    estimatedHours=suggestion["estimatedHours"],
+                    is_emergency=request.is_emergency
+                )
+                job_suggestion = JobSuggestion(
+                    job_title=suggestion["job_title"],
+                    job_description=suggestion["refined_description"],
+                    estimatedHours=suggestion["estimatedHours"],
+                    calculated_price=breakdown.totalQuote,
+                    callOutFee=breakdown.callOutFee,
+                    labourCost=breakdown.labourCost,
+                    emergencyUplift=breakdown.emergencyUplift,
+                    jobComplexity=suggestion["jobComplexity"],
+                    confidence_score=suggestion["confidence_score"],
+                    match_reason=suggestion["match_reason"],
+                    recommendedActions=suggestion["recommendedActions"]
+                )
+                suggestions.append(job_suggestion)
+                yield _sse_event("suggestion", job_suggestion.model_dump_json())
+            
+            suggestions.sort(key=lambda x: x.confidence_score, reverse=True)
+            response = MultipleJobSuggestionsResponse(
+                original_description=request.job_description,
+                priority="emergency" if request.is_emergency else "standard",
+                currency="GBP",
+                suggestions=suggestions,
+                total_suggestions=len(suggestions)
+            )
+            yield _sse_event("done", response.model_dump_json())
+            
+        except Exception as e:
+            print(f"Error in stream_job_suggestions: {str(e)}")
+            yield _sse_event("error", json.dumps({"detail": f"Failed to generate suggestions: {str(e)}"}))
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/api/v1/pricing-info", tags=["Information"])
 async def get_pricing_info():
     """Get current pricing information (for reference only)"""
@@ -198,6 +315,27 @@ async def get_pricing_info():
         "currency": "GBP"
     }
 
+@router.get("/api/v1/metrics", tags=["Information"])
+async def get_metrics():
+    """Get runtime metrics for the estimate cache, AI request handling and worker roster"""
+    return {
+        "estimateCache": ai_service.get_cache_stats(),
+        "cacheWarmup": cache_warmer.stats(),
+        "singleFlight": ai_service.get_single_flight_stats(),
+        "batching": ai_service.get_batching_stats(),
+        "modelRouting": ai_service.get_routing_stats(),
+        "circuitBreaker": ai_service.get_circuit_breaker_stats(),
+        "openaiQueue": ai_service.get_scheduler_stats(),
+        "llmUsage": ai_service.get_llm_usage_stats(),
+        "ruleEstimator": {
+            "enabled": settings.rule_fast_path_enabled,
+            "threshold": settings.rule_fast_path_threshold,
+            **rule_estimator.stats()
+        },
+        "similarity": similarity_service.stats(),
+        "roster": pricing_service.stats()
+    }
+
 @router.get("/api/v1/debug/worker/{electrician_id}", tags=["Debug"])
 async def debug_worker_raw(electrician_id: str):
     """Debug: show raw API response for a worker to check field names"""
@@ -251,7 +389,7 @@ async def get_all_workers():
 async def search_electrician(electrician_id: str):
     """
     Search for an electrician by their ID.
-    Fetches data directly from the pricing API.
+    Served from the roster snapshot while it is fresh, otherwise fetched from the pricing API.
     """
     raw = await pricing_service.get_raw_worker_by_id(electrician_id)
     if not raw:
@@ -260,8 +398,39 @@ async def search_electrician(electrician_id: str):
             detail=f"Electrician with ID '{electrician_id}' not found"
         )
     
+    return _electrician_search_response(raw, electrician_id)
+
+
+@router.post(
+    "/api/v1/electricians/lookup",
+    response_model=ElectricianLookupResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["Electrician"]
+)
+async def lookup_electricians(request: ElectricianLookupRequest):
+    """
+    Look up many electricians by ID in one call.
+    IDs in the roster snapshot are answered from it; the rest are fetched from the
+    pricing API concurrently (bounded by PRICING_API_LOOKUP_CONCURRENCY).
+    
+    Args:
+        request: Electrician IDs (up to 500)
+        
+    Returns:
+        ElectricianLookupResponse: Electricians found, plus the IDs not found and the IDs whose fetch failed
+    """
+    found, missing, failed = await pricing_service.get_raw_workers_by_ids(request.electricianIds)
+    return ElectricianLookupResponse(
+        electricians=[_electrician_search_response(raw, electrician_id) for electrician_id, raw in found.items()],
+        missing=missing,
+        failed=failed
+    )
+
+
+def _electrician_search_response(raw: dict, electrician_id: str) -> ElectricianSearchResponse:
+    """Map a raw pricing API worker record onto the electrician search response"""
     return ElectricianSearchResponse(
-        electricianId=str(raw.get("electricianId", electrician_id)),
+        electricianId=normalize_electrician_id(raw.get("electricianId", electrician_id)),
         name=raw.get("name", ""),
         email=raw.get("email", ""),
         location=raw.get("location", ""),
@@ -286,7 +455,7 @@ async def electrician_self_quote(electrician_id: str, request: ElectricianQuoteR
     Generate a quote for a specific electrician based on a job description.
     The electrician provides a description and gets back a full quote breakdown.
     
-    - Fetches the electrician's rates from the pricing API
+    - Looks up the electrician's rates (roster snapshot, or the pricing API if it is stale)
     - Uses AI to estimate hours and complexity
     - Calculates the full quote using the electrician's own rates
     """
@@ -298,10 +467,11 @@ async def electrician_self_quote(electrician_id: str, request: ElectricianQuoteR
             detail=f"Electrician with ID '{electrician_id}' not found"
         )
     
-    # AI analysis
-    ai_analysis = ai_service.analyze_job_description(
+    # AI analysis (queued ahead of customer browsing traffic)
+    ai_analysis = await ai_service.analyze_job_description(
         job_description=request.job_description,
-        is_emergency=request.is_emergency
+        is_emergency=request.is_emergency,
+        priority=PRIORITY_SELF_QUOTE
     )
     
     # Calculate quote using electrician's own rates
@@ -648,4 +818,3 @@ async def delete_quote_endpoint(quote_id: str):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete quote: {str(e)}"
         )
-    )
\ No newline at end of file
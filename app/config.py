@@ -11,11 +11,72 @@ class Settings(BaseSettings):
     # OpenAI Configuration
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     openai_model: str = "gpt-4o-mini"  # Cost-effective model
+    openai_fast_model: str = os.getenv("OPENAI_FAST_MODEL", "gpt-4o-mini")  # Simple jobs
+    openai_large_model: str = os.getenv("OPENAI_LARGE_MODEL", "gpt-4o")  # Complex or ambiguous jobs
+    openai_max_concurrency: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", 32))  # Max in-flight OpenAI calls per worker
+    openai_requests_per_minute: int = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", 500))  # Account RPM limit
+    openai_tokens_per_minute: int = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", 200000))  # Account TPM limit
+    openai_queue_max_wait_seconds: float = float(os.getenv("OPENAI_QUEUE_MAX_WAIT_SECONDS", 5))  # Longer waits fall back early
+    openai_rate_limit_pause_seconds: float = float(os.getenv("OPENAI_RATE_LIMIT_PAUSE_SECONDS", 10))  # Pause when no retry-after given
+    openai_timeout_seconds: float = float(os.getenv("OPENAI_TIMEOUT_SECONDS", 20))  # Upper bound per OpenAI call
+    openai_min_timeout_seconds: float = float(os.getenv("OPENAI_MIN_TIMEOUT_SECONDS", 2))  # Below this, skip the call
+    openai_timeout_p99_multiplier: float = float(os.getenv("OPENAI_TIMEOUT_P99_MULTIPLIER", 3))  # Timeout = p99 latency x this
+    openai_max_retries: int = int(os.getenv("OPENAI_MAX_RETRIES", 1))
+    request_budget_seconds: float = float(os.getenv("REQUEST_BUDGET_SECONDS", 25))  # Total time budget per API request
+    
+    # OpenAI Circuit Breaker Configuration
+    breaker_failure_rate_threshold: float = float(os.getenv("BREAKER_FAILURE_RATE_THRESHOLD", 0.5))  # Error rate (0-1) that opens the breaker
+    breaker_latency_threshold_seconds: float = float(os.getenv("BREAKER_LATENCY_THRESHOLD_SECONDS", 10))  # p95 latency that opens the breaker
+    breaker_window_seconds: float = float(os.getenv("BREAKER_WINDOW_SECONDS", 60))
+    breaker_min_calls: int = int(os.getenv("BREAKER_MIN_CALLS", 10))  # Calls in the window before the breaker can trip
+    breaker_open_seconds: float = float(os.getenv("BREAKER_OPEN_SECONDS", 30))  # Cool-down before half-open probes
+    breaker_half_open_max_calls: int = int(os.getenv("BREAKER_HALF_OPEN_MAX_CALLS", 3))
+    
+    # Estimate Cache Configuration
+    estimate_cache_max_entries: int = int(os.getenv("ESTIMATE_CACHE_MAX_ENTRIES", 10000))
+    estimate_cache_max_bytes: int = int(os.getenv("ESTIMATE_CACHE_MAX_BYTES", 16 * 1024 * 1024))  # 16 MB
+    estimate_cache_ttl_seconds: int = int(os.getenv("ESTIMATE_CACHE_TTL_SECONDS", 86400))  # 24 hours
+    # Shared second-level cache: "none", "mongodb" or "sqlite"
+    estimate_cache_backend: str = os.getenv("ESTIMATE_CACHE_BACKEND", "none")
+    estimate_cache_l2_ttl_seconds: int = int(os.getenv("ESTIMATE_CACHE_L2_TTL_SECONDS", 604800))  # 7 days
+    estimate_cache_sqlite_path: str = os.getenv("ESTIMATE_CACHE_SQLITE_PATH", "estimate_cache.sqlite3")
+    
+    # Estimate Cache Warm-up Configuration
+    cache_warmup_enabled: bool = os.getenv("CACHE_WARMUP_ENABLED", "True").lower() == "true"
+    cache_warmup_top_n: int = int(os.getenv("CACHE_WARMUP_TOP_N", 500))  # Most frequent descriptions to pre-estimate
+    cache_warmup_rate_per_minute: int = int(os.getenv("CACHE_WARMUP_RATE_PER_MINUTE", 30))  # Max warm-up OpenAI calls per minute
+    
+    # Estimate Micro-batching Configuration
+    estimate_batching_enabled: bool = os.getenv("ESTIMATE_BATCHING_ENABLED", "False").lower() == "true"
+    estimate_batch_max_size: int = int(os.getenv("ESTIMATE_BATCH_MAX_SIZE", 8))
+    estimate_batch_window_ms: int = int(os.getenv("ESTIMATE_BATCH_WINDOW_MS", 30))
+    # What to do with jobs a batch could not answer: "individual" (re-send alone) or "local" (benchmark fallback)
+    estimate_batch_fallback: str = os.getenv("ESTIMATE_BATCH_FALLBACK", "individual")
+    
+    # Local Rule Estimator Configuration
+    rule_fast_path_enabled: bool = os.getenv("RULE_FAST_PATH_ENABLED", "True").lower() == "true"
+    rule_fast_path_threshold: float = float(os.getenv("RULE_FAST_PATH_THRESHOLD", 0.9))  # Min confidence (0-1) to skip OpenAI
+    
+    # Model Routing Configuration
+    routing_enabled: bool = os.getenv("ROUTING_ENABLED", "True").lower() == "true"
+    routing_large_min_words: int = int(os.getenv("ROUTING_LARGE_MIN_WORDS", 30))  # Longer descriptions use the large model
+    routing_large_min_quantity: int = int(os.getenv("ROUTING_LARGE_MIN_QUANTITY", 20))
+    routing_ambiguous_confidence: float = float(os.getenv("ROUTING_AMBIGUOUS_CONFIDENCE", 0.2))  # At or below, matched jobs are ambiguous
+    
+    # Similar Past Quotes Estimator Configuration
+    similarity_enabled: bool = os.getenv("SIMILARITY_ENABLED", "True").lower() == "true"
+    similarity_threshold: float = float(os.getenv("SIMILARITY_THRESHOLD", 0.85))  # Min cosine similarity for a neighbour
+    similarity_top_k: int = int(os.getenv("SIMILARITY_TOP_K", 5))
+    similarity_min_quotes: int = int(os.getenv("SIMILARITY_MIN_QUOTES", 3))  # Accepted quotes needed among close neighbours
+    similarity_dimensions: int = int(os.getenv("SIMILARITY_DIMENSIONS", 256))  # Hashed feature vector width
+    similarity_refresh_seconds: int = int(os.getenv("SIMILARITY_REFRESH_SECONDS", 300))  # Incremental refresh interval
+    similarity_rebuild_seconds: int = int(os.getenv("SIMILARITY_REBUILD_SECONDS", 86400))  # Full rebuild interval
     
     # Application Configuration
     app_name: str = "WireQuote AI Backend"
     app_version: str = "1.0.0"
     debug: bool = os.getenv("DEBUG", "True").lower() == "true"
+    log_level: str = os.getenv("LOG_LEVEL", "INFO").upper()  # DEBUG enables per-worker roster logging
     
     # Server Configuration
     host: str = os.getenv("HOST", "0.0.0.0")
@@ -43,6 +104,29 @@ class Settings(BaseSettings):
         "https://api.wirequote.co.uk/api/pricing/all"
     )
     pricing_api_timeout: int = int(os.getenv("PRICING_API_TIMEOUT", 10))
+    # Shared connection pool and retries for pricing API calls
+    pricing_api_max_connections: int = int(os.getenv("PRICING_API_MAX_CONNECTIONS", 20))
+    pricing_api_max_keepalive_connections: int = int(os.getenv("PRICING_API_MAX_KEEPALIVE_CONNECTIONS", 20))
+    pricing_api_keepalive_seconds: float = float(os.getenv("PRICING_API_KEEPALIVE_SECONDS", 30))
+    pricing_api_http2: bool = os.getenv("PRICING_API_HTTP2", "False").lower() == "true"
+    pricing_api_max_retries: int = int(os.getenv("PRICING_API_MAX_RETRIES", 2))
+    pricing_api_retry_backoff_seconds: float = float(os.getenv("PRICING_API_RETRY_BACKOFF_SECONDS", 0.2))
+    pricing_api_lookup_concurrency: int = int(os.getenv("PRICING_API_LOOKUP_CONCURRENCY", 10))  # Parallel single-worker fetches per bulk lookup
+    
+    # Worker roster snapshot (served from memory, refreshed in the background once older than the TTL)
+    roster_cache_enabled: bool = os.getenv("ROSTER_CACHE_ENABLED", "True").lower() == "true"
+    roster_ttl_seconds: int = int(os.getenv("ROSTER_TTL_SECONDS", 60))
+    # Incremental refreshes via the pricing API's updatedSince filter, with a full resync every N seconds
+    roster_delta_sync_enabled: bool = os.getenv("ROSTER_DELTA_SYNC_ENABLED", "False").lower() == "true"
+    roster_full_sync_seconds: int = int(os.getenv("ROSTER_FULL_SYNC_SECONDS", 3600))
+    # Last good roster persisted on disk, loaded at startup and served (flagged stale) until the pricing API answers
+    roster_snapshot_path: str = os.getenv("ROSTER_SNAPSHOT_PATH", "roster_snapshot.json.gz")  # Empty disables
+    roster_snapshot_max_age_seconds: int = int(os.getenv("ROSTER_SNAPSHOT_MAX_AGE_SECONDS", 604800))  # 7 days; older files are ignored
+    
+    # Worker quotes paging (/api/v1/worker-quotes)
+    worker_quotes_default_limit: int = int(os.getenv("WORKER_QUOTES_DEFAULT_LIMIT", 50))  # Quotes per page when no limit is given
+    worker_quotes_max_limit: int = int(os.getenv("WORKER_QUOTES_MAX_LIMIT", 500))  # Larger limits are capped to this
+    worker_quotes_default_radius_miles: float = float(os.getenv("WORKER_QUOTES_DEFAULT_RADIUS_MILES", 25))  # Used when a postcode comes without a radius
     
     # MongoDB Configuration
     mongodb_url: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
@@ -1,9 +1,16 @@
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.config import settings
 from app.api.routes import router
 from app.services.database_service import database_service
+from app.services.similarity_service import similarity_service
+from app.services.cache_warmer import cache_warmer
+from app.services.pricing_service import pricing_service
+
+# Debug-level service logging (e.g. per-worker roster parsing) is opt-in via LOG_LEVEL
+logging.basicConfig(level=settings.log_level, format="%(levelname)s %(name)s: %(message)s")
 
 # Create FastAPI application
 app = FastAPI(
@@ -55,12 +62,27 @@ async def startup_event():
     except Exception as e:
         print(f"⚠️ Database connection failed: {str(e)}")
         print("   Running in degraded mode - quote persistence unavailable")
+    
+    # Open the pooled pricing API client, serve the last good roster from disk, then load it upstream and keep it fresh
+    pricing_service.open_client()
+    await pricing_service.load_snapshot()
+    pricing_service.start()
+    
+    # Build the similar-past-quotes index in the background
+    similarity_service.start()
+    
+    # Pre-estimate the most frequently quoted jobs at a bounded rate
+    cache_warmer.start()
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
     print(f"🛑 {settings.app_name} shutting down...")
+    await cache_warmer.stop()
+    await similarity_service.stop()
+    await pricing_service.stop()
+    await pricing_service.close_client()
     await database_service.disconnect()
 
 if __name__ == "__main__":
@@ -1,7 +1,13 @@
-from pydantic import BaseModel, Field
-from typing import Literal, Optional, List
+from pydantic import BaseModel, Field, StringConstraints
+from typing import Annotated, Literal, Optional, List
 from datetime import datetime
 
+# electricianIds are interpolated into pricing API URLs, so only plain id characters are allowed.
+# pydantic's regex engine anchors "$" at the very end; Python code must use fullmatch,
+# since re's "$" also matches before a trailing newline.
+ELECTRICIAN_ID_PATTERN = r"^[A-Za-z0-9_-]+$"
+ElectricianId = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=64, pattern=ELECTRICIAN_ID_PATTERN)]
+
 class WorkerDetails(BaseModel):
     """Worker/Electrician details"""
     electricianId: str
@@ -30,6 +36,41 @@ class JobAnalysisRequest(BaseModel):
         description="Customer email address (optional)"
     )
 
+class WorkerQuotesRequest(JobAnalysisRequest):
+    """Request model for worker quotes, with paging and filters"""
+    limit: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Quotes per page (default and upper bound set by the server)"
+    )
+    offset: int = Field(
+        default=0,
+        ge=0,
+        description="Matching quotes to skip (counted from the cursor, if given)"
+    )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="nextCursor from the previous page"
+    )
+    max_price: Optional[float] = Field(
+        default=None,
+        ge=0,
+        description="Only quotes with a total at or below this (GBP)"
+    )
+    location: Optional[str] = Field(
+        default=None,
+        description="Only workers whose location contains this text"
+    )
+    postcode: Optional[str] = Field(
+        default=None,
+        description="Customer postcode (full or outward code) or town; workers placed further than radius_miles from it are left out (no radius for postcode-area-only matches)"
+    )
+    radius_miles: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Search radius around postcode (default set by the server)"
+    )
+
 class WorkerQuote(BaseModel):
     """Quote from a specific worker"""
     electricianId: str
@@ -45,6 +86,7 @@ class WorkerQuote(BaseModel):
     emergencyUplift: Optional[float] = None
     minimumCharge: float = 0.0
     totalQuote: float
+    distanceMiles: Optional[float] = None  # From the customer's postcode, when both locations could be placed
     
     jobComplexity: Literal["simple", "moderate", "complex"]
     matchScore: float = Field(
@@ -70,9 +112,20 @@ class MultipleWorkerQuotesResponse(BaseModel):
     
     worker_quotes: List[WorkerQuote] = Field(
         ...,
-        description="List of worker quotes sorted by total price (lowest first)"
+        description="One page of worker quotes sorted by total price (lowest first)"
+    )
+    totalWorkers: int = Field(
+        ...,
+        description="Workers matching the filters, across all pages"
+    )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as cursor to get the next page (None on the last page)"
+    )
+    rosterStale: bool = Field(
+        default=False,
+        description="Worker rates may be out of date (pricing API not reachable; last good roster served)"
     )
-    totalWorkers: int
 
 class JobSuggestion(BaseModel):
     """Individual job suggestion with confidence score"""
@@ -225,6 +278,32 @@ class ElectricianSearchResponse(BaseModel):
     isActive: bool = False
 
 
+class ElectricianLookupRequest(BaseModel):
+    """Request for details of many electricians at once"""
+    electricianIds: List[ElectricianId] = Field(
+        ...,
+        min_length=1,
+        max_length=500,
+        description="Electrician IDs to look up"
+    )
+
+
+class ElectricianLookupResponse(BaseModel):
+    """Response for a bulk electrician lookup"""
+    electricians: List[ElectricianSearchResponse] = Field(
+        default_factory=list,
+        description="Electricians found, in request order"
+    )
+    missing: List[str] = Field(
+        default_factory=list,
+        description="IDs the pricing API does not know"
+    )
+    failed: List[str] = Field(
+        default_factory=list,
+        description="IDs that could not be fetched (pricing API error); worth retrying"
+    )
+
+
 class SavedQuote(BaseModel):
     """Quote saved to database"""
     id: Optional[str] = None  # MongoDB _id
@@ -1,33 +1,35 @@
+import asyncio
 import json
 import hashlib
-from openai import OpenAI, AuthenticationError, RateLimitError, APIConnectionError, APITimeoutError
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import time
+from openai import AsyncOpenAI, AuthenticationError, RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
 from app.config import settings
-
-class AIService:
-    """Service for AI-powered job analysis using OpenAI"""
-    
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.openai_api_key)
-        self.model = settings.openai_model
-        self._estimate_cache: dict = {}  # Cache for consistent time estimates
-    
-    def analyze_job_with_multiple_suggestions(
-        self, 
-        job_description: str, 
-        is_emergency: bool = False
-    ) -> dict:
-        """
-        Analyze job and return multiple possible interpretations/suggestions
-        
-        Args:
-            job_description: The electrical work description
-            is_emergency: Whether this is an emergency job
-            
-        Returns:
-            dict: Multiple job suggestions with confidence scores
-        """
-        
-        system_prompt = """You are an expert electrical contractor with 20+ years of experience in the UK.
+from app.services.cache_service import EstimateCacheService, cache_service
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.estimate_batcher import EstimateBatcher
+from app.services.llm_usage import llm_usage_tracker, usage_tokens
+from app.services.openai_scheduler import (
+    OpenAIScheduler,
+    QueueDeadlineExceeded,
+    PRIORITY_BACKGROUND,
+    PRIORITY_EMERGENCY,
+    PRIORITY_MULTI_SUGGESTION,
+    PRIORITY_STANDARD,
+    current_priority,
+    openai_priority
+)
+from app.services.rule_estimator import rule_estimator
+from app.services.model_router import TIER_LOCAL, model_router
+from app.services.similarity_service import similarity_service
+from app.utils.helpers import normalize_job_description
+from app.utils.json_stream import JSONArrayStreamParser
+from app.utils.request_context import RequestBudgetExceeded, current_endpoint, remaining_request_budget
+
+# Bump to invalidate every cached estimate (e.g. when validation rules change)
+CACHE_KEY_VERSION = "v2"
+
+SUGGESTIONS_SYSTEM_PROMPT = """You are an expert electrical contractor with 20+ years of experience in the UK.
 Analyze the job description and provide MULTIPLE possible interpretations, from most likely to least likely.
 
 For each interpretation, provide:
@@ -61,56 +63,199 @@ Return as JSON:
 
 Provide 2-4 suggestions, sorted by confidence (highest first)."""
 
-        user_prompt = f"""Analyze this electrical job and provide multiple interpretations:
+ESTIMATE_SYSTEM_PROMPT = """You are an expert electrical contractor with 20+ years of experience in the UK.
+Your job is to analyze electrical work descriptions and provide accurate time estimates for the ACTUAL WORK only.
+The call-out fee is charged separately — do NOT include travel or call-out time in estimatedHours.
+
+IMPORTANT: estimatedHours means hands-on work time only. The billing system adds the call-out fee on top automatically.
 
-Job Description: {job_description}
-Emergency Job: {"Yes" if is_emergency else "No"}
+Use these UK electrician benchmarks as your reference:
 
-Provide 2-4 different interpretations sorted by confidence."""
+SIMPLE jobs (0.5 – 2 hours):
+- Replace 1 socket or switch: 0.5h
+- Replace 2–4 sockets or switches: 1h
+- Replace 5–8 sockets or switches: 1.5–2h
+- Replace a single light fitting: 0.5h
+- Replace 2–4 light fittings: 1–1.5h
+- Install 1–2 LED downlights: 1h
+- Fix a tripped breaker / reset fuse: 0.5h
+- Replace a single outdoor light: 1h
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.4,
-                max_tokens=1500,
-                response_format={"type": "json_object"}
+MODERATE jobs (2 – 6 hours):
+- Install 5–10 LED downlights: 2–3h
+- Install 10–20 LED downlights: 3–5h
+- Replace multiple sockets in one room (8–12): 2–3h
+- Install a new circuit (single room): 3–4h
+- Fault finding and repair (unknown fault): 2–4h
+- Install outdoor socket or garden lighting: 2–3h
+- Install EV charger (standard): 3–4h
+- Replace bathroom extractor fan: 1.5–2h
+- Install security lighting (2–3 lights): 2–3h
+
+COMPLEX jobs (6+ hours):
+- Replace consumer unit / fuse board: 6–8h
+- Rewire a single room: 4–6h
+- Rewire a 1-bed flat: 10–14h
+- Rewire a 2-bed house: 14–18h
+- Rewire a 3-bed house: 20–28h
+- Rewire a 4-bed house: 28–36h
+- Install new distribution board: 6–8h
+- Full electrical inspection (EICR) 1-bed: 3–4h
+- Full electrical inspection (EICR) 3-bed: 5–7h
+- Install solar panel system: 8–12h
+
+QUANTITY RULES — always scale by quantity mentioned:
+- If description says "a socket" or "one socket" → treat as 1 item
+- If description says "sockets" without a number → assume 4–6 items
+- If description says "throughout the house" or "whole house" → treat as complex full-scope
+- If description says "a few" → assume 3–4 items
+- If description says "several" → assume 5–7 items
+
+Return your analysis as a JSON object with this exact structure:
+{
+    "estimatedHours": <float between 0.5 and 100>,
+    "jobComplexity": "<simple|moderate|complex>",
+    "reasoning": "<brief explanation referencing the specific benchmark used>",
+    "recommendedActions": ["<action1>", "<action2>"]
+}
+
+Rules:
+- Always pick the closest benchmark and scale by quantity
+- Never estimate below 0.5h
+- For vague descriptions with no quantity, use the mid-range of the relevant benchmark
+- Emergency flag does NOT change the hours — it only affects pricing, which is handled separately"""
+
+ESTIMATE_BATCH_SYSTEM_PROMPT = ESTIMATE_SYSTEM_PROMPT + """
+
+BATCH MODE — you will be given several numbered jobs. Estimate each one independently
+using the rules above and return a single JSON object with this exact structure:
+{
+    "estimates": [
+        {
+            "index": <job number as given>,
+            "estimatedHours": <float between 0.5 and 100>,
+            "jobComplexity": "<simple|moderate|complex>",
+            "reasoning": "<brief explanation referencing the specific benchmark used>",
+            "recommendedActions": ["<action1>", "<action2>"]
+        }
+    ]
+}
+Return exactly one entry per job."""
+
+class AIService:
+    """Service for AI-powered job analysis using OpenAI"""
+    
+    def __init__(self, client: Optional[AsyncOpenAI] = None, cache: Optional[EstimateCacheService] = None):
+        """
+        Args:
+            client: OpenAI client to use (defaults to one built from settings)
+            cache: Estimate cache to use (defaults to the shared cache service)
+        """
+        self.client = client or AsyncOpenAI(api_key=settings.openai_api_key, max_retries=settings.openai_max_retries)
+        self.model = settings.openai_model
+        # Fails fast to the local estimator while OpenAI is erroring or slow
+        self._breaker = CircuitBreaker(
+            "openai",
+            failure_rate_threshold=settings.breaker_failure_rate_threshold,
+            latency_threshold_seconds=settings.breaker_latency_threshold_seconds,
+            window_seconds=settings.breaker_window_seconds,
+            min_calls=settings.breaker_min_calls,
+            open_seconds=settings.breaker_open_seconds,
+            half_open_max_calls=settings.breaker_half_open_max_calls
+        )
+        # Two-level (in-process + shared) cache for consistent time estimates and suggestions
+        self._estimate_cache = cache if cache is not None else cache_service
+        # Priority queue admitting OpenAI calls within concurrency, RPM and TPM limits
+        self._scheduler = OpenAIScheduler(
+            requests_per_minute=settings.openai_requests_per_minute,
+            tokens_per_minute=settings.openai_tokens_per_minute,
+            max_concurrency=settings.openai_max_concurrency
+        )
+        # In-flight OpenAI requests by cache key, for coalescing identical concurrent requests
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.coalesced_requests = 0
+        # Optional micro-batching of estimate requests into multi-job completions
+        self._estimate_batcher: Optional[EstimateBatcher] = None
+        if settings.estimate_batching_enabled:
+            self._estimate_batcher = EstimateBatcher(
+                send_batch=self._call_estimate_batch,
+                send_single=self._call_estimate,
+                max_batch_size=settings.estimate_batch_max_size,
+                window_ms=settings.estimate_batch_window_ms,
+                fallback=settings.estimate_batch_fallback
             )
+    
+    async def analyze_job_with_multiple_suggestions(
+        self, 
+        job_description: str, 
+        is_emergency: bool = False
+    ) -> dict:
+        """
+        Analyze job and return multiple possible interpretations/suggestions
+        
+        Args:
+            job_description: The electrical work description
+            is_emergency: Whether this is an emergency job
+            
+        Returns:
+            dict: Multiple job suggestions with confidence scores
+        """
+        cache_key = self._build_cache_key("suggestions", SUGGESTIONS_SYSTEM_PROMPT, job_description, is_emergency)
+        cached = await self._estimate_cache.get(cache_key)
+        if cached is not None:
+            print(f"✅ Returning cached suggestions for job (key: {cache_key[12:20]}...)")
+            return cached
+        
+        # Concurrent callers with the same key share one OpenAI call
+        return await self._single_flight(
+            cache_key,
+            lambda: self._request_suggestions(job_description, is_emergency, cache_key)
+        )
+    
+    async def _request_suggestions(self, job_description: str, is_emergency: bool, cache_key: str) -> dict:
+        """Call OpenAI for job suggestions and cache the validated result"""
+        messages = [
+            {"role": "system", "content": SUGGESTIONS_SYSTEM_PROMPT},
+            {"role": "user", "content": self._build_suggestions_prompt(job_description, is_emergency)}
+        ]
+        priority = PRIORITY_EMERGENCY if is_emergency else PRIORITY_MULTI_SUGGESTION
+
+        try:
+            async with self._openai_slot(priority, messages, max_tokens=1500) as slot:
+                response = await self._create_completion(
+                    slot,
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.4,
+                    max_tokens=1500,
+                    response_format={"type": "json_object"}
+                )
             
             analysis = json.loads(response.choices[0].message.content)
             suggestions = analysis.get("suggestions", [])
             
             # Validate and sanitize suggestions
-            validated_suggestions = []
-            for suggestion in suggestions[:4]:  # Max 4 suggestions
-                hours = float(suggestion.get("estimatedHours", 2.0))
-                hours = max(0.5, min(100.0, hours))
-                
-                complexity = suggestion.get("jobComplexity", "moderate")
-                if complexity not in ["simple", "moderate", "complex"]:
-                    complexity = "moderate"
-                
-                confidence = float(suggestion.get("confidence_score", 80))
-                confidence = max(0, min(100, confidence))
-                
-                validated_suggestions.append({
-                    "job_title": suggestion.get("job_title", "Electrical Work"),
-                    "refined_description": suggestion.get("refined_description", job_description),
-                    "estimatedHours": round(hours, 1),
-                    "jobComplexity": complexity,
-                    "confidence_score": round(confidence, 1),
-                    "match_reason": suggestion.get("match_reason", "Based on job description"),
-                    "recommendedActions": suggestion.get("recommendedActions", [])[:4]
-                })
+            validated_suggestions = [
+                self._validate_suggestion(suggestion, job_description)
+                for suggestion in suggestions[:4]  # Max 4 suggestions
+            ]
             
             # Sort by confidence (highest first)
             validated_suggestions.sort(key=lambda x: x["confidence_score"], reverse=True)
             
-            return {"suggestions": validated_suggestions}
+            result = {"suggestions": validated_suggestions}
+            await self._estimate_cache.set(cache_key, result)
+            return result
             
+        except CircuitOpenError:
+            print("🔌 OpenAI circuit open - using local suggestions")
+            return self._get_fallback_suggestions(job_description, is_emergency)
+        except RequestBudgetExceeded as e:
+            print(f"⏱️ Request budget exhausted before OpenAI call: {str(e)}")
+            return self._get_fallback_suggestions(job_description, is_emergency)
+        except QueueDeadlineExceeded as e:
+            print(f"🚦 OpenAI queue too long - {str(e)}")
+            return self._get_fallback_suggestions(job_description, is_emergency)
         except AuthenticationError as e:
             print(f"❌ OpenAI Authentication Error - Invalid API key: {str(e)}")
             return self._get_fallback_suggestions(job_description, is_emergency)
@@ -127,6 +272,110 @@ Provide 2-4 different interpretations sorted by confidence."""
             print(f"❌ OpenAI Unexpected Error ({type(e).__name__}): {str(e)}")
             return self._get_fallback_suggestions(job_description, is_emergency)
     
+    async def stream_job_suggestions(self, job_description: str, is_emergency: bool = False) -> AsyncIterator[dict]:
+        """
+        Stream validated job suggestions as soon as each one is complete
+        
+        Calls OpenAI with stream=True and parses the suggestions array
+        incrementally, so the first suggestion is available long before the
+        full completion finishes. The complete result is cached like
+        analyze_job_with_multiple_suggestions.
+        
+        Args:
+            job_description: The electrical work description
+            is_emergency: Whether this is an emergency job
+            
+        Yields:
+            dict: Validated suggestion (in the order the model produces them)
+        """
+        cache_key = self._build_cache_key("suggestions", SUGGESTIONS_SYSTEM_PROMPT, job_description, is_emergency)
+        cached = await self._estimate_cache.get(cache_key)
+        if cached is not None:
+            print(f"✅ Streaming cached suggestions for job (key: {cache_key[12:20]}...)")
+            for suggestion in cached["suggestions"]:
+                yield suggestion
+            return
+        
+        validated_suggestions = []
+        try:
+            parser = JSONArrayStreamParser(keys=("suggestions",))
+            messages = [
+                {"role": "system", "content": SUGGESTIONS_SYSTEM_PROMPT},
+                {"role": "user", "content": self._build_suggestions_prompt(job_description, is_emergency)}
+            ]
+            priority = PRIORITY_EMERGENCY if is_emergency else PRIORITY_MULTI_SUGGESTION
+            async with self._openai_slot(priority, messages, max_tokens=1500) as slot:
+                started = time.monotonic()
+                stream = await self._create_completion(
+                    slot,
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.4,
+                    max_tokens=1500,
+                    response_format={"type": "json_object"},
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                usage = None
+                async for chunk in stream:
+                    if chunk.usage is not None:
+                        usage = chunk.usage  # sent in a final chunk with no choices
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    for suggestion in parser.feed(chunk.choices[0].delta.content):
+                        if len(validated_suggestions) >= 4 or not isinstance(suggestion, dict):
+                            continue  # Max 4 suggestions
+                        validated = self._validate_suggestion(suggestion, job_description)
+                        validated_suggestions.append(validated)
+                        yield validated
+                parser.close()
+                self._record_usage(slot, self.model, usage, time.monotonic() - started)
+        except Exception as e:
+            print(f"❌ OpenAI Streaming Error ({type(e).__name__}): {str(e)}")
+            if validated_suggestions:
+                return  # Keep what was already sent rather than mixing in fallback guesses
+            for suggestion in self._get_fallback_suggestions(job_description, is_emergency)["suggestions"]:
+                yield suggestion
+            return
+        
+        if validated_suggestions:
+            validated_suggestions.sort(key=lambda x: x["confidence_score"], reverse=True)
+            await self._estimate_cache.set(cache_key, {"suggestions": validated_suggestions})
+        else:
+            for suggestion in self._get_fallback_suggestions(job_description, is_emergency)["suggestions"]:
+                yield suggestion
+    
+    def _build_suggestions_prompt(self, job_description: str, is_emergency: bool) -> str:
+        """Build the user prompt for multi-interpretation analysis"""
+        return f"""Analyze this electrical job and provide multiple interpretations:
+
+Job Description: {job_description}
+Emergency Job: {"Yes" if is_emergency else "No"}
+
+Provide 2-4 different interpretations sorted by confidence."""
+    
+    def _validate_suggestion(self, suggestion: dict, job_description: str) -> dict:
+        """Validate and sanitize a single raw model suggestion"""
+        hours = float(suggestion.get("estimatedHours", 2.0))
+        hours = max(0.5, min(100.0, hours))
+        
+        complexity = suggestion.get("jobComplexity", "moderate")
+        if complexity not in ["simple", "moderate", "complex"]:
+            complexity = "moderate"
+        
+        confidence = float(suggestion.get("confidence_score", 80))
+        confidence = max(0, min(100, confidence))
+        
+        return {
+            "job_title": suggestion.get("job_title", "Electrical Work"),
+            "refined_description": suggestion.get("refined_description", job_description),
+            "estimatedHours": round(hours, 1),
+            "jobComplexity": complexity,
+            "confidence_score": round(confidence, 1),
+            "match_reason": suggestion.get("match_reason", "Based on job description"),
+            "recommendedActions": suggestion.get("recommendedActions", [])[:4]
+        }
+    
     def _get_fallback_suggestions(self, job_description: str, is_emergency: bool) -> dict:
         """Provide fallback suggestions if OpenAI fails"""
         description_lower = job_description.lower()
@@ -169,124 +418,92 @@ Provide 2-4 different interpretations sorted by confidence."""
         
         return {"suggestions": suggestions[:3]}
     
-    def analyze_job_description(self, job_description: str, is_emergency: bool = False) -> dict:
+    async def analyze_job_description(
+        self,
+        job_description: str,
+        is_emergency: bool = False,
+        priority: int = PRIORITY_STANDARD
+    ) -> dict:
         """
         Analyze job description using OpenAI and return structured estimates.
-        Results are cached per (job_description, is_emergency) to ensure consistency.
+        The model router answers unambiguous jobs locally from the benchmark rules
+        and picks the fast or large OpenAI model for the rest.
+        Other results are cached per (job_description, is_emergency, model) to ensure consistency:
+        the in-process cache is checked first, then the shared cache, then OpenAI.
+        
+        Args:
+            job_description: The electrical work description
+            is_emergency: Whether this is an emergency job (always queued as emergency)
+            priority: OpenAI queue priority class for the calling endpoint
         """
+        # Unambiguous jobs are answered locally from the benchmark rules
+        tier, match = model_router.route(job_description)
+        if tier == TIER_LOCAL:
+            rule_estimator.record_fast_path(match["rule"])
+            print(f"⚡ Local estimate via rule '{match['rule']}' (confidence {match['confidence']})")
+            return {
+                "estimatedHours": match["estimatedHours"],
+                "jobComplexity": match["jobComplexity"],
+                "reasoning": (
+                    f"Matched UK electrician benchmark '{match['label']}' for quantity "
+                    f"{match['quantity']}: {match['estimatedHours']}h hands-on work"
+                ),
+                "recommendedActions": match["recommendedActions"]
+            }
+        model = model_router.model_for(tier)
+        
         # Build a stable cache key from the inputs
-        cache_key = hashlib.md5(f"{job_description.strip().lower()}|{is_emergency}".encode()).hexdigest()
-        if cache_key in self._estimate_cache:
-            print(f"✅ Returning cached estimate for job (key: {cache_key[:8]}...)")
-            return self._estimate_cache[cache_key]
+        cache_key = self._build_cache_key("estimate", ESTIMATE_SYSTEM_PROMPT, job_description, is_emergency, model)
+        cached = await self._estimate_cache.get(cache_key)
+        if cached is not None:
+            print(f"✅ Returning cached estimate for job (key: {cache_key[9:17]}...)")
+            return cached
         
-        system_prompt = """You are an expert electrical contractor with 20+ years of experience in the UK.
-Your job is to analyze electrical work descriptions and provide accurate time estimates for the ACTUAL WORK only.
-The call-out fee is charged separately — do NOT include travel or call-out time in estimatedHours.
-
-IMPORTANT: estimatedHours means hands-on work time only. The billing system adds the call-out fee on top automatically.
-
-Use these UK electrician benchmarks as your reference:
-
-SIMPLE jobs (0.5 – 2 hours):
-- Replace 1 socket or switch: 0.5h
-- Replace 2–4 sockets or switches: 1h
-- Replace 5–8 sockets or switches: 1.5–2h
-- Replace a single light fitting: 0.5h
-- Replace 2–4 light fittings: 1–1.5h
-- Install 1–2 LED downlights: 1h
-- Fix a tripped breaker / reset fuse: 0.5h
-- Replace a single outdoor light: 1h
-
-MODERATE jobs (2 – 6 hours):
-- Install 5–10 LED downlights: 2–3h
-- Install 10–20 LED downlights: 3–5h
-- Replace multiple sockets in one room (8–12): 2–3h
-- Install a new circuit (single room): 3–4h
-- Fault finding and repair (unknown fault): 2–4h
-- Install outdoor socket or garden lighting: 2–3h
-- Install EV charger (standard): 3–4h
-- Replace bathroom extractor fan: 1.5–2h
-- Install security lighting (2–3 lights): 2–3h
-
-COMPLEX jobs (6+ hours):
-- Replace consumer unit / fuse board: 6–8h
-- Rewire a single room: 4–6h
-- Rewire a 1-bed flat: 10–14h
-- Rewire a 2-bed house: 14–18h
-- Rewire a 3-bed house: 20–28h
-- Rewire a 4-bed house: 28–36h
-- Install new distribution board: 6–8h
-- Full electrical inspection (EICR) 1-bed: 3–4h
-- Full electrical inspection (EICR) 3-bed: 5–7h
-- Install solar panel system: 8–12h
-
-QUANTITY RULES — always scale by quantity mentioned:
-- If description says "a socket" or "one socket" → treat as 1 item
-- If description says "sockets" without a number → assume 4–6 items
-- If description says "throughout the house" or "whole house" → treat as complex full-scope
-- If description says "a few" → assume 3–4 items
-- If description says "several" → assume 5–7 items
-
-Return your analysis as a JSON object with this exact structure:
-{
-    "estimatedHours": <float between 0.5 and 100>,
-    "jobComplexity": "<simple|moderate|complex>",
-    "reasoning": "<brief explanation referencing the specific benchmark used>",
-    "recommendedActions": ["<action1>", "<action2>"]
-}
-
-Rules:
-- Always pick the closest benchmark and scale by quantity
-- Never estimate below 0.5h
-- For vague descriptions with no quantity, use the mid-range of the relevant benchmark
-- Emergency flag does NOT change the hours — it only affects pricing, which is handled separately"""
-
-        user_prompt = f"""Analyze this electrical job:
-
-Job Description: {job_description}
-Emergency Job: {"Yes" if is_emergency else "No"}
-
-Provide accurate time estimate and complexity assessment."""
-
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,  # Lower temperature for more consistent estimates
-                max_tokens=500,
-                response_format={"type": "json_object"}
+        # Close matches to accepted past quotes are answered from their hours
+        if settings.similarity_enabled:
+            # The matrix product releases the GIL, so keep it off the event loop
+            neighbours = await asyncio.to_thread(similarity_service.estimate, job_description)
+            if neighbours is not None:
+                print(f"🧭 Estimate from {len(neighbours['neighbours'])} similar past jobs")
+                return self._validate_estimate({
+                    "estimatedHours": neighbours["estimatedHours"],
+                    "jobComplexity": neighbours["jobComplexity"],
+                    "reasoning": neighbours["reasoning"],
+                    "recommendedActions": ["Confirm scope matches the similar past jobs on site"]
+                })
+        
+        # Concurrent callers with the same key share one OpenAI call
+        with openai_priority(PRIORITY_EMERGENCY if is_emergency else priority):
+            return await self._single_flight(
+                cache_key,
+                lambda: self._request_estimate(job_description, is_emergency, cache_key, model)
             )
+    
+    async def _request_estimate(self, job_description: str, is_emergency: bool, cache_key: str, model: str) -> dict:
+        """Call OpenAI for a time estimate and cache the validated result"""
+        try:
+            # Skip the batching window entirely while OpenAI is known to be down
+            self._breaker.raise_if_open()
             
-            # Parse the JSON response
-            analysis = json.loads(response.choices[0].message.content)
-            
-            # Validate and sanitize the response
-            estimatedHours = float(analysis.get("estimatedHours", 2.0))
-            estimatedHours = max(0.5, min(100.0, estimatedHours))  # Clamp between 0.5 and 100
-            
-            complexity = analysis.get("jobComplexity", "moderate")
-            if complexity not in ["simple", "moderate", "complex"]:
-                complexity = "moderate"
-            
-            reasoning = analysis.get("reasoning", "Standard electrical work estimate")
-            recommendedActions = analysis.get("recommendedActions", [])
-            
-            if not isinstance(recommendedActions, list):
-                recommendedActions = []
+            # Only fast-tier jobs are batched; large-tier jobs get the model's full attention
+            if self._estimate_batcher is not None and model == settings.openai_fast_model:
+                analysis = await self._estimate_batcher.submit(job_description, is_emergency)
+            else:
+                analysis = await self._call_estimate(job_description, is_emergency, model)
             
-            result = {
-                "estimatedHours": round(estimatedHours, 1),
-                "jobComplexity": complexity,
-                "reasoning": reasoning,
-                "recommendedActions": recommendedActions[:5]  # Limit to 5 actions
-            }
-            self._estimate_cache[cache_key] = result
+            result = self._validate_estimate(analysis)
+            await self._estimate_cache.set(cache_key, result)
             return result
             
+        except CircuitOpenError:
+            print("🔌 OpenAI circuit open - using local estimate")
+            return self._get_fallback_estimate(job_description, is_emergency)
+        except RequestBudgetExceeded as e:
+            print(f"⏱️ Request budget exhausted before OpenAI call: {str(e)}")
+            return self._get_fallback_estimate(job_description, is_emergency)
+        except QueueDeadlineExceeded as e:
+            print(f"🚦 OpenAI queue too long - {str(e)}")
+            return self._get_fallback_estimate(job_description, is_emergency)
         except AuthenticationError as e:
             print(f"❌ OpenAI Authentication Error - Invalid API key: {str(e)}")
             return self._get_fallback_estimate(job_description, is_emergency)
@@ -303,117 +520,343 @@ Provide accurate time estimate and complexity assessment."""
             print(f"❌ OpenAI Unexpected Error ({type(e).__name__}): {str(e)}")
             return self._get_fallback_estimate(job_description, is_emergency)
     
-    def _get_fallback_estimate(self, job_description: str, is_emergency: bool) -> dict:
+    async def warm_estimate(self, job_description: str, is_emergency: bool = False) -> str:
         """
-        Provide fallback estimates if OpenAI API fails.
-        Uses quantity-aware, scope-based estimation aligned with UK electrician benchmarks.
+        Pre-populate the estimate cache for a job description
+        
+        Unlike analyze_job_description, errors are raised rather than
+        replaced by the local fallback, so nothing unverified is cached.
+        
+        Returns:
+            str: "local" (rule fast path answers it), "cached" (already cached) or "warmed"
+        
+        Raises:
+            CircuitOpenError: If OpenAI is currently failing
         """
-        description_lower = job_description.lower()
-
-        # --- Quantity detection ---
-        import re
-        quantity = 1
-        # Look for explicit numbers (e.g. "5 sockets", "install 3 lights")
-        number_match = re.search(r'\b(\d+)\b', description_lower)
-        if number_match:
-            quantity = int(number_match.group(1))
-        elif any(w in description_lower for w in ['few', 'a few']):
-            quantity = 3
-        elif any(w in description_lower for w in ['several']):
-            quantity = 6
-        elif any(w in description_lower for w in ['throughout', 'whole house', 'entire house', 'full house']):
-            quantity = 99  # signals whole-house scope
-
-        # --- Whole-house / full rewire ---
-        if quantity == 99 or any(w in description_lower for w in ['rewire', 'full rewire', 'complete rewire']):
-            if any(w in description_lower for w in ['1 bed', '1-bed', 'one bed', 'flat', 'apartment']):
-                hours, complexity = 12.0, "complex"
-            elif any(w in description_lower for w in ['2 bed', '2-bed', 'two bed']):
-                hours, complexity = 16.0, "complex"
-            elif any(w in description_lower for w in ['3 bed', '3-bed', 'three bed']):
-                hours, complexity = 24.0, "complex"
-            elif any(w in description_lower for w in ['4 bed', '4-bed', 'four bed']):
-                hours, complexity = 32.0, "complex"
-            else:
-                hours, complexity = 20.0, "complex"
-
-        # --- Consumer unit / fuse board ---
-        elif any(w in description_lower for w in ['consumer unit', 'fuse box', 'fuse board', 'distribution board', 'fuseboard']):
-            hours, complexity = 7.0, "complex"
-
-        # --- EV charger ---
-        elif any(w in description_lower for w in ['ev charger', 'electric vehicle', 'car charger']):
-            hours, complexity = 3.5, "moderate"
-
-        # --- EICR / inspection ---
-        elif any(w in description_lower for w in ['eicr', 'inspection', 'electrical report', 'condition report']):
-            hours, complexity = 5.0, "moderate"
-
-        # --- Sockets / plugs ---
-        elif any(w in description_lower for w in ['socket', 'plug', 'outlet', 'power point']):
-            if quantity == 1:
-                hours, complexity = 0.5, "simple"
-            elif quantity <= 4:
-                hours, complexity = 1.0, "simple"
-            elif quantity <= 8:
-                hours, complexity = 1.5, "simple"
-            elif quantity <= 12:
-                hours, complexity = 2.5, "moderate"
-            else:
-                hours, complexity = 4.0, "moderate"
-
-        # --- Downlights / spotlights ---
-        elif any(w in description_lower for w in ['downlight', 'spotlight', 'recessed light', 'can light']):
-            if quantity <= 2:
-                hours, complexity = 1.0, "simple"
-            elif quantity <= 5:
-                hours, complexity = 2.0, "moderate"
-            elif quantity <= 10:
-                hours, complexity = 3.0, "moderate"
-            elif quantity <= 20:
-                hours, complexity = 4.5, "moderate"
-            else:
-                hours, complexity = 6.0, "complex"
-
-        # --- General lighting / light fittings ---
-        elif any(w in description_lower for w in ['light', 'lighting', 'bulb', 'fitting', 'fixture', 'led']):
-            if quantity == 1:
-                hours, complexity = 0.5, "simple"
-            elif quantity <= 4:
-                hours, complexity = 1.5, "simple"
-            elif quantity <= 8:
-                hours, complexity = 2.5, "moderate"
-            else:
-                hours, complexity = 4.0, "moderate"
-
-        # --- Switches ---
-        elif any(w in description_lower for w in ['switch', 'dimmer']):
-            if quantity <= 2:
-                hours, complexity = 0.5, "simple"
-            elif quantity <= 6:
-                hours, complexity = 1.0, "simple"
-            else:
-                hours, complexity = 2.0, "moderate"
-
-        # --- Fault finding ---
-        elif any(w in description_lower for w in ['fault', 'tripping', 'trip', 'not working', 'no power', 'dead']):
-            hours, complexity = 2.5, "moderate"
-
-        # --- Outdoor / garden ---
-        elif any(w in description_lower for w in ['outdoor', 'garden', 'external', 'outside', 'security light']):
-            hours, complexity = 2.5, "moderate"
-
-        # --- New circuit ---
-        elif any(w in description_lower for w in ['new circuit', 'extra circuit', 'additional circuit']):
-            hours, complexity = 3.5, "moderate"
+        tier, _ = model_router.classify(job_description)
+        if tier == TIER_LOCAL:
+            return "local"
+        model = model_router.model_for(tier)
+        
+        cache_key = self._build_cache_key("estimate", ESTIMATE_SYSTEM_PROMPT, job_description, is_emergency, model)
+        if await self._estimate_cache.get(cache_key) is not None:
+            return "cached"
+        
+        # Not coalesced with live traffic: a live caller must never inherit a warm-up error
+        self._breaker.raise_if_open()
+        with openai_priority(PRIORITY_BACKGROUND):
+            analysis = await self._call_estimate(job_description, is_emergency, model)
+        await self._estimate_cache.set(cache_key, self._validate_estimate(analysis))
+        return "warmed"
+    
+    async def _call_estimate(self, job_description: str, is_emergency: bool, model: Optional[str] = None) -> dict:
+        """Send a single job to OpenAI (fast-tier model by default) and return the raw parsed analysis"""
+        model = model or settings.openai_fast_model
+        user_prompt = f"""Analyze this electrical job:
 
-        # --- Default fallback ---
-        else:
-            hours, complexity = 3.0, "moderate"
+Job Description: {job_description}
+Emergency Job: {"Yes" if is_emergency else "No"}
 
+Provide accurate time estimate and complexity assessment."""
+        messages = [
+            {"role": "system", "content": ESTIMATE_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+
+        async with self._openai_slot(current_priority(), messages, max_tokens=500) as slot:
+            started = time.monotonic()
+            response = await self._create_completion(
+                slot,
+                model=model,
+                messages=messages,
+                temperature=0.3,  # Lower temperature for more consistent estimates
+                max_tokens=500,
+                response_format={"type": "json_object"}
+            )
+        self._record_tier_call(model, time.monotonic() - started, response)
+        
+        return json.loads(response.choices[0].message.content)
+    
+    async def _call_estimate_batch(self, items: List[Tuple[str, bool]]) -> List[Optional[dict]]:
+        """
+        Send several jobs to OpenAI in one completion
+        
+        Returns:
+            List[Optional[dict]]: Raw analysis per job, in input order (None if missing)
+        """
+        jobs = "\n\n".join(
+            f"""Job {index}:
+Job Description: {description}
+Emergency Job: {"Yes" if is_emergency else "No"}"""
+            for index, (description, is_emergency) in enumerate(items)
+        )
+        user_prompt = f"""Analyze these {len(items)} electrical jobs independently:
+
+{jobs}
+
+Provide accurate time estimate and complexity assessment for every job."""
+        messages = [
+            {"role": "system", "content": ESTIMATE_BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+        max_tokens = min(4000, 400 * len(items))
+        # The batch runs at the priority of its most urgent job
+        priority = PRIORITY_EMERGENCY if any(is_emergency for _, is_emergency in items) else current_priority()
+
+        async with self._openai_slot(priority, messages, max_tokens=max_tokens) as slot:
+            started = time.monotonic()
+            response = await self._create_completion(
+                slot,
+                model=settings.openai_fast_model,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"}
+            )
+        self._record_tier_call(settings.openai_fast_model, time.monotonic() - started, response)
+        
+        estimates = json.loads(response.choices[0].message.content).get("estimates", [])
+        analyses: List[Optional[dict]] = [None] * len(items)
+        for estimate in estimates if isinstance(estimates, list) else []:
+            if not isinstance(estimate, dict):
+                continue
+            try:
+                index = int(estimate.get("index", -1))
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < len(items) and analyses[index] is None:
+                analyses[index] = estimate
+        return analyses
+    
+    @staticmethod
+    def _record_tier_call(model: str, latency_seconds: float, response):
+        """Attribute an estimate call's model latency and tokens to its routing tier"""
+        usage = getattr(response, "usage", None)
+        model_router.record_call(
+            model_router.tier_for(model),
+            latency_seconds,
+            usage.prompt_tokens if usage else 0,
+            usage.completion_tokens if usage else 0
+        )
+    
+    def _validate_estimate(self, analysis: dict) -> dict:
+        """Validate and sanitize a raw model analysis into an estimate result"""
+        estimatedHours = float(analysis.get("estimatedHours", 2.0))
+        estimatedHours = max(0.5, min(100.0, estimatedHours))  # Clamp between 0.5 and 100
+        
+        complexity = analysis.get("jobComplexity", "moderate")
+        if complexity not in ["simple", "moderate", "complex"]:
+            complexity = "moderate"
+        
+        reasoning = analysis.get("reasoning", "Standard electrical work estimate")
+        recommendedActions = analysis.get("recommendedActions", [])
+        
+        if not isinstance(recommendedActions, list):
+            recommendedActions = []
+        
         return {
-            "estimatedHours": hours,
+            "estimatedHours": round(estimatedHours, 1),
             "jobComplexity": complexity,
+            "reasoning": reasoning,
+            "recommendedActions": recommendedActions[:5]  # Limit to 5 actions
+        }
+    
+    def _openai_slot(self, priority: int, messages: List[dict], max_tokens: int):
+        """
+        Queue for admission by the OpenAI scheduler
+        
+        The wait is bounded by the remaining request budget (leaving room
+        for the call itself) and the configured maximum queue wait.
+        
+        Returns:
+            Async context manager yielding a SchedulerSlot
+        """
+        estimated_tokens = sum(len(message["content"]) for message in messages) // 4 + max_tokens
+        max_wait = settings.openai_queue_max_wait_seconds
+        remaining = remaining_request_budget()
+        if remaining is not None:
+            max_wait = min(max_wait, remaining - settings.openai_min_timeout_seconds)
+        return self._scheduler.slot(priority, estimated_tokens, max_wait)
+    
+    async def _create_completion(self, slot, **kwargs):
+        """
+        Send a chat completion through the circuit breaker with an adaptive timeout
+        
+        Args:
+            slot: SchedulerSlot the call was admitted with (for token accounting)
+        
+        Raises:
+            CircuitOpenError: If the breaker is rejecting calls
+            RequestBudgetExceeded: If too little of the request budget is left
+        """
+        timeout = self._call_timeout()
+        if not self._breaker.allow_request():
+            raise CircuitOpenError("OpenAI circuit breaker is open")
+        
+        started = time.monotonic()
+        try:
+            response = await self.client.chat.completions.create(timeout=timeout, **kwargs)
+        except RateLimitError as e:
+            self._breaker.record_failure(time.monotonic() - started)
+            self._scheduler.pause(self._retry_after(e))
+            raise
+        except (APIConnectionError, InternalServerError):
+            # Timeouts are APIConnectionErrors; these all mean OpenAI is unhealthy
+            self._breaker.record_failure(time.monotonic() - started)
+            raise
+        except BaseException:
+            self._breaker.release_probe()
+            raise
+        
+        self._breaker.record_success(time.monotonic() - started)
+        if not kwargs.get("stream"):
+            self._record_usage(slot, kwargs["model"], response.usage, time.monotonic() - started)
+        return response
+    
+    @staticmethod
+    def _record_usage(slot, model: str, usage, model_seconds: float):
+        """
+        Account a finished call's tokens and timings
+        
+        Reconciles the scheduler's token reservation and records the call
+        against the endpoint being served. Streams report usage in their
+        final chunk, so their callers record it once the stream is consumed.
+        """
+        prompt_tokens, completion_tokens, cached_tokens = usage_tokens(usage)
+        if usage is not None:
+            slot.record_usage(prompt_tokens + completion_tokens)
+        llm_usage_tracker.record(
+            current_endpoint(),
+            model,
+            prompt_tokens,
+            completion_tokens,
+            cached_tokens,
+            model_seconds,
+            slot.queued_seconds
+        )
+    
+    @staticmethod
+    def _retry_after(error: RateLimitError) -> float:
+        """Seconds OpenAI asked us to wait after a rate-limit response"""
+        headers = error.response.headers
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except ValueError:
+            pass
+        return settings.openai_rate_limit_pause_seconds
+    
+    def get_scheduler_stats(self) -> dict:
+        """Get OpenAI queue depth, budget levels and per-priority wait times"""
+        return self._scheduler.stats()
+    
+    def _call_timeout(self) -> float:
+        """
+        Per-call timeout in seconds
+        
+        The latency-based timeout, capped at the share of the remaining
+        request budget available to each attempt (including client retries).
+        
+        Raises:
+            RequestBudgetExceeded: If the capped timeout is below the minimum
+        """
+        timeout = self._latency_timeout()
+        
+        remaining = remaining_request_budget()
+        if remaining is not None:
+            timeout = min(timeout, remaining / (settings.openai_max_retries + 1))
+            if timeout < settings.openai_min_timeout_seconds:
+                raise RequestBudgetExceeded(f"{max(0.0, remaining):.1f}s of request budget left")
+        
+        return timeout
+    
+    def _latency_timeout(self) -> float:
+        """Configured timeout, tightened to a multiple of the recent p99 OpenAI latency"""
+        timeout = settings.openai_timeout_seconds
+        p99 = self._breaker.latency_percentile(0.99)
+        if p99 is not None:
+            timeout = min(timeout, max(settings.openai_min_timeout_seconds, p99 * settings.openai_timeout_p99_multiplier))
+        return timeout
+    
+    def get_circuit_breaker_stats(self) -> dict:
+        """Get OpenAI circuit breaker state, latency percentiles and current call timeout"""
+        return {**self._breaker.stats(), "callTimeoutSeconds": round(self._latency_timeout(), 2)}
+    
+    async def _single_flight(self, key: str, request: Callable[[], Awaitable[dict]]) -> dict:
+        """
+        Run request once per key, sharing its result with concurrent callers
+        
+        The shared task is shielded so one caller disconnecting does not
+        cancel the call for everyone else waiting on it.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced_requests += 1
+            print(f"🔗 Coalescing with in-flight request (key: {key.split(':', 1)[1][:8]}...)")
+        else:
+            task = asyncio.ensure_future(request())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+    
+    def get_single_flight_stats(self) -> dict:
+        """Get request coalescing counters"""
+        return {
+            "coalescedRequests": self.coalesced_requests,
+            "inFlightRequests": len(self._inflight)
+        }
+    
+    def get_routing_stats(self) -> dict:
+        """Get model-routing tier shares, latency and token usage"""
+        return model_router.stats()
+    
+    def get_llm_usage_stats(self) -> dict:
+        """Get per-endpoint OpenAI token usage, prompt-cache hits and model/queue time"""
+        return llm_usage_tracker.stats()
+    
+    def get_batching_stats(self) -> dict:
+        """Get estimate micro-batching counters"""
+        if self._estimate_batcher is None:
+            return {"enabled": False}
+        return self._estimate_batcher.stats()
+    
+    def _build_cache_key(
+        self,
+        kind: str,
+        system_prompt: str,
+        job_description: str,
+        is_emergency: bool,
+        model: Optional[str] = None
+    ) -> str:
+        """
+        Build a versioned cache key for an analysis result
+        
+        The description is canonicalised so wording variants share one entry.
+        The key covers the model and the system prompt, so changing either
+        naturally misses entries written by older deployments in the shared cache.
+        """
+        prompt_digest = hashlib.md5(system_prompt.encode()).hexdigest()[:12]
+        canonical = normalize_job_description(job_description)
+        digest = hashlib.sha256(
+            f"{CACHE_KEY_VERSION}|{model or self.model}|{prompt_digest}|{canonical}|{is_emergency}".encode()
+        ).hexdigest()
+        return f"{kind}:{digest}"
+    
+    def get_cache_stats(self) -> dict:
+        """Get estimate cache counters for both cache levels"""
+        return self._estimate_cache.stats()
+    
+    def _get_fallback_estimate(self, job_description: str, is_emergency: bool) -> dict:
+        """
+        Provide fallback estimates if OpenAI API fails.
+        Uses quantity-aware, scope-based estimation aligned with UK electrician benchmarks.
+        """
+        match = rule_estimator.evaluate(job_description)
+        return {
+            "estimatedHours": match["estimatedHours"],
+            "jobComplexity": match["jobComplexity"],
             "reasoning": "Estimate based on UK electrician benchmarks (AI service temporarily unavailable)",
             "recommendedActions": [
                 "Site visit recommended for accurate quote",
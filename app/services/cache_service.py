@@ -0,0 +1,173 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+from app.config import settings
+from app.services.database_service import database_service
+from app.utils.cache import LRUTTLCache
+
+class SQLiteEstimateStore:
+    """Second-level estimate cache in a local SQLite file (shared by all workers on the host)"""
+
+    # Expired rows are ignored on read and deleted at most this often, on a write
+    PRUNE_INTERVAL_SECONDS = 60.0
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")  # Concurrent readers across uvicorn workers
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS estimate_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS estimate_cache_expires_at ON estimate_cache (expires_at)")
+            self._conn = conn
+        return self._conn
+
+    def _get_sync(self, key: str) -> Optional[Tuple[dict, float]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value, expires_at FROM estimate_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _set_sync(self, key: str, value: dict, expires_at: float) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO estimate_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at)
+            )
+            now = time.monotonic()
+            if now - self._last_prune >= self.PRUNE_INTERVAL_SECONDS:
+                conn.execute("DELETE FROM estimate_cache WHERE expires_at <= ?", (time.time(),))
+                self._last_prune = now
+            conn.commit()
+
+    async def get(self, key: str) -> Optional[Tuple[dict, float]]:
+        """Return (value, expires_at epoch seconds) or None"""
+        return await asyncio.to_thread(self._get_sync, key)
+
+    async def set(self, key: str, value: dict, ttl_seconds: float) -> None:
+        await asyncio.to_thread(self._set_sync, key, value, time.time() + ttl_seconds)
+
+class MongoEstimateStore:
+    """Second-level estimate cache in the MongoDB `estimate_cache` collection"""
+
+    async def get(self, key: str) -> Optional[Tuple[dict, float]]:
+        """Return (value, expires_at epoch seconds) or None"""
+        return await database_service.get_cached_estimate(key)
+
+    async def set(self, key: str, value: dict, ttl_seconds: float) -> None:
+        await database_service.save_cached_estimate(key, value, time.time() + ttl_seconds)
+
+class EstimateCacheService:
+    """
+    Two-level cache for AI estimates.
+
+    L1 is an in-process LRU/TTL cache; L2 (optional) is shared across
+    uvicorn workers and survives restarts. Lookups check L1, then L2,
+    promoting L2 hits into L1.
+    """
+
+    def __init__(self):
+        self.l1 = LRUTTLCache(
+            max_entries=settings.estimate_cache_max_entries,
+            max_bytes=settings.estimate_cache_max_bytes,
+            ttl_seconds=settings.estimate_cache_ttl_seconds
+        )
+        self.l2_backend = settings.estimate_cache_backend.lower()
+        self.l2_ttl_seconds = settings.estimate_cache_l2_ttl_seconds
+        self.l2 = self._build_l2_store(self.l2_backend)
+
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.l2_errors = 0
+
+    @staticmethod
+    def _build_l2_store(backend: str):
+        if backend == "sqlite":
+            return SQLiteEstimateStore(settings.estimate_cache_sqlite_path)
+        if backend == "mongodb":
+            return MongoEstimateStore()
+        if backend not in ("", "none"):
+            print(f"⚠️ Unknown ESTIMATE_CACHE_BACKEND '{backend}' - second-level cache disabled")
+        return None
+
+    async def get(self, key: str) -> Optional[dict]:
+        """
+        Look up a cached value in L1, then L2
+
+        Args:
+            key: Versioned cache key
+
+        Returns:
+            Optional[dict]: Cached value or None on miss
+        """
+        value = self.l1.get(key)
+        if value is not None or self.l2 is None:
+            return value
+
+        try:
+            entry = await self.l2.get(key)
+        except Exception as e:
+            self.l2_errors += 1
+            print(f"⚠️ L2 estimate cache read failed: {str(e)}")
+            return None
+
+        if entry is None:
+            self.l2_misses += 1
+            return None
+
+        self.l2_hits += 1
+        value, expires_at = entry
+        remaining = expires_at - time.time()
+        self.l1.set(key, value, ttl_seconds=min(self.l1.ttl_seconds, remaining))
+        return value
+
+    async def set(self, key: str, value: dict) -> None:
+        """
+        Store a value in L1 and (if configured) L2
+
+        Args:
+            key: Versioned cache key
+            value: JSON-serialisable value
+        """
+        self.l1.set(key, value)
+        if self.l2 is None:
+            return
+
+        try:
+            await self.l2.set(key, value, self.l2_ttl_seconds)
+        except Exception as e:
+            self.l2_errors += 1
+            print(f"⚠️ L2 estimate cache write failed: {str(e)}")
+
+    def stats(self) -> dict:
+        """Get L1 and L2 cache counters"""
+        l2_lookups = self.l2_hits + self.l2_misses
+        return {
+            "l1": self.l1.stats(),
+            "l2": {
+                "backend": self.l2_backend if self.l2 is not None else "none",
+                "ttlSeconds": self.l2_ttl_seconds,
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "errors": self.l2_errors,
+                "hitRate": round(self.l2_hits / l2_lookups, 4) if l2_lookups else 0.0
+            }
+        }
+
+# Create singleton instance
+cache_service = EstimateCacheService()
@@ -0,0 +1,121 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.ai_service import ai_service
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.database_service import database_service
+from app.utils.helpers import normalize_job_description
+
+class CacheWarmer:
+    """
+    Background estimate-cache warm-up from historical quotes.
+
+    After startup, the most frequently quoted descriptions are estimated
+    one at a time at a fixed maximum rate, so a fresh deploy starts with
+    the popular jobs cached without competing with live traffic for the
+    OpenAI rate limit.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.state = "idle"  # idle -> running -> done / failed / cancelled
+        self.total = 0
+        self.processed = 0
+        self.counts: Dict[str, int] = {"warmed": 0, "cached": 0, "local": 0, "failed": 0}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    async def _top_descriptions(self) -> List[Tuple[str, bool]]:
+        """Top descriptions by quote count, merged by canonical form"""
+        rows = await database_service.get_top_job_descriptions(limit=settings.cache_warmup_top_n * 4)
+
+        merged: Dict[Tuple[str, bool], List] = {}
+        for description, is_emergency, count in rows:
+            key = (normalize_job_description(description), is_emergency)
+            if key in merged:
+                merged[key][1] += count
+            else:
+                merged[key] = [description, count, is_emergency]
+
+        ranked = sorted(merged.values(), key=lambda item: item[1], reverse=True)
+        return [(description, is_emergency) for description, _, is_emergency in ranked[:settings.cache_warmup_top_n]]
+
+    async def run(self):
+        """Warm the cache once, pacing OpenAI calls to the configured rate"""
+        self.state = "running"
+        self.started_at, self.finished_at = time.time(), None
+        self.total = self.processed = 0
+        self.counts = dict.fromkeys(self.counts, 0)
+        interval = 60.0 / max(1, settings.cache_warmup_rate_per_minute)
+
+        try:
+            jobs = await self._top_descriptions()
+            self.total = len(jobs)
+            print(f"🔥 Cache warm-up: {self.total} frequent job descriptions")
+
+            for description, is_emergency in jobs:
+                try:
+                    outcome = await ai_service.warm_estimate(description, is_emergency)
+                except CircuitOpenError:
+                    # OpenAI is struggling: wait out the breaker cool-down before the next job
+                    outcome = "failed"
+                    await asyncio.sleep(settings.breaker_open_seconds)
+                except Exception as e:
+                    print(f"⚠️ Cache warm-up failed for one job ({type(e).__name__}): {str(e)}")
+                    outcome = "failed"
+
+                self.counts[outcome] += 1
+                self.processed += 1
+                # Only requests that reached OpenAI count against the rate
+                if outcome in ("warmed", "failed"):
+                    await asyncio.sleep(interval)
+
+            self.state = "done"
+            print(
+                f"🔥 Cache warm-up finished in {time.time() - self.started_at:.1f}s: "
+                f"{self.counts['warmed']} warmed, {self.counts['cached']} already cached, "
+                f"{self.counts['local']} answered locally, {self.counts['failed']} failed"
+            )
+        except asyncio.CancelledError:
+            self.state = "cancelled"
+            raise
+        except Exception as e:
+            self.state = "failed"
+            print(f"⚠️ Cache warm-up aborted ({type(e).__name__}): {str(e)}")
+        finally:
+            self.finished_at = time.time()
+
+    def start(self):
+        """Start warm-up in the background (needs a database connection)"""
+        if not settings.cache_warmup_enabled or not database_service.connected:
+            self.state = "disabled"
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Cancel warm-up if it is still running"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        """Get warm-up progress and duration"""
+        end = self.finished_at or time.time()
+        return {
+            "state": self.state,
+            "total": self.total,
+            "processed": self.processed,
+            "progress": round(self.processed / self.total, 4) if self.total else 0.0,
+            **self.counts,
+            "ratePerMinute": settings.cache_warmup_rate_per_minute,
+            "durationSeconds": round(end - self.started_at, 1) if self.started_at else None
+        }
+
+# Create singleton instance
+cache_warmer = CacheWarmer()
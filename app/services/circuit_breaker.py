@@ -0,0 +1,186 @@
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit breaker is open"""
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker for an upstream dependency.
+
+    While closed, outcomes are kept in a rolling time window. The breaker
+    opens when the window holds enough calls and either the error rate or
+    the p95 latency crosses its threshold. After a cool-down it goes
+    half-open and lets a few probe calls through: a successful probe closes
+    it again, a failed one re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float,
+        latency_threshold_seconds: float,
+        window_seconds: float,
+        min_calls: int,
+        open_seconds: float,
+        half_open_max_calls: int
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.latency_threshold_seconds = latency_threshold_seconds
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        # (timestamp, succeeded, latency_seconds)
+        self._window: Deque[Tuple[float, bool, float]] = deque()
+
+        self.rejected_calls = 0
+        self.transition_counts: Dict[str, int] = {}
+        self.recent_transitions: Deque[dict] = deque(maxlen=20)
+
+    def is_open(self) -> bool:
+        """True while the breaker is rejecting calls (open and still cooling down)"""
+        return self.state == self.OPEN and time.monotonic() - self._opened_at < self.open_seconds
+
+    def raise_if_open(self):
+        """
+        Reject early, without reserving a probe slot, while the breaker is open
+
+        Raises:
+            CircuitOpenError: If the breaker is open and still cooling down
+        """
+        if self.is_open():
+            self.rejected_calls += 1
+            raise CircuitOpenError(f"{self.name} circuit breaker is open")
+
+    def allow_request(self) -> bool:
+        """
+        Decide whether a call may go upstream (reserves a probe slot when half-open)
+
+        Returns:
+            bool: True if the call should proceed
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self.rejected_calls += 1
+                return False
+            self._transition(self.HALF_OPEN, "cool-down elapsed")
+
+        if self.state == self.HALF_OPEN:
+            if self._half_open_in_flight >= self.half_open_max_calls:
+                self.rejected_calls += 1
+                return False
+            self._half_open_in_flight += 1
+
+        return True
+
+    def record_success(self, latency_seconds: float):
+        """Record a successful upstream call"""
+        if self.state == self.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+            self._window.clear()
+            self._transition(self.CLOSED, "probe call succeeded")
+        self._record(True, latency_seconds)
+
+    def record_failure(self, latency_seconds: float):
+        """Record a failed upstream call (connection error, timeout, 429 or 5xx)"""
+        if self.state == self.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+            self._open("probe call failed")
+            return
+        self._record(False, latency_seconds)
+
+    def release_probe(self):
+        """Release a half-open probe slot for a call that ended without a health signal"""
+        if self.state == self.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """
+        Latency percentile of calls in the current window
+
+        Args:
+            percentile: Percentile as a fraction (e.g. 0.99)
+
+        Returns:
+            Optional[float]: Latency in seconds, or None with too few samples
+        """
+        self._prune()
+        latencies = sorted(latency for _, _, latency in self._window)
+        if len(latencies) < self.min_calls:
+            return None
+        index = min(len(latencies) - 1, int(percentile * len(latencies)))
+        return latencies[index]
+
+    def _record(self, succeeded: bool, latency_seconds: float):
+        self._window.append((time.monotonic(), succeeded, latency_seconds))
+        if self.state != self.CLOSED:
+            return
+
+        self._prune()
+        if len(self._window) < self.min_calls:
+            return
+
+        failures = sum(1 for _, ok, _ in self._window if not ok)
+        failure_rate = failures / len(self._window)
+        if failure_rate >= self.failure_rate_threshold:
+            self._open(f"error rate {failure_rate:.0%}")
+            return
+
+        p95 = self.latency_percentile(0.95)
+        if p95 is not None and p95 >= self.latency_threshold_seconds:
+            self._open(f"p95 latency {p95:.1f}s")
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            self._window.popleft()
+
+    def _open(self, reason: str):
+        self._opened_at = time.monotonic()
+        self._transition(self.OPEN, reason)
+
+    def _transition(self, new_state: str, reason: str):
+        if new_state == self.state:
+            return
+        key = f"{self.state}->{new_state}"
+        self.transition_counts[key] = self.transition_counts.get(key, 0) + 1
+        self.recent_transitions.append({
+            "from": self.state,
+            "to": new_state,
+            "reason": reason,
+            "at": time.time()
+        })
+        print(f"🔌 Circuit breaker '{self.name}': {self.state} → {new_state} ({reason})")
+        self.state = new_state
+        if new_state != self.HALF_OPEN:
+            self._half_open_in_flight = 0
+
+    def stats(self) -> dict:
+        """Get breaker state, window statistics and transition history"""
+        self._prune()
+        calls = len(self._window)
+        failures = sum(1 for _, ok, _ in self._window if not ok)
+        p50, p95, p99 = (self.latency_percentile(p) for p in (0.5, 0.95, 0.99))
+        return {
+            "name": self.name,
+            "state": self.OPEN if self.is_open() else (self.HALF_OPEN if self.state == self.OPEN else self.state),
+            "windowCalls": calls,
+            "windowErrorRate": round(failures / calls, 4) if calls else 0.0,
+            "latencyP50": round(p50, 3) if p50 is not None else None,
+            "latencyP95": round(p95, 3) if p95 is not None else None,
+            "latencyP99": round(p99, 3) if p99 is not None else None,
+            "rejectedCalls": self.rejected_calls,
+            "transitions": dict(self.transition_counts),
+            "recentTransitions": list(self.recent_transitions)
+        }
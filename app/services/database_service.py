@@ -1,7 +1,7 @@
 import os
-from datetime import datetime
-from typing import Optional, List
-from motor.motor_asyncio import AsyncClient, AsyncDatabase
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional, List, Tuple
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from bson import ObjectId
 from app.config import settings
 from app.models import SavedQuote, QuoteResponse
@@ -10,20 +10,24 @@ class DatabaseService:
     """Service for database operations and quote persistence"""
     
     def __init__(self):
-        self.client: Optional[AsyncClient] = None
-        self.db: Optional[AsyncDatabase] = None
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.db: Optional[AsyncIOMotorDatabase] = None
         self.quotes_collection = None
+        self.estimate_cache_collection = None
+        self.connected = False  # True only once MongoDB has answered a ping
     
     async def connect(self):
         """Connect to MongoDB"""
         try:
             print(f"🔗 Connecting to MongoDB: {settings.mongodb_url}")
-            self.client = AsyncClient(settings.mongodb_url)
+            self.client = AsyncIOMotorClient(settings.mongodb_url)
             self.db = self.client[settings.mongodb_database]
             self.quotes_collection = self.db["quotes"]
+            self.estimate_cache_collection = self.db["estimate_cache"]
             
             # Test connection
             await self.client.admin.command('ping')
+            self.connected = True
             print(f"✅ Connected to MongoDB database: {settings.mongodb_database}")
             
             # Create indexes
@@ -34,6 +38,7 @@ class DatabaseService:
     
     async def disconnect(self):
         """Disconnect from MongoDB"""
+        self.connected = False
         if self.client:
             self.client.close()
             print("🔌 Disconnected from MongoDB")
@@ -44,7 +49,9 @@ class DatabaseService:
             await self.quotes_collection.create_index("electricianId")
             await self.quotes_collection.create_index("customerEmail")
             await self.quotes_collection.create_index("status")
+            await self.quotes_collection.create_index([("status", 1), ("updatedAt", 1)])
             await self.quotes_collection.create_index("createdAt", expireAfterSeconds=7776000)  # 90 days TTL
+            await self.estimate_cache_collection.create_index("expiresAt", expireAfterSeconds=0)
             print("✅ Database indexes created")
         except Exception as e:
             print(f"⚠️ Index creation warning: {str(e)}")
@@ -243,6 +250,118 @@ class DatabaseService:
             print(f"❌ Error deleting quote: {str(e)}")
             raise
     
+    async def get_top_job_descriptions(self, limit: int = 500) -> List[Tuple[str, bool, int]]:
+        """
+        Most frequently quoted job descriptions
+        
+        Descriptions are grouped case- and whitespace-insensitively here;
+        callers can merge further by canonical form.
+        
+        Args:
+            limit: Maximum number of descriptions to return
+            
+        Returns:
+            List[Tuple[str, bool, int]]: (job_description, is_emergency, quote count), most frequent first
+        """
+        if self.quotes_collection is None:
+            return []
+        
+        pipeline = [
+            {"$match": {"job_description": {"$type": "string"}}},
+            {"$group": {
+                "_id": {
+                    "description": {"$toLower": {"$trim": {"input": "$job_description"}}},
+                    "isEmergency": {"$ifNull": ["$isEmergency", False]}
+                },
+                "count": {"$sum": 1}
+            }},
+            {"$sort": {"count": -1}},
+            {"$limit": limit}
+        ]
+        cursor = self.quotes_collection.aggregate(pipeline, allowDiskUse=True)
+        return [
+            (doc["_id"]["description"], bool(doc["_id"]["isEmergency"]), doc["count"])
+            async for doc in cursor
+        ]
+    
+    async def iter_accepted_quotes(self, since: Optional[datetime] = None, batch_size: int = 5000) -> AsyncIterator[List[dict]]:
+        """
+        Stream accepted quotes in updatedAt order, in batches
+        
+        Args:
+            since: Only quotes updated after this time (None for all)
+            batch_size: Documents per yielded batch
+            
+        Yields:
+            List[dict]: _id, job_description, estimatedHours, jobComplexity and updatedAt
+        """
+        if self.quotes_collection is None:
+            return
+        
+        query = {"status": "accepted"}
+        if since is not None:
+            query["updatedAt"] = {"$gt": since}
+        
+        cursor = self.quotes_collection.find(
+            query,
+            {"job_description": 1, "estimatedHours": 1, "jobComplexity": 1, "updatedAt": 1}
+        ).sort("updatedAt", 1).batch_size(batch_size)
+        
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    async def get_cached_estimate(self, cache_key: str) -> Optional[Tuple[dict, float]]:
+        """
+        Retrieve a shared AI estimate cache entry
+        
+        Args:
+            cache_key: Versioned estimate cache key
+            
+        Returns:
+            Optional[Tuple[dict, float]]: (cached value, expiry epoch seconds) or None
+        """
+        if self.estimate_cache_collection is None:
+            return None
+        
+        doc = await self.estimate_cache_collection.find_one({"_id": cache_key})
+        if not doc:
+            return None
+        
+        # TTL monitor runs once a minute, so filter out expired entries here too
+        expires_at = doc["expiresAt"].replace(tzinfo=timezone.utc).timestamp()
+        if expires_at <= datetime.now(timezone.utc).timestamp():
+            return None
+        
+        return doc["value"], expires_at
+    
+    async def save_cached_estimate(self, cache_key: str, value: dict, expires_at: float):
+        """
+        Upsert a shared AI estimate cache entry
+        
+        Args:
+            cache_key: Versioned estimate cache key
+            value: Cached estimate payload
+            expires_at: Expiry time as epoch seconds
+        """
+        if self.estimate_cache_collection is None:
+            return
+        
+        await self.estimate_cache_collection.replace_one(
+            {"_id": cache_key},
+            {
+                "_id": cache_key,
+                "value": value,
+                "expiresAt": datetime.fromtimestamp(expires_at, tz=timezone.utc)
+            },
+            upsert=True
+        )
+    
     def _doc_to_response(self, doc: dict) -> QuoteResponse:
         """Convert MongoDB document to QuoteResponse"""
         return QuoteResponse(
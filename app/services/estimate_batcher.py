@@ -0,0 +1,128 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+# (job_description, is_emergency)
+BatchItem = Tuple[str, bool]
+
+class EstimateBatcher:
+    """
+    Micro-batching scheduler for AI time estimates.
+
+    Requests arriving within a short window (or until the batch is full) are
+    sent to OpenAI as one multi-job completion, and each caller receives the
+    raw analysis for its own job. If the batch call fails, or a job is missing
+    from the batch response, the configured fallback decides what happens:
+    "individual" re-sends that job on its own, "local" raises so the caller
+    uses the local benchmark estimate.
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[List[BatchItem]], Awaitable[List[Optional[dict]]]],
+        send_single: Callable[[str, bool], Awaitable[dict]],
+        max_batch_size: int,
+        window_ms: int,
+        fallback: str = "individual"
+    ):
+        self._send_batch = send_batch
+        self._send_single = send_single
+        self.max_batch_size = max(1, max_batch_size)
+        self.window_seconds = window_ms / 1000
+        self.fallback = fallback
+
+        self._pending: List[Tuple[str, bool, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.batches_sent = 0
+        self.items_batched = 0
+        self.items_fallen_back = 0
+
+    async def submit(self, job_description: str, is_emergency: bool) -> dict:
+        """
+        Queue a job for the next batch and wait for its raw analysis
+
+        Args:
+            job_description: The electrical work description
+            is_emergency: Whether this is an emergency job
+
+        Returns:
+            dict: Unvalidated analysis for this job (as returned by the model)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((job_description, is_emergency, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[str, bool, asyncio.Future]]):
+        if len(batch) == 1:
+            description, is_emergency, future = batch[0]
+            await self._resolve_single(description, is_emergency, future)
+            return
+
+        items = [(description, is_emergency) for description, is_emergency, _ in batch]
+        try:
+            analyses = await self._send_batch(items)
+            self.batches_sent += 1
+            self.items_batched += len(items)
+        except Exception as e:
+            print(f"⚠️ Batched estimate of {len(items)} jobs failed ({type(e).__name__}): {str(e)}")
+            analyses = [None] * len(items)
+            error = e
+        else:
+            error = ValueError("Job missing from batched estimate response")
+
+        retries = []
+        for (description, is_emergency, future), analysis in zip(batch, analyses):
+            if future.done():
+                continue
+            if analysis is not None:
+                future.set_result(analysis)
+                continue
+
+            self.items_fallen_back += 1
+            if self.fallback == "individual":
+                retries.append(self._resolve_single(description, is_emergency, future))
+            else:
+                future.set_exception(error)
+
+        if retries:
+            await asyncio.gather(*retries)
+
+    async def _resolve_single(self, description: str, is_emergency: bool, future: asyncio.Future):
+        try:
+            analysis = await self._send_single(description, is_emergency)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(analysis)
+
+    def stats(self) -> dict:
+        """Get batching counters"""
+        return {
+            "enabled": True,
+            "maxBatchSize": self.max_batch_size,
+            "windowMs": round(self.window_seconds * 1000),
+            "fallback": self.fallback,
+            "batchesSent": self.batches_sent,
+            "itemsBatched": self.items_batched,
+            "averageBatchSize": round(self.items_batched / self.batches_sent, 2) if self.batches_sent else 0.0,
+            "itemsFallenBack": self.items_fallen_back,
+            "pending": len(self._pending)
+        }
@@ -0,0 +1,240 @@
+import csv
+import math
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+_CENTROIDS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "uk_postcode_centroids.csv")
+
+_EARTH_RADIUS_MILES = 3958.8
+_MILES_PER_DEGREE_LAT = 69.05
+
+# Outward code (district) with an optional inward code: "RG1", "rg1 2ab", "SW1A2AA"
+_POSTCODE_RE = re.compile(r"^([A-Z]{1,2})([0-9][A-Z0-9]?)(?:\s*([0-9][A-Z]{2}))?$")
+# Full postcodes inside free text ("12 High St, Reading RG1 2AB")
+_POSTCODE_IN_TEXT_RE = re.compile(r"\b([A-Z]{1,2}[0-9][A-Z0-9]?)\s*[0-9][A-Z]{2}\b")
+
+# How closely a location resolved. A postcode area spans tens of miles (PH
+# runs from Perth to Fort William), so area-only matches are too coarse for
+# radius searches; districts and named towns are not.
+PRECISION_DISTRICT = "district"
+PRECISION_TOWN = "town"
+PRECISION_AREA = "area"
+
+def haversine_miles(lat: float, lon: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """
+    Great-circle distances from one point to many
+
+    Args:
+        lat: Latitude of the origin (degrees)
+        lon: Longitude of the origin (degrees)
+        latitudes: Latitudes of the other points (degrees)
+        longitudes: Longitudes of the other points (degrees)
+
+    Returns:
+        np.ndarray: Distances in miles
+    """
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * _EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+class GeoGridIndex:
+    """
+    Grid-bucket spatial index over points (row i is workers[i])
+
+    Points are bucketed into cells of `cell_degrees` and stored sorted by
+    cell, so each latitude band of a query's bounding box is one
+    searchsorted slice; only points in those cells get an exact distance.
+    Rows without coordinates (NaN) are never returned.
+    """
+
+    _LON_CELLS = 1 << 16  # Cell key = lat_cell * _LON_CELLS + lon_cell (+ offset)
+
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray, cell_degrees: float = 0.25):
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.cell_degrees = cell_degrees
+        located = np.flatnonzero(~np.isnan(latitudes))
+        self.unlocated = np.flatnonzero(np.isnan(latitudes))
+        keys = self._keys(latitudes[located], longitudes[located])
+        order = np.argsort(keys, kind="stable")
+        self._keys_sorted = keys[order]
+        self._rows = located[order]
+
+    def __len__(self) -> int:
+        """Rows with coordinates"""
+        return len(self._rows)
+
+    def _cells(self, values: np.ndarray) -> np.ndarray:
+        return np.floor(values / self.cell_degrees).astype(np.int64)
+
+    def _keys(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        return self._cells(latitudes) * self._LON_CELLS + self._cells(longitudes) + self._LON_CELLS // 2
+
+    def within(self, lat: float, lon: float, radius_miles: float, include_unlocated: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rows within a radius of a point
+
+        Args:
+            lat: Latitude of the centre (degrees)
+            lon: Longitude of the centre (degrees)
+            radius_miles: Search radius
+            include_unlocated: Also return the rows without coordinates (distance NaN)
+
+        Returns:
+            tuple: (row indices in ascending order, their distances in miles)
+        """
+        dlat = radius_miles / _MILES_PER_DEGREE_LAT
+        # Longitude span widens towards the pole-ward edge of the box
+        edge = min(89.0, abs(lat) + dlat)
+        dlon = min(180.0, radius_miles / (_MILES_PER_DEGREE_LAT * math.cos(math.radians(edge))))
+
+        lat_lo, lat_hi = self._cells(np.array([lat - dlat, lat + dlat])).tolist()
+        lon_lo, lon_hi = self._cells(np.array([lon - dlon, lon + dlon])).tolist()
+        slices = []
+        for lat_cell in range(lat_lo, lat_hi + 1):
+            base = lat_cell * self._LON_CELLS + self._LON_CELLS // 2
+            start, stop = np.searchsorted(self._keys_sorted, [base + lon_lo, base + lon_hi + 1])
+            slices.append(self._rows[start:stop])
+
+        candidates = np.sort(np.concatenate(slices)) if slices else np.empty(0, dtype=np.int64)
+        distances = haversine_miles(lat, lon, self.latitudes[candidates], self.longitudes[candidates])
+        inside = distances <= radius_miles
+        rows, distances = candidates[inside], distances[inside]
+        if include_unlocated and len(self.unlocated):
+            rows = np.concatenate([rows, self.unlocated])
+            distances = np.concatenate([distances, np.full(len(self.unlocated), np.nan)])
+            order = np.argsort(rows, kind="stable")
+            rows, distances = rows[order], distances[order]
+        return rows, distances
+
+class GeoService:
+    """Resolves UK postcodes and town names to coordinates from the bundled centroid table"""
+
+    def __init__(self, path: str = _CENTROIDS_PATH):
+        self.path = path
+        self._codes: Optional[Dict[str, Tuple[float, float]]] = None
+        self._towns: Dict[str, Tuple[float, float]] = {}
+
+    def _load(self) -> Dict[str, Tuple[float, float]]:
+        if self._codes is None:
+            codes: Dict[str, Tuple[float, float]] = {}
+            town_points: Dict[str, List[Tuple[float, float]]] = {}
+            with open(self.path, newline="", encoding="utf-8") as f:
+                rows = csv.DictReader(line for line in f if not line.startswith("#"))
+                for row in rows:
+                    point = (float(row["latitude"]), float(row["longitude"]))
+                    codes[row["code"].strip().upper()] = point
+                    town_points.setdefault(row["town"].strip().lower(), []).append(point)
+            # A town split over several areas (London) sits at the mean of their centroids
+            self._towns = {
+                town: (sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points))
+                for town, points in town_points.items()
+            }
+            self._codes = codes
+            print(f"📍 Loaded {len(codes)} postcode centroids ({len(self._towns)} towns)")
+        return self._codes
+
+    def resolve_postcode(self, postcode: str) -> Optional[Tuple[float, float]]:
+        """
+        Centroid for a full postcode or outward code (district, falling back to area)
+
+        Args:
+            postcode: e.g. "RG1 2AB", "rg1" or "RG"
+
+        Returns:
+            Optional[tuple]: (latitude, longitude), or None if unknown
+        """
+        located = self._locate_postcode(postcode)
+        return located[0] if located is not None else None
+
+    def _locate_postcode(self, postcode: str) -> Optional[Tuple[Tuple[float, float], str]]:
+        codes = self._load()
+        compact = postcode.strip().upper()
+        match = _POSTCODE_RE.match(compact)
+        if match:
+            area, district = match.group(1), match.group(1) + match.group(2)
+            if district in codes:
+                return codes[district], PRECISION_DISTRICT
+            return (codes[area], PRECISION_AREA) if area in codes else None
+        if compact.isalpha() and compact in codes:
+            return codes[compact], PRECISION_AREA
+        return None
+
+    def resolve_town(self, town: str) -> Optional[Tuple[float, float]]:
+        """Centroid for a town name (case-insensitive; "Newcastle" matches "Newcastle upon Tyne")"""
+        self._load()
+        name = town.strip().lower()
+        if not name:
+            return None
+        if name in self._towns:
+            return self._towns[name]
+        if len(name) >= 4:
+            for known, point in self._towns.items():
+                if known.startswith(name + " ") or known.startswith(name + "-"):
+                    return point
+        return None
+
+    def resolve(self, text: str) -> Optional[Tuple[float, float]]:
+        """Coordinates for customer or worker location text (see locate), or None if nothing matched"""
+        located = self.locate(text)
+        return located[0] if located is not None else None
+
+    def locate(self, text: str) -> Optional[Tuple[Tuple[float, float], str]]:
+        """
+        Coordinates and precision for customer or worker location text
+
+        Tries the whole text as a postcode, then a full postcode inside it,
+        then each comma-separated part as a town ("Reading, UK"). A postcode
+        district wins, then a town; a postcode area is the last resort.
+
+        Args:
+            text: Postcode, town or free-text address
+
+        Returns:
+            Optional[tuple]: ((latitude, longitude), PRECISION_*), or None if nothing matched
+        """
+        if not text:
+            return None
+        located = self._locate_postcode(text)
+        if located is None:
+            match = _POSTCODE_IN_TEXT_RE.search(text.upper())
+            if match:
+                located = self._locate_postcode(match.group(1))
+        if located is not None and located[1] == PRECISION_DISTRICT:
+            return located
+        for part in text.split(","):
+            point = self.resolve_town(part)
+            if point is not None:
+                return point, PRECISION_TOWN
+        return located
+
+    def build_index(self, locations: List[str]) -> GeoGridIndex:
+        """
+        Resolve worker locations and index them (row i is locations[i])
+
+        Locations that don't resolve, or only to a postcode area, stay
+        unlocated: radius searches can still return them, without a distance.
+
+        Args:
+            locations: Free-text worker locations
+
+        Returns:
+            GeoGridIndex: Index over the rows whose location resolved to a district or town
+        """
+        resolved: Dict[str, Optional[Tuple[float, float]]] = {}
+        latitudes = np.full(len(locations), np.nan)
+        longitudes = np.full(len(locations), np.nan)
+        for i, location in enumerate(locations):
+            if location not in resolved:
+                located = self.locate(location)
+                resolved[location] = located[0] if located is not None and located[1] != PRECISION_AREA else None
+            point = resolved[location]
+            if point is not None:
+                latitudes[i], longitudes[i] = point
+        return GeoGridIndex(latitudes, longitudes)
+
+# Singleton instance
+geo_service = GeoService()
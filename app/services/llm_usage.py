@@ -0,0 +1,127 @@
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+def usage_tokens(usage) -> Tuple[int, int, int]:
+    """
+    Read token counts from an OpenAI usage object
+
+    Args:
+        usage: CompletionUsage from a response or final stream chunk (may be None)
+
+    Returns:
+        Tuple[int, int, int]: (prompt tokens, completion tokens, prompt tokens served from OpenAI's prompt cache)
+    """
+    if usage is None:
+        return 0, 0, 0
+    # prompt_tokens_details is newer than the pinned SDK's model, so it arrives as an extra field
+    details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(details, dict):
+        cached = details.get("cached_tokens")
+    else:
+        cached = getattr(details, "cached_tokens", None)
+    return usage.prompt_tokens or 0, usage.completion_tokens or 0, cached or 0
+
+class _UsageTotals:
+    __slots__ = ("calls", "prompt_tokens", "completion_tokens", "cached_tokens", "cache_hit_calls",
+                 "model_seconds", "queue_seconds", "models")
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cache_hit_calls = 0
+        self.model_seconds: Deque[float] = deque(maxlen=1000)
+        self.queue_seconds: Deque[float] = deque(maxlen=1000)
+        self.models: Dict[str, int] = {}
+
+    def add(self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int,
+            model_seconds: float, queue_seconds: float):
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cached_tokens += cached_tokens
+        if cached_tokens:
+            self.cache_hit_calls += 1
+        self.model_seconds.append(model_seconds)
+        self.queue_seconds.append(queue_seconds)
+        self.models[model] = self.models.get(model, 0) + 1
+
+    def stats(self) -> dict:
+        model_times = sorted(self.model_seconds)
+        queue_times = sorted(self.queue_seconds)
+        return {
+            "calls": self.calls,
+            "models": dict(self.models),
+            "promptTokens": self.prompt_tokens,
+            "completionTokens": self.completion_tokens,
+            "cachedPromptTokens": self.cached_tokens,
+            "avgPromptTokens": round(self.prompt_tokens / self.calls, 1) if self.calls else 0.0,
+            "avgCompletionTokens": round(self.completion_tokens / self.calls, 1) if self.calls else 0.0,
+            "promptTokenShare": round(self.prompt_tokens / (self.prompt_tokens + self.completion_tokens), 4)
+                if self.prompt_tokens + self.completion_tokens else 0.0,
+            "promptCacheHitRate": round(self.cache_hit_calls / self.calls, 4) if self.calls else 0.0,
+            "cachedPromptTokenShare": round(self.cached_tokens / self.prompt_tokens, 4) if self.prompt_tokens else 0.0,
+            "avgModelMs": _avg_ms(model_times),
+            "p95ModelMs": _p95_ms(model_times),
+            "avgQueueMs": _avg_ms(queue_times),
+            "p95QueueMs": _p95_ms(queue_times)
+        }
+
+def _avg_ms(values) -> float:
+    return round(sum(values) / len(values) * 1000, 1) if values else 0.0
+
+def _p95_ms(sorted_values) -> float:
+    return round(sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * 0.95))] * 1000, 1) if sorted_values else 0.0
+
+class LLMUsageTracker:
+    """
+    Per-endpoint accounting of OpenAI calls.
+
+    Every completion records its prompt, completion and prompt-cache
+    (cached) token counts with the time spent in the model and queued in
+    the scheduler, so the cost of the fixed system prompts can be told
+    apart from the output, and provider-side prompt caching verified.
+    """
+
+    def __init__(self):
+        self._endpoints: Dict[str, _UsageTotals] = {}
+        self._total = _UsageTotals()
+
+    def record(
+        self,
+        endpoint: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_tokens: int,
+        model_seconds: float,
+        queue_seconds: float
+    ):
+        """
+        Record one completed OpenAI call
+
+        Args:
+            endpoint: Endpoint the call was made for ("background" outside requests)
+            model: Model that served the call
+            prompt_tokens: Prompt tokens billed
+            completion_tokens: Completion tokens billed
+            cached_tokens: Prompt tokens OpenAI served from its prompt cache
+            model_seconds: Time from sending the request to the complete response
+            queue_seconds: Time waiting for admission by the scheduler
+        """
+        totals = self._endpoints.get(endpoint)
+        if totals is None:
+            totals = self._endpoints[endpoint] = _UsageTotals()
+        for entry in (totals, self._total):
+            entry.add(model, prompt_tokens, completion_tokens, cached_tokens, model_seconds, queue_seconds)
+
+    def stats(self) -> dict:
+        """Get token usage, prompt-cache hits and model/queue time, overall and per endpoint"""
+        return {
+            "total": self._total.stats(),
+            "endpoints": {endpoint: totals.stats() for endpoint, totals in sorted(self._endpoints.items())}
+        }
+
+# Create singleton instance
+llm_usage_tracker = LLMUsageTracker()
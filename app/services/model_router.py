@@ -0,0 +1,116 @@
+from collections import deque
+from typing import Deque, Dict, Tuple
+from app.config import settings
+from app.services.rule_estimator import rule_estimator
+
+TIER_LOCAL = "local"
+TIER_FAST = "fast"
+TIER_LARGE = "large"
+
+# Jobs whose scope is expensive to get wrong always go to the larger model
+_LARGE_RULES = {"rewire", "consumer_unit"}
+
+class ModelRouter:
+    """
+    Picks the cheapest estimator tier that can handle a job description.
+
+    Classification reuses the local benchmark rules (one regex pass) plus
+    length and quantity signals:
+      - local: the rule match is unambiguous enough to answer without OpenAI
+               and the job is not large-scope
+      - large: rewires, consumer units, complex or long/ambiguous descriptions
+      - fast:  everything else
+    """
+
+    def __init__(self):
+        self._routed: Dict[str, int] = {TIER_LOCAL: 0, TIER_FAST: 0, TIER_LARGE: 0}
+        self._calls: Dict[str, int] = {TIER_FAST: 0, TIER_LARGE: 0}
+        self._latencies: Dict[str, Deque[float]] = {TIER_FAST: deque(maxlen=1000), TIER_LARGE: deque(maxlen=1000)}
+        self._prompt_tokens: Dict[str, int] = {TIER_FAST: 0, TIER_LARGE: 0}
+        self._completion_tokens: Dict[str, int] = {TIER_FAST: 0, TIER_LARGE: 0}
+
+    def route(self, job_description: str) -> Tuple[str, dict]:
+        """Classify a description and count it towards its tier's traffic share"""
+        tier, match = self.classify(job_description)
+        self._routed[tier] += 1
+        return tier, match
+
+    def classify(self, job_description: str) -> Tuple[str, dict]:
+        """
+        Classify a description into a tier
+
+        Args:
+            job_description: The electrical work description
+
+        Returns:
+            Tuple[str, dict]: (tier, rule match from the local estimator)
+        """
+        match = rule_estimator.evaluate(job_description)
+        # Large-scope jobs are never answered locally, however confident the rule match
+        large_scope = (
+            match["rule"] in _LARGE_RULES
+            or match["jobComplexity"] == "complex"
+            or match["quantity"] >= settings.routing_large_min_quantity
+        )
+
+        if (
+            settings.rule_fast_path_enabled
+            and not large_scope
+            and match["confidence"] >= settings.rule_fast_path_threshold
+        ):
+            tier = TIER_LOCAL
+        elif not settings.routing_enabled:
+            tier = TIER_FAST
+        elif (
+            large_scope
+            or len(job_description.split()) >= settings.routing_large_min_words
+            # Keywords matched, but competing or uncertain signals make it ambiguous
+            or (match["rule"] != "default" and match["confidence"] <= settings.routing_ambiguous_confidence)
+        ):
+            tier = TIER_LARGE
+        else:
+            tier = TIER_FAST
+
+        return tier, match
+
+    @staticmethod
+    def model_for(tier: str) -> str:
+        """OpenAI model serving a tier"""
+        return settings.openai_large_model if tier == TIER_LARGE else settings.openai_fast_model
+
+    @staticmethod
+    def tier_for(model: str) -> str:
+        """Tier a model belongs to (models other than the large one count as fast)"""
+        return TIER_LARGE if model == settings.openai_large_model and model != settings.openai_fast_model else TIER_FAST
+
+    def record_call(self, tier: str, latency_seconds: float, prompt_tokens: int, completion_tokens: int):
+        """Record one OpenAI estimate call made for a tier"""
+        self._calls[tier] += 1
+        self._latencies[tier].append(latency_seconds)
+        self._prompt_tokens[tier] += prompt_tokens
+        self._completion_tokens[tier] += completion_tokens
+
+    def stats(self) -> dict:
+        """Get per-tier traffic share, model latency and token usage"""
+        total = sum(self._routed.values())
+        tiers = {}
+        for tier, routed in self._routed.items():
+            entry = {
+                "routed": routed,
+                "share": round(routed / total, 4) if total else 0.0
+            }
+            if tier != TIER_LOCAL:
+                latencies = sorted(self._latencies[tier])
+                entry.update({
+                    "model": self.model_for(tier),
+                    "calls": self._calls[tier],
+                    "avgLatencyMs": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+                    "p95LatencyMs": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1) if latencies else 0.0,
+                    "promptTokens": self._prompt_tokens[tier],
+                    "completionTokens": self._completion_tokens[tier]
+                })
+            tiers[tier] = entry
+        return {"enabled": settings.routing_enabled, "tiers": tiers}
+
+# Create singleton instance
+model_router = ModelRouter()
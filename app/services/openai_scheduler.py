@@ -0,0 +1,273 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Deque, Dict, Iterator, List, Optional
+
+# Priority classes, most urgent first
+PRIORITY_EMERGENCY = 0
+PRIORITY_SELF_QUOTE = 1
+PRIORITY_STANDARD = 2
+PRIORITY_MULTI_SUGGESTION = 3
+PRIORITY_BACKGROUND = 4
+
+PRIORITY_NAMES = {
+    PRIORITY_EMERGENCY: "emergency",
+    PRIORITY_SELF_QUOTE: "self_quote",
+    PRIORITY_STANDARD: "standard",
+    PRIORITY_MULTI_SUGGESTION: "multi_suggestion",
+    PRIORITY_BACKGROUND: "background"
+}
+
+# Priority of OpenAI calls made by the current task (set around estimate requests)
+_current_priority: ContextVar[int] = ContextVar("openai_priority", default=PRIORITY_STANDARD)
+
+@contextmanager
+def openai_priority(priority: int) -> Iterator[None]:
+    """Run OpenAI calls made inside the block at the given priority"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+def current_priority() -> int:
+    """Priority for OpenAI calls made by the current task"""
+    return _current_priority.get()
+
+class QueueDeadlineExceeded(Exception):
+    """Raised when an OpenAI call would wait in the queue longer than its deadline"""
+
+class TokenBucket:
+    """Continuously refilling budget of `rate_per_minute` units (burst up to one minute's worth)"""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available"""
+        self._refill()
+        deficit = min(amount, self.capacity) - self.level
+        return max(0.0, deficit / self.rate)
+
+    def consume(self, amount: float):
+        """Take units (the level may go negative when reconciling actual usage)"""
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def refund(self, amount: float):
+        """Return units that were reserved but not used"""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "future", "enqueued_at", "cancelled")
+
+    def __init__(self, priority: int, seq: int, tokens: int, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.cancelled = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+class SchedulerSlot:
+    """An admitted OpenAI call; reconciles its token reservation with actual usage"""
+
+    def __init__(self, scheduler: "OpenAIScheduler", estimated_tokens: int, queued_seconds: float):
+        self._scheduler = scheduler
+        self.estimated_tokens = estimated_tokens
+        self.queued_seconds = queued_seconds
+
+    def record_usage(self, total_tokens: int):
+        """Correct the tokens-per-minute budget with the tokens OpenAI actually counted"""
+        self._scheduler._reconcile(self.estimated_tokens, total_tokens)
+        self.estimated_tokens = total_tokens
+
+class OpenAIScheduler:
+    """
+    Client-side admission control for OpenAI calls.
+
+    Calls wait in a priority queue until a concurrency slot and both the
+    requests-per-minute and tokens-per-minute budgets allow them, and are
+    admitted strictly in priority order (FIFO within a class). A call whose
+    estimated queue wait exceeds its deadline is rejected up front so the
+    caller can fall back immediately, and a rate-limit response from
+    OpenAI pauses all admissions for its retry-after period.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_concurrency: int):
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max(1, max_concurrency)
+        self.in_flight = 0
+
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._paused_until = 0.0
+
+        self.rate_limit_pauses = 0
+        self._admitted: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        self._rejected: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        self._waits: Dict[int, Deque[float]] = {p: deque(maxlen=1000) for p in PRIORITY_NAMES}
+
+    @asynccontextmanager
+    async def slot(self, priority: int, estimated_tokens: int, max_wait: float) -> AsyncIterator[SchedulerSlot]:
+        """
+        Wait for admission, hold a concurrency slot for the block, then release it
+
+        Args:
+            priority: Priority class (PRIORITY_*)
+            estimated_tokens: Prompt plus max completion tokens, reserved from the TPM budget
+            max_wait: Longest acceptable queue wait in seconds
+
+        Raises:
+            QueueDeadlineExceeded: If the call cannot be admitted within max_wait
+        """
+        queued_seconds = await self._acquire(priority, estimated_tokens, max_wait)
+        try:
+            yield SchedulerSlot(self, estimated_tokens, queued_seconds)
+        finally:
+            self.in_flight -= 1
+            self._dispatch()
+
+    async def _acquire(self, priority: int, tokens: int, max_wait: float) -> float:
+        if not self._queue and self._can_admit(tokens) == 0.0:
+            self._admit(priority, tokens, 0.0)
+            return 0.0
+
+        estimated_wait = self._estimated_wait(priority, tokens)
+        if estimated_wait > max_wait:
+            self._rejected[priority] += 1
+            raise QueueDeadlineExceeded(
+                f"Estimated OpenAI queue wait {estimated_wait:.1f}s exceeds {max(0.0, max_wait):.1f}s deadline"
+            )
+
+        waiter = _Waiter(priority, next(self._seq), tokens, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, waiter)
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=max(0.0, max_wait))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just as we gave up: hand the slot and the rate budget back
+                self.in_flight -= 1
+                self._requests.refund(1)
+                self._tokens.refund(waiter.tokens)
+                self._admitted[priority] -= 1
+                self._dispatch()
+            else:
+                waiter.cancelled = True
+                waiter.future.cancel()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._rejected[priority] += 1
+            raise QueueDeadlineExceeded(f"Waited {max_wait:.1f}s in the OpenAI queue")
+
+        return time.monotonic() - waiter.enqueued_at
+
+    def _can_admit(self, tokens: int) -> float:
+        """0.0 if a call of `tokens` can start now, else seconds until it might (inf if slot-bound)"""
+        paused = self._paused_until - time.monotonic()
+        if paused > 0:
+            return paused
+        if self.in_flight >= self.max_concurrency:
+            return float("inf")
+        return max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+
+    def _estimated_wait(self, priority: int, tokens: int) -> float:
+        """Rate-budget wait for this call plus everything queued at the same or higher priority"""
+        ahead = [w for w in self._queue if not w.cancelled and w.priority <= priority]
+        wait = max(
+            self._requests.wait_time(len(ahead) + 1),
+            self._tokens.wait_time(sum(w.tokens for w in ahead) + tokens)
+        )
+        return max(wait, self._paused_until - time.monotonic())
+
+    def _admit(self, priority: int, tokens: int, waited: float):
+        self._requests.consume(1)
+        self._tokens.consume(tokens)
+        self.in_flight += 1
+        self._admitted[priority] += 1
+        self._waits[priority].append(waited)
+
+    def _dispatch(self):
+        """Admit queued calls in priority order while budgets allow"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._queue:
+            head = self._queue[0]
+            if head.cancelled:
+                heapq.heappop(self._queue)
+                continue
+
+            wait = self._can_admit(head.tokens)
+            if wait == float("inf"):
+                return  # a finishing call will dispatch again
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+
+            heapq.heappop(self._queue)
+            self._admit(head.priority, head.tokens, time.monotonic() - head.enqueued_at)
+            head.future.set_result(None)
+
+    def _reconcile(self, estimated_tokens: int, actual_tokens: int):
+        if actual_tokens < estimated_tokens:
+            self._tokens.refund(estimated_tokens - actual_tokens)
+        elif actual_tokens > estimated_tokens:
+            self._tokens.consume(actual_tokens - estimated_tokens)
+
+    def pause(self, seconds: float):
+        """Hold all admissions after OpenAI reports a rate limit"""
+        self.rate_limit_pauses += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        print(f"🚦 OpenAI rate limited - pausing queue for {seconds:.1f}s")
+        try:
+            self._dispatch()
+        except RuntimeError:
+            pass  # no running loop; the next acquire will dispatch
+
+    def stats(self) -> dict:
+        """Get queue depth, budget levels and per-priority wait times"""
+        queued = [w for w in self._queue if not w.cancelled]
+        classes = {}
+        for priority, name in PRIORITY_NAMES.items():
+            waits = sorted(self._waits[priority])
+            classes[name] = {
+                "queued": sum(1 for w in queued if w.priority == priority),
+                "admitted": self._admitted[priority],
+                "rejected": self._rejected[priority],
+                "avgWaitMs": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                "p95WaitMs": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1) if waits else 0.0
+            }
+        self._requests._refill()
+        self._tokens._refill()
+        return {
+            "queueDepth": len(queued),
+            "inFlight": self.in_flight,
+            "maxConcurrency": self.max_concurrency,
+            "requestsAvailable": round(self._requests.level, 1),
+            "tokensAvailable": round(self._tokens.level),
+            "pausedForSeconds": round(max(0.0, self._paused_until - time.monotonic()), 1),
+            "rateLimitPauses": self.rate_limit_pauses,
+            "priorities": classes
+        }
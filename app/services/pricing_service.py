@@ -1,119 +1,761 @@
+import asyncio
+import bisect
+import gzip
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import time
+from collections import deque
+from datetime import datetime, timezone
 import httpx
-from typing import List, Optional
+import numpy as np
+from typing import Deque, Dict, List, Optional, Tuple
+from pydantic import TypeAdapter, ValidationError
 from app.config import settings
-from app.models import WorkerDetails
+from app.models import ELECTRICIAN_ID_PATTERN, WorkerDetails
+from app.services.geo_service import geo_service
+from app.utils.json_stream import JSONArrayStreamParser
+
+logger = logging.getLogger(__name__)
+
+# Roster items are validated into WorkerDetails this many at a time
+_VALIDATION_BATCH_SIZE = 1000
+_worker_list_adapter = TypeAdapter(List[WorkerDetails])
+# Layout of the on-disk roster snapshot; files with any other format are ignored
+_SNAPSHOT_FORMAT = 1
+# An unchanged roster is rewritten at most this often, so the file's fetchedAt
+# keeps up while the pricing API keeps confirming it
+_SNAPSHOT_TOUCH_PERSIST_SECONDS = 3600
+# Background refreshes start this far into the TTL, so a healthy API replaces
+# (or re-confirms) the snapshot before it expires
+_REFRESH_AHEAD_FRACTION = 0.8
+_ELECTRICIAN_ID_RE = re.compile(ELECTRICIAN_ID_PATTERN)
+
+class RosterColumns:
+    """
+    Pricing fields of the active workers as float64 arrays (row i is workers[i])
+    
+    Lets quotes for the whole roster be computed, filtered and ranked in
+    one vectorised pass.
+    """
+    
+    def __init__(self, workers: List[WorkerDetails]):
+        count = len(workers)
+        self.hourly_rate = np.fromiter((w.hourlyRate for w in workers), dtype=np.float64, count=count)
+        self.call_out_fee = np.fromiter((w.callOutFee for w in workers), dtype=np.float64, count=count)
+        self.minimum_charge = np.fromiter((w.minimum_charge for w in workers), dtype=np.float64, count=count)
+        self.emergency_uplift = np.fromiter((w.emergencyUplift for w in workers), dtype=np.float64, count=count)
+        
+        # Tie-break order for equal totals: each row's position when sorted by electricianId
+        by_id = sorted(range(count), key=lambda i: workers[i].electricianId)
+        self.sorted_ids = [workers[i].electricianId for i in by_id]
+        self.id_rank = np.empty(count, dtype=np.int64)
+        self.id_rank[by_id] = np.arange(count)
+        
+        # Locations as codes into the (few) distinct normalised names
+        codes: Dict[str, int] = {}
+        self.location_code = np.fromiter(
+            (codes.setdefault(w.location.strip().lower(), len(codes)) for w in workers), dtype=np.int32, count=count
+        )
+        self.locations = list(codes)
+    
+    def __len__(self) -> int:
+        return len(self.hourly_rate)
+    
+    def location_mask(self, location: str) -> np.ndarray:
+        """
+        Rows whose location contains the given text (case-insensitive)
+        
+        Args:
+            location: Town, area or postcode text to match
+            
+        Returns:
+            np.ndarray: Boolean mask over the roster rows
+        """
+        query = location.strip().lower()
+        matching = [code for code, name in enumerate(self.locations) if query in name]
+        return np.isin(self.location_code, matching)
+    
+    def subset(self, rows: np.ndarray) -> "RosterColumns":
+        """
+        Columns for some of the rows only (e.g. workers near a postcode)
+        
+        Tie-break ranks and location codes keep their roster-wide values, so
+        cursors and filters work the same on the subset.
+        
+        Args:
+            rows: Roster row indices to keep, in order
+            
+        Returns:
+            RosterColumns: Row j of the subset is roster row rows[j]
+        """
+        subset = RosterColumns.__new__(RosterColumns)
+        for name in ("hourly_rate", "call_out_fee", "minimum_charge", "emergency_uplift", "id_rank", "location_code"):
+            setattr(subset, name, getattr(self, name)[rows])
+        subset.sorted_ids = self.sorted_ids
+        subset.locations = self.locations
+        return subset
+    
+    def rank_after(self, electrician_id: str) -> int:
+        """Smallest id_rank belonging to an electricianId that sorts after the given one"""
+        return bisect.bisect_right(self.sorted_ids, electrician_id)
+
+class RosterSnapshot:
+    """
+    The worker roster from one successful pricing API fetch
+    
+    Indexes are built once per refresh so lookups by electricianId or email
+    are dict hits instead of roster scans, and radius searches only visit
+    nearby grid cells.
+    """
+    
+    def __init__(
+        self,
+        records: List[dict],
+        workers: List[WorkerDetails],
+        version: int,
+        source: str = "upstream",
+        fetched_at: Optional[float] = None
+    ):
+        self.workers = workers
+        self.version = version
+        # "upstream" (pricing API), "disk" (persisted copy not yet confirmed upstream) or "fallback"
+        self.source = source
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self._fetched_monotonic = time.monotonic() - (time.time() - self.fetched_at)
+        # Active workers by electricianId and by normalised email (first match wins, as the old scan did)
+        self.by_id: Dict[str, WorkerDetails] = {worker.electricianId: worker for worker in workers}
+        self.by_email: Dict[str, WorkerDetails] = {}
+        for worker in workers:
+            if worker.email:
+                self.by_email.setdefault(normalize_email(worker.email), worker)
+        # Raw records of every worker, inactive ones included, as the single-worker endpoint returns them
+        self.records_by_id: Dict[str, dict] = {
+            normalize_electrician_id(record.get("electricianId", "")): record for record in records
+        }
+        self.columns = RosterColumns(workers)
+        # Worker locations resolved against the postcode centroid table, for radius searches
+        self.geo_index = geo_service.build_index([worker.location for worker in workers])
+    
+    def age(self) -> float:
+        """Seconds since the roster was fetched"""
+        return time.monotonic() - self._fetched_monotonic
+    
+    def touch(self):
+        """Mark the roster as just confirmed current (e.g. by a 304 Not Modified)"""
+        self.fetched_at = time.time()
+        self._fetched_monotonic = time.monotonic()
+        self.source = "upstream"
+    
+    def is_fresh(self) -> bool:
+        """Whether the roster is recent enough to answer lookups without the pricing API"""
+        return self.age() < settings.roster_ttl_seconds
+    
+    def is_stale(self) -> bool:
+        """Whether quotes from this roster may be out of date (not confirmed by the pricing API within the TTL)"""
+        return self.source != "upstream" or not self.is_fresh()
+
+def _write_snapshot_file(path: str, payload: dict) -> int:
+    """
+    Atomically replace `path` with the payload as gzipped JSON
+    
+    The file is written and fsynced under a temporary name in the same
+    directory, then renamed over the old one, so readers (and a crash
+    mid-write) only ever see a complete snapshot. Records are encoded in
+    batches, so the event loop gets the GIL back between them.
+    
+    Args:
+        path: Snapshot file
+        payload: Snapshot fields, with the worker records under "records"
+    
+    Returns:
+        int: Bytes written
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".roster-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0) as f:
+                header = {key: value for key, value in payload.items() if key != "records"}
+                f.write(json.dumps(header, separators=(",", ":"))[:-1].encode() + b',"records":[')
+                records = payload["records"]
+                for start in range(0, len(records), _VALIDATION_BATCH_SIZE):
+                    batch = json.dumps(records[start:start + _VALIDATION_BATCH_SIZE], separators=(",", ":"))
+                    f.write((b"," if start else b"") + batch[1:-1].encode())
+                f.write(b"]}")
+            raw.flush()
+            os.fsync(raw.fileno())
+            size = raw.tell()
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return size
+
+def normalize_email(email: str) -> str:
+    """Canonical form of an email address for lookups"""
+    return email.strip().lower()
+
+def normalize_electrician_id(electrician_id) -> str:
+    """electricianId as a string (the API may send a Mongo {"$oid": ...} object)"""
+    if isinstance(electrician_id, dict) and "$oid" in electrician_id:
+        return electrician_id["$oid"]
+    return str(electrician_id)
 
 class PricingService:
-    """Service for fetching pricing data from external API"""
+    """
+    Service for fetching pricing data from external API
+    
+    The worker roster is served from an in-memory snapshot
+    (stale-while-revalidate): once warm, requests never wait on the pricing
+    API. Snapshots older than the TTL are refreshed in the background, and
+    the last good snapshot keeps being served while the API is failing.
+    Each new snapshot is also persisted to disk, so a restart can serve
+    the last good roster before the API has answered.
+    """
     
     def __init__(self):
         self.api_url = settings.pricing_api_url
         self.timeout = settings.pricing_api_timeout
+        self._snapshot: Optional[RosterSnapshot] = None
+        self._version = 0
+        # In-flight roster refresh, shared by everyone who needs it
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.stale_served = 0
+        self.last_error: Optional[str] = None
+        self._refresh_latencies: Deque[float] = deque(maxlen=100)
+        # Shared keep-alive connection pool for every pricing API call
+        self._http: Optional[httpx.AsyncClient] = None
+        self.retries = 0
+        # Conditional / delta sync state: validators of the last full roster response and the delta watermark
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._watermark: Optional[str] = None
+        self._last_full_sync = 0.0
+        self.sync_counts: Dict[str, int] = {"full": 0, "delta": 0, "notModified": 0}
+        self.bytes_transferred = 0
+        self.last_sync: Optional[dict] = None
+        # Last good roster on disk, for fast startup and serving while the pricing API is down
+        self._persist_lock = asyncio.Lock()
+        self.persisted: Optional[dict] = None
+        # Bulk id lookups: ids answered from the snapshot vs fetched one by one
+        self.lookup_counts: Dict[str, int] = {"cacheHits": 0, "fetched": 0}
+    
+    def open_client(self):
+        """Create the pooled HTTP client (called once at startup)"""
+        if self._http is not None:
+            return
+        http2 = settings.pricing_api_http2
+        if http2:
+            try:
+                import h2  # noqa: F401  (httpx needs it for HTTP/2)
+            except ImportError:
+                print("⚠️ PRICING_API_HTTP2 is set but the h2 package is not installed - using HTTP/1.1")
+                http2 = False
+        self._http = httpx.AsyncClient(
+            timeout=self.timeout,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.pricing_api_max_connections,
+                max_keepalive_connections=settings.pricing_api_max_keepalive_connections,
+                keepalive_expiry=settings.pricing_api_keepalive_seconds
+            )
+        )
+    
+    async def close_client(self):
+        """Close the pooled HTTP client and its connections"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    async def _get(
+        self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None, stream: bool = False
+    ) -> httpx.Response:
+        """
+        GET through the pooled client, retrying transient failures
+        
+        Connection errors, timeouts, 429 and 5xx responses are retried up
+        to PRICING_API_MAX_RETRIES times with jittered exponential backoff.
+        
+        Args:
+            stream: Return before reading the body; the caller must aclose() the response
+        
+        Returns:
+            httpx.Response: The last response received
+        """
+        if self._http is None:
+            self.open_client()  # used outside the app lifecycle (scripts, benchmarks)
+        
+        for attempt in range(settings.pricing_api_max_retries + 1):
+            last_attempt = attempt == settings.pricing_api_max_retries
+            try:
+                request = self._http.build_request("GET", url, params=params, headers=headers)
+                response = await self._http.send(request, stream=stream)
+                if last_attempt or (response.status_code != 429 and response.status_code < 500):
+                    return response
+                await response.aclose()
+                reason = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise
+                reason = type(e).__name__
+            
+            delay = settings.pricing_api_retry_backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+            self.retries += 1
+            print(f"🔁 Pricing API {reason} - retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
     
     async def get_all_workers(self) -> List[WorkerDetails]:
         """
-        Fetch all active workers from the pricing API
+        Get all active workers from the roster snapshot
+        
+        Only the first call (before any snapshot exists) waits for the
+        pricing API; it falls back to default worker data if that fails.
         
         Returns:
             List[WorkerDetails]: List of all active workers
         """
+        return (await self.get_roster()).workers
+    
+    async def get_roster(self) -> RosterSnapshot:
+        """
+        Get the roster snapshot, or one holding the default worker data if no roster could ever be fetched
+        
+        Returns:
+            RosterSnapshot: Active workers with their indexes and pricing columns
+        """
+        snapshot = await self.get_snapshot()
+        if snapshot is None:
+            snapshot = RosterSnapshot([], self._get_fallback_workers(), version=0, source="fallback")
+        return snapshot
+    
+    async def get_snapshot(self) -> Optional[RosterSnapshot]:
+        """
+        Get the current roster snapshot, refreshing it in the background if stale
+        
+        Returns:
+            Optional[RosterSnapshot]: The snapshot, or None if no roster could ever be fetched
+        """
+        if not settings.roster_cache_enabled:
+            try:
+                roster = await self._fetch_roster()
+            except Exception:
+                return None
+            return RosterSnapshot(*roster, self._version)
+        
+        snapshot = self._snapshot
+        if snapshot is None:
+            try:
+                snapshot = await self.refresh()
+            except Exception:
+                return None
+        elif not snapshot.is_fresh():
+            self.stale_served += 1
+            self._start_refresh()
+        return snapshot
+    
+    async def refresh(self) -> RosterSnapshot:
+        """
+        Fetch the roster and publish it as a new snapshot version
+        
+        Concurrent callers share a single upstream fetch.
+        
+        Returns:
+            RosterSnapshot: The new snapshot
+        
+        Raises:
+            Exception: If the fetch failed (the previous snapshot is kept)
+        """
+        return await asyncio.shield(self._start_refresh())
+    
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+            # Background refreshes are fire-and-forget; their failures are already recorded
+            self._refresh_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return self._refresh_task
+    
+    async def _refresh(self) -> RosterSnapshot:
+        started = time.perf_counter()
+        previous = self._snapshot
+        # Deltas only patch an existing roster; a periodic full sync drops workers deleted upstream
+        delta = (
+            settings.roster_delta_sync_enabled
+            and previous is not None
+            and self._watermark is not None
+            and time.monotonic() - self._last_full_sync < settings.roster_full_sync_seconds
+        )
+        sync_started = datetime.now(timezone.utc).isoformat()
         try:
-            print(f"📡 Fetching workers from: {self.api_url}")
+            if delta:
+                roster = await self._fetch_roster(since=self._watermark)
+            else:
+                roster = await self._fetch_roster(conditional=previous is not None)
+        except Exception as e:
+            self.refresh_failures += 1
+            self.last_error = f"{type(e).__name__}: {str(e)}"
+            if previous is not None:
+                print(f"⚠️ Roster refresh failed - serving snapshot v{previous.version} ({previous.age():.0f}s old)")
+            raise
+        
+        if roster is None or (delta and not roster[0]):
+            previous.touch()  # unchanged upstream: keep the snapshot and its version
+            self._start_persist()
+        else:
+            records, workers = self._merge_delta(previous, *roster) if delta else roster
+            self._version += 1
+            self._snapshot = RosterSnapshot(records, workers, self._version)
+            self._start_persist()
+        
+        if not delta:
+            self._last_full_sync = time.monotonic()
+        self._watermark = sync_started
+        self.refreshes += 1
+        self.last_error = None
+        self._refresh_latencies.append(time.perf_counter() - started)
+        return self._snapshot
+    
+    def _merge_delta(
+        self, snapshot: RosterSnapshot, changed_records: List[dict], changed_workers: List[WorkerDetails]
+    ) -> Tuple[List[dict], List[WorkerDetails]]:
+        """
+        Apply changed (or deactivated) worker records on top of a snapshot
+        
+        Returns:
+            Tuple[List[dict], List[WorkerDetails]]: (all raw worker records, active workers)
+        """
+        records_by_id = dict(snapshot.records_by_id)
+        for record in changed_records:
+            records_by_id[normalize_electrician_id(record.get("electricianId", ""))] = record
+        
+        changed = {worker.electricianId: worker for worker in changed_workers}
+        changed_ids = {normalize_electrician_id(record.get("electricianId", "")) for record in changed_records}
+        workers = []
+        for electrician_id, record in records_by_id.items():
+            if electrician_id in changed_ids:
+                worker = changed.get(electrician_id)  # None once deactivated
+            else:
+                worker = snapshot.by_id.get(electrician_id)
+            if worker is not None:
+                workers.append(worker)
+        print(f"🔄 Roster delta: {len(changed_records)} workers changed since {self._watermark}")
+        return list(records_by_id.values()), workers
+    
+    async def load_snapshot(self) -> Optional[RosterSnapshot]:
+        """
+        Load the last good roster persisted on disk (called once at startup)
+        
+        The loaded roster is served straight away, flagged as stale, until
+        the pricing API confirms or replaces it. Missing, unreadable, foreign
+        format or over-age files are ignored.
+        
+        Returns:
+            Optional[RosterSnapshot]: The loaded snapshot, or None
+        """
+        path = settings.roster_snapshot_path
+        if not settings.roster_cache_enabled or not path or self._snapshot is not None:
+            return None
+        started = time.perf_counter()
+        try:
+            loaded = await asyncio.to_thread(self._read_snapshot_file, path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Ignoring roster snapshot {path}: {type(e).__name__}: {str(e)}")
+            return None
+        if loaded is None:
+            return None
+        
+        snapshot, etag, last_modified = loaded
+        if self._snapshot is None:
+            self._snapshot = snapshot
+            self._version = max(self._version, snapshot.version)
+            # Validators let the first refresh come back as a cheap 304 if nothing changed
+            self._etag, self._last_modified = etag, last_modified
+            self.persisted = {"version": snapshot.version, "fetchedAt": snapshot.fetched_at, "path": path}
+            print(
+                f"💾 Loaded roster snapshot v{snapshot.version} from {path}: {len(snapshot.workers)} workers, "
+                f"{snapshot.age():.0f}s old ({(time.perf_counter() - started) * 1000:.0f} ms)"
+            )
+        return self._snapshot
+    
+    def _read_snapshot_file(self, path: str) -> Optional[Tuple[RosterSnapshot, Optional[str], Optional[str]]]:
+        with gzip.open(path, "rb") as f:
+            payload = json.loads(f.read())
+        if payload.get("format") != _SNAPSHOT_FORMAT:
+            print(f"⚠️ Ignoring roster snapshot {path}: format {payload.get('format')}, expected {_SNAPSHOT_FORMAT}")
+            return None
+        age = time.time() - payload["fetchedAt"]
+        if age > settings.roster_snapshot_max_age_seconds:
+            print(f"⚠️ Ignoring roster snapshot {path}: {age:.0f}s old")
+            return None
+        records = payload["records"]
+        workers = self._validate_workers([record for record in records if record.get("isActive", False)])
+        snapshot = RosterSnapshot(records, workers, payload["version"], source="disk", fetched_at=payload["fetchedAt"])
+        return snapshot, payload.get("etag"), payload.get("lastModified")
+    
+    def _start_persist(self) -> Optional[asyncio.Task]:
+        if not settings.roster_snapshot_path:
+            return None
+        return asyncio.create_task(self.persist_snapshot())
+    
+    async def persist_snapshot(self):
+        """
+        Write the current roster to disk if it is newer than the persisted one (errors are logged, not raised)
+        
+        The same roster version is rewritten once it has been re-confirmed
+        upstream for a while, so an unchanged roster doesn't age past
+        ROSTER_SNAPSHOT_MAX_AGE_SECONDS on disk.
+        """
+        async with self._persist_lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.source == "fallback":
+                return
+            if self.persisted is not None and self.persisted["version"] >= snapshot.version:
+                touch_interval = min(_SNAPSHOT_TOUCH_PERSIST_SECONDS, settings.roster_snapshot_max_age_seconds / 2)
+                if snapshot.source != "upstream" or snapshot.fetched_at - self.persisted["fetchedAt"] < touch_interval:
+                    return
+            path = settings.roster_snapshot_path
+            payload = {
+                "format": _SNAPSHOT_FORMAT,
+                "version": snapshot.version,
+                "fetchedAt": snapshot.fetched_at,
+                "etag": self._etag,
+                "lastModified": self._last_modified,
+                "records": list(snapshot.records_by_id.values())
+            }
+            started = time.perf_counter()
+            try:
+                size = await asyncio.to_thread(_write_snapshot_file, path, payload)
+            except Exception as e:
+                print(f"⚠️ Failed to persist roster snapshot to {path}: {type(e).__name__}: {str(e)}")
+                return
+            self.persisted = {
+                "version": snapshot.version,
+                "fetchedAt": snapshot.fetched_at,
+                "path": path,
+                "bytes": size,
+                "writeMs": round((time.perf_counter() - started) * 1000, 1)
+            }
+    
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                pass  # recorded by _refresh; keep serving the last snapshot
+            await asyncio.sleep(settings.roster_ttl_seconds * _REFRESH_AHEAD_FRACTION)
+    
+    def start(self):
+        """Start refreshing the roster snapshot in the background"""
+        if settings.roster_cache_enabled and self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self):
+        """Cancel the background roster refresh"""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+    
+    def stats(self) -> dict:
+        """Get roster snapshot version, age and refresh latency"""
+        snapshot = self._snapshot
+        latencies = sorted(self._refresh_latencies)
+        return {
+            "enabled": settings.roster_cache_enabled,
+            "version": snapshot.version if snapshot else None,
+            "workers": len(snapshot.workers) if snapshot else 0,
+            "locatedWorkers": len(snapshot.geo_index) if snapshot else 0,
+            "ageSeconds": round(snapshot.age(), 1) if snapshot else None,
+            "ttlSeconds": settings.roster_ttl_seconds,
+            "stale": snapshot.is_stale() if snapshot else None,
+            "refreshes": self.refreshes,
+            "refreshFailures": self.refresh_failures,
+            "staleServed": self.stale_served,
+            "lastRefreshMs": round(self._refresh_latencies[-1] * 1000, 1) if latencies else None,
+            "p95RefreshMs": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1) if latencies else None,
+            "lastError": self.last_error,
+            "httpRetries": self.retries,
+            "syncs": dict(self.sync_counts),
+            "bytesTransferred": self.bytes_transferred,
+            "lastSync": self.last_sync,
+            "source": snapshot.source if snapshot else None,
+            "persisted": self.persisted,
+            "lookups": dict(self.lookup_counts)
+        }
+    
+    async def _fetch_roster(
+        self, since: Optional[str] = None, conditional: bool = False
+    ) -> Optional[Tuple[List[dict], List[WorkerDetails]]]:
+        """
+        Fetch the roster from the pricing API
+        
+        Args:
+            since: Only fetch workers changed since this ISO timestamp (`updatedSince` delta)
+            conditional: Send the last full response's ETag / Last-Modified validators
+        
+        Returns:
+            Optional[Tuple[List[dict], List[WorkerDetails]]]: (raw worker records, active workers),
+                or None if the roster is unchanged (304 Not Modified)
+        
+        Raises:
+            Exception: If the API is unreachable or returns an unexpected payload
+        """
+        mode = "delta" if since else "full"
+        params = {"updatedSince": since} if since else None
+        headers = {}
+        if conditional and not since:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+        
+        try:
+            print(f"📡 Fetching workers from: {self.api_url}" + (f" (changed since {since})" if since else ""))
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.api_url)
-                
+            response = await self._get(self.api_url, params=params, headers=headers or None, stream=True)
+            try:
                 print(f"✅ API Response Status: {response.status_code}")
                 
-                response.raise_for_status()
-                
-                # Get the raw response text first to debug
-                raw_data = response.text
-                print(f"📦 Raw response type: {type(raw_data)}")
-                print(f"📦 Raw response preview: {raw_data[:200]}...")
-                
-                # Parse JSON
-                data = response.json()
-                print(f"📊 Parsed data type: {type(data)}")
-                
-                # Handle different response formats
-                if isinstance(data, dict):
-                    # If response is {"data": [...]} format
-                    if "data" in data:
-                        data = data["data"]
-                    # If response is {"workers": [...]} format
-                    elif "workers" in data:
-                        data = data["workers"]
-                    # If response has other wrapper
-                    else:
-                        print(f"📋 Response keys: {data.keys()}")
-                
-                if not isinstance(data, list):
-                    print(f"❌ Unexpected data format: {type(data)}")
-                    print(f"📄 Full response: {data}")
-                    return self._get_fallback_workers()
-                
-                print(f"📊 Total workers in API response: {len(data)}")
-                
-                workers = []
-                
-                for idx, item in enumerate(data):
-                    # Debug each item
-                    print(f"\n   📌 Item {idx + 1} type: {type(item)}")
-                    
-                    if not isinstance(item, dict):
-                        print(f"   ⚠️ Skipping non-dict item: {item}")
-                        continue
-                    
-                    # Skip inactive workers
-                    is_active = item.get("isActive", False)
-                    worker_name = item.get("name", "Unknown")
-                    print(f"   Worker: {worker_name} - Active: {is_active}")
-                    
-                    if not is_active:
-                        continue
-                    
-                    # Get emergencyUplift as a flat amount
-                    emergencyUplift_amount = float(item.get("emergencyUplift", 150.0))
-                    
-                    # Handle electricianId which can be string or ObjectId
-                    electrician_id = item.get("electricianId", "")
-                    if isinstance(electrician_id, dict) and "$oid" in electrician_id:
-                        electrician_id = electrician_id["$oid"]
-                    else:
-                        electrician_id = str(electrician_id)
-                    
-                    print(f"   ✓ Adding worker: {worker_name} (ID: {electrician_id})")
-                    
-                    worker = WorkerDetails(
-                        electricianId=electrician_id,
-                        name=item.get("name", "Unknown Worker"),
-                        email=item.get("email", ""),
-                        location=item.get("location", ""),
-                        description=item.get("description", ""),
-                        hourlyRate=float(item.get("hourlyRate", 100.0)),
-                        callOutFee=float(item.get("callOutFee", 65.0)),
-                        minimum_charge=float(item.get("minimumCharge") or item.get("callOutFee", 65.0)),
-                        emergencyUplift=emergencyUplift_amount
-                    )
-                    workers.append(worker)
-                
-                print(f"\n✅ Successfully loaded {len(workers)} active workers")
-                return workers
+                if response.status_code == 304:
+                    self.sync_counts["notModified"] += 1
+                    self.last_sync = {"mode": "notModified", "bytes": response.num_bytes_downloaded, "parseMs": 0.0, "workers": None}
+                    print("✅ Roster not modified")
+                    return None
                 
+                response.raise_for_status()
+                records, workers, parse_seconds = await self._parse_roster(response)
+            finally:
+                await response.aclose()
+                self.bytes_transferred += response.num_bytes_downloaded
+            
+            print(f"✅ Successfully loaded {len(workers)} active workers ({len(records)} in roster)")
+            
+            if not since:
+                self._etag = response.headers.get("etag")
+                self._last_modified = response.headers.get("last-modified")
+            self.sync_counts[mode] += 1
+            self.last_sync = {
+                "mode": mode,
+                "bytes": response.num_bytes_downloaded,
+                "parseMs": round(parse_seconds * 1000, 1),
+                "workers": len(records)
+            }
+            return records, workers
+            
         except httpx.HTTPError as e:
             print(f"❌ HTTP Error fetching pricing data: {str(e)}")
             print(f"   Status code: {e.response.status_code if hasattr(e, 'response') else 'N/A'}")
-            return self._get_fallback_workers()
+            raise
         except Exception as e:
             print(f"❌ Error fetching pricing data: {str(e)}")
             import traceback
             traceback.print_exc()
-            return self._get_fallback_workers()
+            raise
+    
+    async def _parse_roster(self, response: httpx.Response) -> Tuple[List[dict], List[WorkerDetails], float]:
+        """
+        Parse a streamed roster response
+        
+        The worker array (top-level, or under "data" / "workers") is decoded
+        incrementally as chunks arrive, so the full body is never held as
+        text, and active workers are validated into WorkerDetails in batches.
+        
+        Returns:
+            Tuple[List[dict], List[WorkerDetails], float]: (raw worker records, active workers, CPU seconds spent parsing)
+        
+        Raises:
+            ValueError: If the payload has no worker array or is malformed
+        """
+        parser = JSONArrayStreamParser(keys=("data", "workers"))
+        debug = logger.isEnabledFor(logging.DEBUG)
+        records: List[dict] = []
+        workers: List[WorkerDetails] = []
+        pending: List[dict] = []
+        parse_seconds = 0.0
+        
+        async for chunk in response.aiter_text():
+            started = time.perf_counter()
+            if debug and parser.items_parsed == 0:
+                logger.debug("Roster response chunk preview: %s...", chunk[:200])
+            for item in parser.feed(chunk):
+                if not isinstance(item, dict):
+                    logger.debug("Skipping non-dict roster item: %r", item)
+                    continue
+                records.append(item)
+                if debug:
+                    logger.debug("Roster worker %s - active: %s", item.get("name", "Unknown"), item.get("isActive", False))
+                # Skip inactive workers
+                if item.get("isActive", False):
+                    pending.append(item)
+            if len(pending) >= _VALIDATION_BATCH_SIZE:
+                workers.extend(self._validate_workers(pending))
+                pending = []
+            parse_seconds += time.perf_counter() - started
+        
+        started = time.perf_counter()
+        parser.close()
+        if not parser.found:
+            raise ValueError("Unexpected roster format: no data/workers array")
+        workers.extend(self._validate_workers(pending))
+        parse_seconds += time.perf_counter() - started
+        return records, workers, parse_seconds
+    
+    def _validate_workers(self, items: List[dict]) -> List[WorkerDetails]:
+        """Validate worker records in one pass, dropping (and reporting) any invalid ones"""
+        fields = [self._worker_fields(item) for item in items]
+        try:
+            return _worker_list_adapter.validate_python(fields)
+        except ValidationError:
+            pass
+        
+        workers = []
+        for item_fields in fields:
+            try:
+                workers.append(WorkerDetails.model_validate(item_fields))
+            except ValidationError as e:
+                print(f"⚠️ Skipping invalid worker {item_fields.get('electricianId')}: {e.error_count()} field error(s)")
+        return workers
+    
+    @staticmethod
+    def _worker_fields(item: dict, electrician_id: str = "") -> dict:
+        """Map a pricing API worker record onto WorkerDetails fields"""
+        return {
+            "electricianId": normalize_electrician_id(item.get("electricianId", electrician_id)),
+            "name": item.get("name", "Unknown Worker"),
+            "email": item.get("email", ""),
+            "location": item.get("location", ""),
+            "description": item.get("description", ""),
+            "hourlyRate": item.get("hourlyRate", 100.0),
+            "callOutFee": item.get("callOutFee", 65.0),
+            "minimum_charge": item.get("minimumCharge") or item.get("callOutFee", 65.0),
+            # emergencyUplift is a flat amount
+            "emergencyUplift": item.get("emergencyUplift", 150.0)
+        }
+    
+    @classmethod
+    def _worker_from_item(cls, item: dict, electrician_id: str = "") -> WorkerDetails:
+        """Build WorkerDetails from a pricing API worker record"""
+        return WorkerDetails.model_validate(cls._worker_fields(item, electrician_id))
     
     async def get_worker_by_email(self, email: str) -> Optional[WorkerDetails]:
         """
-        Fetch a specific worker by email
+        Look up an active worker by email in the roster snapshot
         
         Args:
             email: Worker's email address
@@ -121,16 +763,17 @@ class PricingService:
         Returns:
             Optional[WorkerDetails]: Worker details or None if not found
         """
-        workers = await self.get_all_workers()
-        for worker in workers:
-            if worker.email.lower() == email.lower():
-                return worker
-        return None
+        snapshot = await self.get_snapshot()
+        if snapshot is None:
+            return next((w for w in self._get_fallback_workers() if normalize_email(w.email) == normalize_email(email)), None)
+        return snapshot.by_email.get(normalize_email(email))
     
     async def get_worker_by_id(self, electrician_id: str) -> Optional[WorkerDetails]:
         """
-        Fetch a specific worker by electricianId directly from the API
-        Falls back to searching all workers if direct fetch fails.
+        Get a specific worker by electricianId
+        
+        Answered from the roster snapshot while it is fresh; otherwise fetched
+        directly from the API, falling back to the (stale) snapshot if that fails.
         
         Args:
             electrician_id: Worker's electrician ID
@@ -138,68 +781,127 @@ class PricingService:
         Returns:
             Optional[WorkerDetails]: Worker details or None if not found
         """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.is_fresh():
+            return self._worker_from_snapshot(snapshot, electrician_id)
+        
         try:
-            # Build single-worker URL: base URL replace /all with /{id}
-            base = self.api_url.rstrip("/")
-            if base.endswith("/all"):
-                base = base[:-4]
-            single_url = f"{base}/{electrician_id}"
-            
-            print(f"📡 Fetching single worker from: {single_url}")
-            
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(single_url)
-                response.raise_for_status()
-                data = response.json()
-            
-            # Handle {"success": true, "data": {...}} format
-            item = data.get("data", data) if isinstance(data, dict) else data
-            
-            if not isinstance(item, dict):
+            item = await self._fetch_worker_item(electrician_id)
+            if item is None:
                 raise ValueError("Unexpected response format")
-            
-            emergencyUplift_amount = float(item.get("emergencyUplift", 150.0))
-            
-            return WorkerDetails(
-                electricianId=str(item.get("electricianId", electrician_id)),
-                name=item.get("name", "Unknown"),
-                email=item.get("email", ""),
-                location=item.get("location", ""),
-                description=item.get("description", ""),
-                hourlyRate=float(item.get("hourlyRate", 100.0)),
-                callOutFee=float(item.get("callOutFee", 65.0)),
-                minimum_charge=float(item.get("minimumCharge") or item.get("callOutFee", 65.0)),
-                emergencyUplift=emergencyUplift_amount
-            )
+            return self._worker_from_item(item, electrician_id)
         except Exception as e:
-            print(f"⚠️ Direct fetch failed ({e}), falling back to search all workers")
-            workers = await self.get_all_workers()
-            for worker in workers:
-                if worker.electricianId == electrician_id:
-                    return worker
-            return None
+            print(f"⚠️ Direct fetch failed ({e}), falling back to the roster snapshot")
+            snapshot = await self.get_snapshot()
+            if snapshot is None:
+                return None
+            return self._worker_from_snapshot(snapshot, electrician_id)
+    
+    def _worker_from_snapshot(self, snapshot: RosterSnapshot, electrician_id: str) -> Optional[WorkerDetails]:
+        worker = snapshot.by_id.get(electrician_id)
+        if worker is None and electrician_id in snapshot.records_by_id:
+            # Inactive workers are not quoted to customers but can still be looked up
+            worker = self._worker_from_item(snapshot.records_by_id[electrician_id], electrician_id)
+        return worker
     
     async def get_raw_worker_by_id(self, electrician_id: str) -> Optional[dict]:
         """
-        Fetch raw worker data dict by electricianId (for search endpoint)
+        Get raw worker data dict by electricianId (for search endpoint)
+        
+        Answered from the roster snapshot while it is fresh, otherwise fetched
+        directly from the API.
         """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.is_fresh():
+            return snapshot.records_by_id.get(electrician_id)
+        
         try:
-            base = self.api_url.rstrip("/")
-            if base.endswith("/all"):
-                base = base[:-4]
-            single_url = f"{base}/{electrician_id}"
-            
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(single_url)
-                response.raise_for_status()
-                data = response.json()
-            
-            item = data.get("data", data) if isinstance(data, dict) else data
-            return item if isinstance(item, dict) else None
+            return await self._fetch_worker_item(electrician_id)
         except Exception as e:
             print(f"❌ Error fetching raw worker: {e}")
             return None
     
+    async def get_raw_workers_by_ids(self, electrician_ids: List[str]) -> Tuple[Dict[str, dict], List[str], List[str]]:
+        """
+        Get raw worker data for many electricianIds at once (for the bulk lookup endpoint)
+        
+        Ids in the roster snapshot are answered from it (a stale snapshot is
+        refreshed in the background); the rest are fetched from the
+        single-worker endpoint concurrently, at most
+        PRICING_API_LOOKUP_CONCURRENCY at a time over the shared pool.
+        
+        Args:
+            electrician_ids: Ids to look up (duplicates are looked up once)
+            
+        Returns:
+            Tuple[Dict[str, dict], List[str], List[str]]: (raw worker data by id in request order,
+                ids the pricing API doesn't know, ids whose fetch failed)
+        """
+        ids = list(dict.fromkeys(electrician_id.strip() for electrician_id in electrician_ids))
+        snapshot = await self.get_snapshot()
+        records = snapshot.records_by_id if snapshot is not None else {}
+        # Ids that could not be an electricianId are reported missing, never sent upstream
+        misses = [
+            electrician_id for electrician_id in ids
+            if electrician_id not in records and _ELECTRICIAN_ID_RE.fullmatch(electrician_id)
+        ]
+        
+        semaphore = asyncio.Semaphore(settings.pricing_api_lookup_concurrency)
+        
+        async def fetch(electrician_id: str) -> Tuple[Optional[dict], bool]:
+            async with semaphore:
+                try:
+                    return await self._fetch_worker_item(electrician_id), False
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code == 404:
+                        return None, False
+                    print(f"❌ Error fetching raw worker {electrician_id}: {e}")
+                    return None, True
+                except Exception as e:
+                    print(f"❌ Error fetching raw worker {electrician_id}: {e}")
+                    return None, True
+        
+        fetched = dict(zip(misses, await asyncio.gather(*(fetch(electrician_id) for electrician_id in misses))))
+        self.lookup_counts["cacheHits"] += len(ids) - len(misses)
+        self.lookup_counts["fetched"] += len(misses)
+        
+        found: Dict[str, dict] = {}
+        missing: List[str] = []
+        failed: List[str] = []
+        for electrician_id in ids:
+            if electrician_id in records:
+                found[electrician_id] = records[electrician_id]
+                continue
+            item, error = fetched.get(electrician_id, (None, False))
+            if item is not None:
+                found[electrician_id] = item
+            elif error:
+                failed.append(electrician_id)
+            else:
+                missing.append(electrician_id)
+        return found, missing, failed
+    
+    async def _fetch_worker_item(self, electrician_id: str) -> Optional[dict]:
+        """Fetch one worker record from the single-worker endpoint (None if the payload is not a dict)"""
+        if not _ELECTRICIAN_ID_RE.fullmatch(electrician_id):
+            raise ValueError(f"Invalid electricianId: {electrician_id!r}")
+        
+        # Build single-worker URL: base URL replace /all with /{id}
+        base = self.api_url.rstrip("/")
+        if base.endswith("/all"):
+            base = base[:-4]
+        single_url = f"{base}/{electrician_id}"
+        
+        print(f"📡 Fetching single worker from: {single_url}")
+        
+        response = await self._get(single_url)
+        response.raise_for_status()
+        data = response.json()
+        
+        # Handle {"success": true, "data": {...}} format
+        item = data.get("data", data) if isinstance(data, dict) else data
+        return item if isinstance(item, dict) else None
+    
     def _get_fallback_workers(self) -> List[WorkerDetails]:
         """
         Provide fallback worker data if API is unavailable
@@ -1,7 +1,93 @@
 
+import math
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
 from app.config import settings
 from app.models import QuoteBreakdown, WorkerDetails
 
+if TYPE_CHECKING:
+    from app.services.pricing_service import RosterColumns
+
+def _two_product(a: np.ndarray, b: float):
+    """a * b as p + e exactly (Dekker), where p is the rounded float product"""
+    p = a * b
+    split = 134217729.0  # 2**27 + 1
+    t = split * a
+    a_hi = t - (t - a)
+    a_lo = a - a_hi
+    t = split * b
+    b_hi = t - (t - b)
+    b_lo = b - b_hi
+    e = ((a_hi * b_hi - p) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo
+    return p, e
+
+def round_half_even_exact(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    Round like Python's round() (exact binary value, ties to even), vectorised
+    
+    np.round scales by 10**ndigits first, which can tip values lying within
+    float error of a half the wrong way. For those, the exact product
+    values * 2 * 10**ndigits is compared against the odd integer marking the
+    half, so every element rounds to the same float round() would return.
+    """
+    scale = 10.0 ** ndigits
+    rounded = np.round(values, ndigits)
+    floor = np.floor(values * scale)
+    near_half = np.abs(values * scale - floor - 0.5) < 1e-6
+    if near_half.any():
+        floor = floor[near_half]
+        product, error = _two_product(values[near_half], 2 * scale)
+        above = (product - (2 * floor + 1)) + error
+        up = (above > 0) | ((above == 0) & (floor % 2 == 1))
+        rounded[near_half] = (floor + up) / scale
+    return rounded
+
+class BulkQuotes:
+    """Quote components for every worker in a roster, as arrays aligned with its rows"""
+    
+    def __init__(
+        self,
+        estimatedHours: float,
+        hourlyRate: np.ndarray,
+        callOutFee: np.ndarray,
+        labourCost: np.ndarray,
+        emergencyUplift: Optional[np.ndarray],
+        minimumCharge: np.ndarray,
+        totalQuote: np.ndarray
+    ):
+        self.estimatedHours = estimatedHours
+        self.hourlyRate = hourlyRate
+        self.callOutFee = callOutFee
+        self.labourCost = labourCost
+        # NaN where the worker has no uplift (None in the scalar quote); None for non-emergency jobs
+        self.emergencyUplift = emergencyUplift
+        self.minimumCharge = minimumCharge
+        self.totalQuote = totalQuote
+    
+    def __len__(self) -> int:
+        return len(self.totalQuote)
+    
+    def rows(self, indices: Iterable[int]) -> Iterator[dict]:
+        """
+        Quote fields for the given rows, as calculate_quote_for_worker returns them
+        
+        Yields:
+            dict: estimatedHours, hourlyRate, callOutFee, labourCost, emergencyUplift, minimumCharge, totalQuote
+        """
+        # Gather the rows with numpy first so the Python floats are built (and read) in order
+        indices = np.asarray(indices, dtype=np.intp)
+        names = ("hourlyRate", "callOutFee", "labourCost", "minimumCharge", "totalQuote")
+        columns = [getattr(self, name)[indices].tolist() for name in names]
+        if self.emergencyUplift is not None:
+            uplifts = [None if math.isnan(uplift) else uplift for uplift in self.emergencyUplift[indices].tolist()]
+        else:
+            uplifts = [None] * len(indices)
+        for values, uplift in zip(zip(*columns), uplifts):
+            row = dict(zip(names, values))
+            row["emergencyUplift"] = uplift
+            row["estimatedHours"] = self.estimatedHours
+            yield row
+
 class QuoteService:
     """Service for calculating quote prices"""
     
@@ -61,6 +147,107 @@ class QuoteService:
             "totalQuote": round(totalQuote, 2)
         }
     
+    def calculate_quotes_bulk(
+        self,
+        columns: "RosterColumns",
+        estimatedHours: float,
+        is_emergency: bool = False
+    ) -> BulkQuotes:
+        """
+        Calculate quotes for every worker in a roster in one vectorised pass
+        
+        Gives exactly the values calculate_quote_for_worker returns for each
+        worker (same float operations and rounding).
+        
+        Args:
+            columns: Roster pricing columns
+            estimatedHours: AI-estimated hours for the job
+            is_emergency: Whether this is an emergency job
+            
+        Returns:
+            BulkQuotes: Rounded quote components, one row per worker
+        """
+        labourCost = estimatedHours * columns.hourly_rate
+        totalQuote = columns.call_out_fee + labourCost
+        
+        emergencyUplift = None
+        if is_emergency:
+            has_uplift = columns.emergency_uplift != 0
+            totalQuote = np.where(has_uplift, totalQuote + columns.emergency_uplift, totalQuote)
+            emergencyUplift = np.where(has_uplift, round_half_even_exact(columns.emergency_uplift, 2), np.nan)
+        
+        # Enforce minimum charge: if total < minimum_charge, use minimum_charge as final total
+        minimum_charge = columns.minimum_charge
+        below_minimum = (minimum_charge > 0) & (totalQuote < minimum_charge)
+        if below_minimum.any():
+            print(f"⚡ Minimum charge applied for {int(below_minimum.sum())} of {len(columns)} workers")
+            totalQuote = np.where(below_minimum, minimum_charge, totalQuote)
+        
+        return BulkQuotes(
+            estimatedHours=round(estimatedHours, 1),
+            hourlyRate=round_half_even_exact(columns.hourly_rate, 2),
+            callOutFee=round_half_even_exact(columns.call_out_fee, 2),
+            labourCost=round_half_even_exact(labourCost, 2),
+            emergencyUplift=emergencyUplift,
+            minimumCharge=round_half_even_exact(minimum_charge, 2),
+            totalQuote=round_half_even_exact(totalQuote, 2)
+        )
+    
+    def select_cheapest(
+        self,
+        quotes: BulkQuotes,
+        columns: "RosterColumns",
+        limit: int,
+        offset: int = 0,
+        max_price: Optional[float] = None,
+        location: Optional[str] = None,
+        after: Optional[Tuple[float, str]] = None
+    ) -> Tuple[List[int], int, bool]:
+        """
+        Pick one page of quotes, cheapest first, without sorting the whole roster
+        
+        Rows are ordered by total quote, then electricianId. Only the first
+        offset + limit matching rows are sorted; the rest are cut off with a
+        partial selection (np.partition) over the totals.
+        
+        Args:
+            quotes: Quotes for every roster row
+            columns: Roster pricing columns (tie-break and location keys)
+            limit: Page size
+            offset: Matching rows to skip (after the cursor, if given)
+            max_price: Only quotes with a total at or below this
+            location: Only workers whose location contains this text
+            after: (totalQuote, electricianId) of the previous page's last quote
+            
+        Returns:
+            tuple: (row indices for the page, rows matching the filters, whether more rows follow)
+        """
+        total = quotes.totalQuote
+        matching = np.ones(len(total), dtype=bool)
+        if max_price is not None:
+            matching &= total <= max_price
+        if location:
+            matching &= columns.location_mask(location)
+        matched = int(matching.sum())
+        
+        if after is not None:
+            after_total, after_id = after
+            matching &= (total > after_total) | ((total == after_total) & (columns.id_rank >= columns.rank_after(after_id)))
+        candidates = np.flatnonzero(matching)
+        
+        wanted = offset + limit
+        if len(candidates) > wanted:
+            # Everything priced above the wanted-th cheapest total can't be on the page
+            candidate_totals = total[candidates]
+            cutoff = np.partition(candidate_totals, wanted - 1)[wanted - 1]
+            has_more = True
+            candidates = candidates[candidate_totals <= cutoff]
+        else:
+            has_more = False
+        
+        ordered = candidates[np.lexsort((columns.id_rank[candidates], total[candidates]))]
+        return ordered[offset:wanted].tolist(), matched, has_more
+    
     def calculate_quote(
         self, 
         estimatedHours: float, 
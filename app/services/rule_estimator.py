@@ -0,0 +1,322 @@
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+# Keyword -> tag. Matching is substring-based (as the original keyword chains were),
+# so "downlights" also tags "lighting" via "light".
+_KEYWORD_TAGS: Dict[str, str] = {}
+
+def _register(tag: str, keywords: List[str]):
+    for keyword in keywords:
+        _KEYWORD_TAGS[keyword] = tag
+
+# Quantity / scope modifiers
+_register("qty_few", ["few", "a few"])
+_register("qty_several", ["several"])
+_register("qty_whole", ["throughout", "whole house", "entire house", "full house"])
+_register("bed_1", ["1 bed", "1-bed", "one bed", "flat", "apartment"])
+_register("bed_2", ["2 bed", "2-bed", "two bed"])
+_register("bed_3", ["3 bed", "3-bed", "three bed"])
+_register("bed_4", ["4 bed", "4-bed", "four bed"])
+
+# Job categories
+_register("rewire", ["rewire", "full rewire", "complete rewire"])
+_register("consumer_unit", ["consumer unit", "fuse box", "fuse board", "distribution board", "fuseboard"])
+_register("ev_charger", ["ev charger", "electric vehicle", "car charger"])
+_register("eicr", ["eicr", "inspection", "electrical report", "condition report"])
+_register("socket", ["socket", "plug", "outlet", "power point"])
+_register("downlight", ["downlight", "spotlight", "recessed light", "can light"])
+_register("lighting", ["light", "lighting", "bulb", "fitting", "fixture", "led"])
+_register("switch", ["switch", "dimmer"])
+_register("fault", ["fault", "tripping", "trip", "not working", "no power", "dead"])
+_register("outdoor", ["outdoor", "garden", "external", "outside", "security light"])
+_register("new_circuit", ["new circuit", "extra circuit", "additional circuit"])
+
+# Confidence modifiers (not used for hours)
+_register("extra_scope", [" and ", " also ", " plus ", " as well", " & ", " + ", ",", ";"])
+_register("uncertain", [
+    "?", "not sure", "maybe", "might", "possibly", "unsure", "relocate", "move ", "extend",
+    "extension", "burning", "smell", "spark", "shock", "water", "smoke"
+])
+
+_MODIFIER_TAGS = {"qty_few", "qty_several", "qty_whole", "bed_1", "bed_2", "bed_3", "bed_4", "extra_scope", "uncertain"}
+
+def _trie_pattern(words: List[str]) -> str:
+    """Build a prefix-factored alternation so the regex branches on one character at a time"""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        alternation = "(?:" + "|".join(branches) + ")"
+        return alternation + "?" if "" in node else alternation
+
+    return build(trie)
+
+# One compiled pass over the text. The lookahead makes matches zero-width so
+# overlapping keywords ("downlight" and "light") are all reported, and the
+# greedy trie picks the longest keyword at each position. No two keywords in
+# different tags share a start where one is a prefix of the other.
+_KEYWORD_RE = re.compile("(?=(" + _trie_pattern(list(_KEYWORD_TAGS)) + "))")
+
+# A number only counts as the job's quantity when it qualifies the matched keyword,
+# optionally through one word ("6 sockets", "4 led downlights"), so house and
+# flat numbers ("flat 12", "10 Downing Street") are never read as quantities
+def _quantity_pattern(tag: str) -> "re.Pattern[str]":
+    keywords = sorted((k for k, t in _KEYWORD_TAGS.items() if t == tag), key=len, reverse=True)
+    return re.compile(r"\b(\d+)\s+(?:[a-z0-9-]+\s+)?(?:" + "|".join(map(re.escape, keywords)) + ")")
+
+_QUANTITY_RES = {tag: _quantity_pattern(tag) for tag in set(_KEYWORD_TAGS.values()) - _MODIFIER_TAGS}
+
+def _tiered(quantity: int, tiers: List[Tuple[Optional[int], float, str]]) -> Tuple[float, str]:
+    """Pick (hours, complexity) from quantity tiers of (max_quantity, hours, complexity)"""
+    for max_quantity, hours, complexity in tiers:
+        if max_quantity is None or quantity <= max_quantity:
+            return hours, complexity
+    return tiers[-1][1], tiers[-1][2]
+
+# Benchmark rules in priority order. Each rule gives either quantity "tiers" of
+# (max_quantity, hours, complexity) or a "fixed" estimate; "related" tags are not
+# treated as a competing job when scoring confidence.
+_RULES = [
+    {
+        "name": "rewire",
+        "label": "Full / whole-house rewire",
+        "tag": "rewire",
+        "base_confidence": 0.75,
+        "related": set(),
+        "actions": ["Survey property before quoting", "Plan consumer unit upgrade", "Arrange EICR on completion"]
+    },
+    {
+        "name": "consumer_unit",
+        "label": "Replace consumer unit / fuse board",
+        "tag": "consumer_unit",
+        "base_confidence": 0.85,
+        "related": set(),
+        "fixed": (7.0, "complex"),
+        "actions": ["Check earthing and bonding", "Issue electrical installation certificate"]
+    },
+    {
+        "name": "ev_charger",
+        "label": "Install EV charger (standard)",
+        "tag": "ev_charger",
+        "base_confidence": 0.85,
+        "related": {"outdoor"},
+        "fixed": (3.5, "moderate"),
+        "actions": ["Confirm supply capacity", "Notify DNO of installation"]
+    },
+    {
+        "name": "eicr",
+        "label": "Electrical inspection (EICR)",
+        "tag": "eicr",
+        "base_confidence": 0.8,
+        "related": set(),
+        "fixed": (5.0, "moderate"),
+        "actions": ["Confirm property size", "Allow access to all rooms"]
+    },
+    {
+        "name": "socket",
+        "label": "Replace / install sockets",
+        "tag": "socket",
+        "base_confidence": 0.7,
+        "related": set(),
+        "tiers": [(1, 0.5, "simple"), (4, 1.0, "simple"), (8, 1.5, "simple"), (12, 2.5, "moderate"), (None, 4.0, "moderate")],
+        "actions": ["Isolate circuit before work", "Test sockets after installation"]
+    },
+    {
+        "name": "downlight",
+        "label": "Install LED downlights",
+        "tag": "downlight",
+        "base_confidence": 0.7,
+        "related": {"lighting"},
+        "tiers": [(2, 1.0, "simple"), (5, 2.0, "moderate"), (10, 3.0, "moderate"), (20, 4.5, "moderate"), (None, 6.0, "complex")],
+        "actions": ["Verify ceiling access", "Check fire-rated fittings where required"]
+    },
+    {
+        "name": "lighting",
+        "label": "Replace / install light fittings",
+        "tag": "lighting",
+        "base_confidence": 0.7,
+        "related": set(),
+        "tiers": [(1, 0.5, "simple"), (4, 1.5, "simple"), (8, 2.5, "moderate"), (None, 4.0, "moderate")],
+        "actions": ["Check fitting compatibility", "Test lighting circuit after installation"]
+    },
+    {
+        "name": "switch",
+        "label": "Replace switches / dimmers",
+        "tag": "switch",
+        "base_confidence": 0.7,
+        "related": set(),
+        "tiers": [(2, 0.5, "simple"), (6, 1.0, "simple"), (None, 2.0, "moderate")],
+        "actions": ["Isolate circuit before work", "Check dimmer compatibility with lamps"]
+    },
+    {
+        "name": "fault",
+        "label": "Fault finding and repair",
+        "tag": "fault",
+        "base_confidence": 0.5,
+        "related": set(),
+        "fixed": (2.5, "moderate"),
+        "actions": ["Gather fault history from customer", "Insulation resistance testing"]
+    },
+    {
+        "name": "outdoor",
+        "label": "Outdoor / garden electrical work",
+        "tag": "outdoor",
+        "base_confidence": 0.5,
+        "related": {"lighting"},
+        "fixed": (2.5, "moderate"),
+        "actions": ["Use IP-rated fittings", "Confirm RCD protection"]
+    },
+    {
+        "name": "new_circuit",
+        "label": "Install a new circuit",
+        "tag": "new_circuit",
+        "base_confidence": 0.8,
+        "related": set(),
+        "fixed": (3.5, "moderate"),
+        "actions": ["Check consumer unit capacity", "Issue minor works certificate"]
+    },
+]
+
+# Rewires and complex jobs are multi-day or safety-critical; their confidence stays
+# below the default RULE_FAST_PATH_THRESHOLD so they always go to OpenAI
+_COMPLEX_MAX_CONFIDENCE = 0.8
+
+_DEFAULT_RULE = {
+    "name": "default",
+    "label": "General electrical work",
+    "tag": None,
+    "base_confidence": 0.0,
+    "related": set(),
+    "fixed": (3.0, "moderate"),
+    "actions": ["Site visit recommended for accurate quote", "Electrical safety testing required"]
+}
+
+class RuleEstimator:
+    """
+    Deterministic UK-benchmark estimator compiled from keyword rules.
+
+    Keyword detection is a single compiled-regex pass; the first matching
+    rule (in benchmark priority order) gives hours and complexity, and a
+    confidence score reflects how unambiguous the description is.
+    """
+
+    def __init__(self):
+        self.evaluations = 0
+        self.rule_matches: Dict[str, int] = {rule["name"]: 0 for rule in _RULES + [_DEFAULT_RULE]}
+        self.fast_path_answers: Dict[str, int] = {rule["name"]: 0 for rule in _RULES + [_DEFAULT_RULE]}
+
+    def evaluate(self, job_description: str) -> dict:
+        """
+        Match a description against the benchmark rules
+
+        Args:
+            job_description: The electrical work description
+
+        Returns:
+            dict: rule, label, quantity, estimatedHours, jobComplexity,
+                  confidence (0-1) and recommendedActions
+        """
+        description_lower = job_description.lower()
+        tags: Set[str] = {_KEYWORD_TAGS[m.group(1)] for m in _KEYWORD_RE.finditer(description_lower)}
+
+        rule = next((r for r in _RULES if r["tag"] in tags), _DEFAULT_RULE)
+
+        # --- Quantity detection ---
+        quantity = 1
+        number_match = _QUANTITY_RES[rule["tag"]].search(description_lower) if rule["tag"] else None
+        if number_match:
+            quantity = int(number_match.group(1))
+        elif "qty_few" in tags:
+            quantity = 3
+        elif "qty_several" in tags:
+            quantity = 6
+        elif "qty_whole" in tags:
+            quantity = 99  # signals whole-house scope
+
+        # --- Whole-house scope overrides the keyword rule ---
+        if quantity == 99:
+            rule = _RULES[0]
+
+        if rule["name"] == "rewire":
+            if "bed_1" in tags:
+                hours, complexity = 12.0, "complex"
+            elif "bed_2" in tags:
+                hours, complexity = 16.0, "complex"
+            elif "bed_3" in tags:
+                hours, complexity = 24.0, "complex"
+            elif "bed_4" in tags:
+                hours, complexity = 32.0, "complex"
+            else:
+                hours, complexity = 20.0, "complex"
+        elif "tiers" in rule:
+            hours, complexity = _tiered(quantity, rule["tiers"])
+        else:
+            hours, complexity = rule["fixed"]
+
+        self.evaluations += 1
+        self.rule_matches[rule["name"]] += 1
+
+        return {
+            "rule": rule["name"],
+            "label": rule["label"],
+            "quantity": quantity,
+            "estimatedHours": hours,
+            "jobComplexity": complexity,
+            "confidence": self._confidence(rule, tags, number_match is not None, description_lower, complexity),
+            "recommendedActions": list(rule["actions"])
+        }
+
+    @staticmethod
+    def _confidence(rule: dict, tags: Set[str], explicit_quantity: bool, description_lower: str, complexity: str) -> float:
+        """Score how safely the rule answer can stand in for an LLM estimate (0-1)"""
+        if rule["tag"] is None:
+            return 0.0
+
+        confidence = rule["base_confidence"]
+        if "tiers" in rule and explicit_quantity:
+            confidence += 0.25
+        if rule["name"] == "rewire" and tags & {"bed_1", "bed_2", "bed_3", "bed_4"}:
+            confidence += 0.15
+
+        competing = tags - _MODIFIER_TAGS - rule["related"] - {rule["tag"]}
+        confidence -= 0.25 * len(competing)
+        if "extra_scope" in tags:
+            confidence -= 0.2
+        if "uncertain" in tags:
+            confidence -= 0.3
+
+        words = description_lower.count(" ") + 1
+        if words > 25:
+            confidence -= 0.3
+        elif words > 12:
+            confidence -= 0.15
+
+        ceiling = _COMPLEX_MAX_CONFIDENCE if rule["name"] == "rewire" or complexity == "complex" else 1.0
+        return round(max(0.0, min(ceiling, confidence)), 2)
+
+    def record_fast_path(self, rule_name: str):
+        """Count an estimate answered locally by a rule"""
+        self.fast_path_answers[rule_name] = self.fast_path_answers.get(rule_name, 0) + 1
+
+    def stats(self) -> dict:
+        """Get per-rule match and fast-path counters"""
+        return {
+            "evaluations": self.evaluations,
+            "fastPathAnswers": sum(self.fast_path_answers.values()),
+            "rules": {
+                name: {"matches": self.rule_matches[name], "fastPath": self.fast_path_answers[name]}
+                for name in self.rule_matches
+            }
+        }
+
+# Create singleton instance
+rule_estimator = RuleEstimator()
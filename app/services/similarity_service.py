@@ -0,0 +1,293 @@
+import asyncio
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from app.config import settings
+from app.services.database_service import database_service
+from app.utils.helpers import normalize_job_description
+
+_COMPLEXITIES = ("simple", "moderate", "complex")
+
+class HashedNgramIndex:
+    """
+    In-memory cosine-similarity index over job descriptions.
+
+    Each normalised description becomes a signed, hashed bag of word unigrams
+    and bigrams in a fixed-width float32 vector (L2-normalised), so a query is
+    one matrix-vector product. Repeated descriptions share a row that keeps
+    the quote count, summed hours and complexity counts.
+
+    Refreshes add rows from a worker thread while estimates search from
+    the event loop, so add and search hold a lock.
+    """
+
+    def __init__(self, dimensions: int, initial_capacity: int = 1024):
+        self.dimensions = dimensions
+        self.rows = 0
+        self.quotes = 0
+        self.descriptions: List[str] = []
+        self._row_by_text: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self._vectors = np.zeros((initial_capacity, dimensions), dtype=np.float32)
+        self._hours_sum = np.zeros(initial_capacity, dtype=np.float64)
+        self._counts = np.zeros(initial_capacity, dtype=np.int32)
+        self._complexity_counts = np.zeros((initial_capacity, len(_COMPLEXITIES)), dtype=np.int32)
+
+    def vectorize(self, normalised: str) -> np.ndarray:
+        """Hash unigrams and bigrams of a normalised description into a unit vector"""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        tokens = normalised.split()
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            h = zlib.crc32(feature.encode())
+            vector[h % self.dimensions] += 1.0 if h & 0x80000000 else -1.0
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def add(self, normalised: str, hours: float, complexity: str):
+        """Add one quote's outcome, creating a row for a new description"""
+        vector = self.vectorize(normalised) if normalised not in self._row_by_text else None
+        with self._lock:
+            row = self._row_by_text.get(normalised)
+            is_new = row is None
+            if is_new:
+                row = self.rows
+                if row == len(self._counts):
+                    self._grow()
+                self._vectors[row] = vector if vector is not None else self.vectorize(normalised)
+                self._row_by_text[normalised] = row
+                self.descriptions.append(normalised)
+
+            self._hours_sum[row] += hours
+            self._counts[row] += 1
+            if complexity in _COMPLEXITIES:
+                self._complexity_counts[row, _COMPLEXITIES.index(complexity)] += 1
+            self.quotes += 1
+            # A new row only becomes visible to search once its counts are in place
+            if is_new:
+                self.rows += 1
+
+    def _grow(self):
+        capacity = len(self._counts) * 2
+        for name in ("_vectors", "_hours_sum", "_counts", "_complexity_counts"):
+            current = getattr(self, name)
+            grown = np.zeros((capacity,) + current.shape[1:], dtype=current.dtype)
+            grown[:self.rows] = current[:self.rows]
+            setattr(self, name, grown)
+
+    def search(self, normalised: str, top_k: int) -> List[dict]:
+        """
+        Find the most similar stored descriptions
+
+        Args:
+            normalised: Normalised query description
+            top_k: Maximum number of neighbours
+
+        Returns:
+            List[dict]: Neighbours (best first) with description, similarity,
+                        quotes, averageHours and complexity
+        """
+        query = self.vectorize(normalised)
+        with self._lock:
+            if self.rows == 0:
+                return []
+
+            scores = self._vectors[:self.rows] @ query
+            k = min(top_k, self.rows)
+            top = np.argpartition(scores, -k)[-k:]
+            top = top[np.argsort(scores[top])[::-1]]
+
+            return [
+                {
+                    "description": self.descriptions[row],
+                    "similarity": float(scores[row]),
+                    "quotes": int(self._counts[row]),
+                    "averageHours": float(self._hours_sum[row] / self._counts[row]),
+                    "complexityCounts": self._complexity_counts[row].tolist()
+                }
+                for row in top
+            ]
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the index arrays and description strings"""
+        arrays = self._vectors.nbytes + self._hours_sum.nbytes + self._counts.nbytes + self._complexity_counts.nbytes
+        return arrays + sum(len(text) + 49 for text in self.descriptions)
+
+class SimilarityService:
+    """
+    Nearest-neighbour hours estimator trained on accepted quotes.
+
+    The index is built from the `quotes` collection at startup, then kept
+    up to date by a background task that pulls newly accepted quotes since
+    the last watermark and, less often, rebuilds from scratch so edits to
+    quotes already indexed are picked up and deleted or expired quotes
+    drop out.
+    """
+
+    def __init__(self):
+        self.index = HashedNgramIndex(settings.similarity_dimensions)
+        self._seen_quote_ids: Set[str] = set()
+        self._watermark: Optional[datetime] = None
+        self._last_rebuild = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+        self.last_refresh_at: Optional[float] = None
+        self.last_build_seconds: Optional[float] = None
+        self.queries = 0
+        self.answered = 0
+        self.query_seconds = 0.0
+
+    def add_quotes(self, quotes: Iterable[Tuple[str, str, float, str]], index: Optional[HashedNgramIndex] = None, seen: Optional[Set[str]] = None) -> int:
+        """
+        Add (quote_id, job_description, estimatedHours, jobComplexity) records
+
+        Quotes already in the index are skipped, so overlapping refreshes are safe.
+
+        Returns:
+            int: Number of quotes added
+        """
+        index = self.index if index is None else index
+        seen = self._seen_quote_ids if seen is None else seen
+        added = 0
+        for quote_id, description, hours, complexity in quotes:
+            if quote_id in seen or not description or not hours or hours <= 0:
+                continue
+            seen.add(quote_id)
+            index.add(normalize_job_description(description), float(hours), complexity)
+            added += 1
+        return added
+
+    def estimate(self, job_description: str) -> Optional[dict]:
+        """
+        Answer an estimate from close past quotes
+
+        Args:
+            job_description: The electrical work description
+
+        Returns:
+            Optional[dict]: estimatedHours, jobComplexity, reasoning and
+                            neighbours, or None if there are not enough close matches
+        """
+        started = time.perf_counter()
+        neighbours = [
+            n for n in self.index.search(normalize_job_description(job_description), settings.similarity_top_k)
+            if n["similarity"] >= settings.similarity_threshold
+        ]
+        self.queries += 1
+        self.query_seconds += time.perf_counter() - started
+
+        quotes = sum(n["quotes"] for n in neighbours)
+        if quotes < settings.similarity_min_quotes:
+            return None
+
+        # Weight each neighbour by similarity and by how many quotes back it
+        weights = [n["similarity"] * n["quotes"] for n in neighbours]
+        hours = sum(w * n["averageHours"] for w, n in zip(weights, neighbours)) / sum(weights)
+        complexity_votes = Counter()
+        for w, n in zip(weights, neighbours):
+            for name, count in zip(_COMPLEXITIES, n["complexityCounts"]):
+                complexity_votes[name] += w * count / n["quotes"]
+
+        self.answered += 1
+        matches = "; ".join(
+            f"'{n['description'][:60]}' ({n['averageHours']:.1f}h over {n['quotes']} quotes, {n['similarity']:.0%} match)"
+            for n in neighbours[:3]
+        )
+        return {
+            "estimatedHours": round(hours, 1),
+            "jobComplexity": complexity_votes.most_common(1)[0][0] if complexity_votes else "moderate",
+            "reasoning": f"Based on {quotes} accepted quotes for similar jobs: {matches}",
+            "neighbours": neighbours
+        }
+
+    async def refresh(self, full: bool = False) -> int:
+        """
+        Pull accepted quotes from MongoDB into the index
+
+        Args:
+            full: Rebuild from scratch instead of adding new quotes since the watermark
+
+        Returns:
+            int: Number of quotes added
+        """
+        if database_service.quotes_collection is None:
+            return 0
+
+        started = time.perf_counter()
+        if full:
+            index, seen, since = HashedNgramIndex(settings.similarity_dimensions), set(), None
+        else:
+            index, seen, since = self.index, self._seen_quote_ids, self._watermark
+
+        added = 0
+        watermark = since
+        async for batch in database_service.iter_accepted_quotes(since, batch_size=5000):
+            records = [
+                (str(doc["_id"]), doc.get("job_description", ""), doc.get("estimatedHours", 0), doc.get("jobComplexity", "moderate"))
+                for doc in batch
+            ]
+            added += await asyncio.to_thread(self.add_quotes, records, index, seen)
+            watermark = batch[-1]["updatedAt"]
+
+        if full:
+            self.index, self._seen_quote_ids = index, seen
+            self._last_rebuild = time.monotonic()
+            self.last_build_seconds = time.perf_counter() - started
+            print(f"🧭 Similarity index rebuilt: {index.quotes} quotes, {index.rows} unique jobs in {self.last_build_seconds:.2f}s")
+        elif added:
+            print(f"🧭 Similarity index refreshed: +{added} quotes")
+
+        self._watermark = watermark
+        self.last_refresh_at = time.time()
+        return added
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                full = time.monotonic() - self._last_rebuild >= settings.similarity_rebuild_seconds
+                await self.refresh(full=full)
+            except Exception as e:
+                print(f"⚠️ Similarity index refresh failed ({type(e).__name__}): {str(e)}")
+            await asyncio.sleep(settings.similarity_refresh_seconds)
+
+    def start(self):
+        """Start the background build/refresh task"""
+        if settings.similarity_enabled and self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        """Cancel the background refresh task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        """Get index size and query counters"""
+        return {
+            "enabled": settings.similarity_enabled,
+            "threshold": settings.similarity_threshold,
+            "quotes": self.index.quotes,
+            "uniqueJobs": self.index.rows,
+            "dimensions": self.index.dimensions,
+            "memoryBytes": self.index.memory_bytes(),
+            "lastBuildSeconds": round(self.last_build_seconds, 3) if self.last_build_seconds is not None else None,
+            "lastRefreshAt": self.last_refresh_at,
+            "queries": self.queries,
+            "answered": self.answered,
+            "averageQueryMs": round(self.query_seconds / self.queries * 1000, 3) if self.queries else 0.0
+        }
+
+# Create singleton instance
+similarity_service = SimilarityService()
@@ -0,0 +1,123 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+class LRUTTLCache:
+    """
+    Bounded in-memory cache with per-entry TTL and LRU eviction.
+
+    Entries are evicted least-recently-used first whenever either the entry
+    count or the approximate payload size exceeds its limit. Expired entries
+    are dropped lazily on access.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (value, expires_at, size_bytes), ordered oldest -> most recently used
+        self._entries: "OrderedDict[str, tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached value for key, or None on miss/expiry
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Optional[Any]: Cached value or None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Store a value, evicting least-recently-used entries if over budget
+
+        Args:
+            key: Cache key
+            value: JSON-serialisable value to cache
+            ttl_seconds: Optional per-entry TTL (defaults to the cache TTL)
+        """
+        size = self._estimate_size(key, value)
+        if size > self.max_bytes:
+            return  # Never cache a single entry larger than the whole budget
+
+        if key in self._entries:
+            self._remove(key)
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (value, time.monotonic() + ttl, size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        """Remove a key, returning True if it was present"""
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        return True
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """
+        Get cache usage counters
+
+        Returns:
+            dict: Size, limits and hit/miss/eviction counters
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "maxEntries": self.max_entries,
+            "maxBytes": self.max_bytes,
+            "ttlSeconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    @staticmethod
+    def _estimate_size(key: str, value: Any) -> int:
+        """Approximate memory cost of an entry from its serialised size"""
+        return len(key) + len(json.dumps(value, default=str))
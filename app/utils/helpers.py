@@ -1,5 +1,8 @@
+import base64
+import json
+import re
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 def format_currency(amount: float, currency: str = "GBP") -> str:
     """
@@ -52,6 +55,155 @@ def sanitize_job_description(description: str) -> str:
     
     return description
 
+# --- Job description canonicalisation (used for estimate cache keys) ---
+
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+    "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18,
+    "nineteen": 19, "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "single": 1, "pair": 2, "dozen": 12
+}
+_TENS_WORDS = {"twenty", "thirty", "forty", "fifty"}
+# "a socket" means one socket, but "a few" / "a dozen" carry their own quantity
+_ARTICLES = {"a", "an"}
+_VAGUE_QUANTITY_WORDS = {"few", "couple", "lot", "lots", "number", "bit"}
+# Suffix kept on plural tokens no number qualifies ("sockets" -> "socket+")
+_PLURAL_MARK = "+"
+
+# Phrase synonyms, matched on singular tokens after number folding
+_SYNONYMS = {
+    ("down", "light"): ("downlight",),
+    ("spot", "light"): ("downlight",),
+    ("recessed", "light"): ("downlight",),
+    ("can", "light"): ("downlight",),
+    ("spotlight",): ("downlight",),
+    ("downlighter",): ("downlight",),
+    ("plug", "socket"): ("socket",),
+    ("power", "point"): ("socket",),
+    ("power", "socket"): ("socket",),
+    ("plug",): ("socket",),
+    ("outlet",): ("socket",),
+    ("fuse", "box"): ("consumer", "unit"),
+    ("fuse", "board"): ("consumer", "unit"),
+    ("fuseboard",): ("consumer", "unit"),
+    ("fusebox",): ("consumer", "unit"),
+    ("re", "wire"): ("rewire",),
+    ("rewiring",): ("rewire",),
+    ("bedroom",): ("bed",),
+    ("light", "switch"): ("switch",),
+    ("electric", "vehicle", "charger"): ("ev", "charger"),
+    ("car", "charger"): ("ev", "charger"),
+}
+_MAX_SYNONYM_LEN = max(len(phrase) for phrase in _SYNONYMS)
+
+_STOP_WORDS = frozenset({
+    "a", "an", "the", "in", "on", "at", "of", "for", "to", "into", "from", "with",
+    "my", "our", "your", "their", "some", "please", "and", "also", "i", "we",
+    "need", "needs", "want", "wants", "would", "like", "is", "are", "be", "it",
+    "this", "that", "there", "get", "got", "have", "has", "new", "someone", "can",
+    "could", "you", "me", "just", "thank", "cheers", "hi", "hello"
+})
+
+# Words ending in "s" that are not plurals
+_SINGULAR_S_WORDS = frozenset({"gas", "bus", "plus", "status", "series", "always", "various", "this", "is", "was", "has", "as", "us", "ups"})
+
+_PUNCTUATION_RE = re.compile(r"[^a-z0-9.\s]|(?<!\d)\.|\.(?!\d)")
+
+def _singularize(token: str) -> str:
+    """Cheap English plural folding (lights -> light, switches -> switch)"""
+    if len(token) <= 3 or not token.endswith("s") or token[0].isdigit() or token in _SINGULAR_S_WORDS:
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith(("ches", "shes", "xes", "sses")):
+        return token[:-2]
+    if token.endswith(("ss", "us", "is")):
+        return token
+    return token[:-1]
+
+def _fold_numbers(tokens: List[str]) -> List[str]:
+    """Replace number words and counting articles with digits ("twenty five" -> "25", "a socket" -> "1 socket")"""
+    folded = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in _ARTICLES:
+            nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+            if nxt is not None and nxt not in _NUMBER_WORDS and nxt not in _VAGUE_QUANTITY_WORDS and not nxt[0].isdigit():
+                token = "1"
+            folded.append(token)
+        elif token in _NUMBER_WORDS:
+            value = _NUMBER_WORDS[token]
+            nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+            if token in _TENS_WORDS and nxt in _NUMBER_WORDS and _NUMBER_WORDS[nxt] < 10:
+                value += _NUMBER_WORDS[nxt]
+                i += 1
+            folded.append(str(value))
+        else:
+            folded.append(token)
+        i += 1
+    return folded
+
+def _apply_synonyms(tokens: List[str]) -> List[str]:
+    """Replace known phrases with their canonical form, longest match first"""
+    result = []
+    i = 0
+    while i < len(tokens):
+        for length in range(min(_MAX_SYNONYM_LEN, len(tokens) - i), 0, -1):
+            replacement = _SYNONYMS.get(tuple(tokens[i:i + length]))
+            if replacement:
+                result.extend(replacement)
+                i += length
+                break
+        else:
+            result.append(tokens[i])
+            i += 1
+    return result
+
+def normalize_job_description(description: str) -> str:
+    """
+    Canonicalise a job description for use as a cache key
+    
+    Builds on sanitize_job_description and additionally folds case,
+    punctuation, number words, plurals, trade synonyms and stop words, so
+    "Install 5 LED downlights in kitchen" and "install five led
+    down-lights, kitchen." produce the same key. Quantity is kept: "a" /
+    "an" count as 1, and plurals keep a marker unless a number qualifies
+    them ("5 led downlights"), so "replace a socket" and "replace sockets"
+    stay distinct. The result is
+    only meant for matching; the original text is still what gets analysed.
+    
+    Args:
+        description: Raw job description
+        
+    Returns:
+        str: Canonical form of the description
+    """
+    text = sanitize_job_description(description).lower().replace("-", " ")
+    text = _PUNCTUATION_RE.sub(" ", text)
+    tokens = []
+    for token in _fold_numbers(text.split()):
+        singular = _singularize(token)
+        tokens.append(singular)
+        if singular != token:
+            tokens.append(_PLURAL_MARK)
+    tokens = _apply_synonyms(tokens)
+
+    # A number just before the noun (optionally through one word) already says
+    # how many; otherwise the plural marker does
+    canonical: List[str] = []
+    kept = False
+    for token in tokens:
+        if token == _PLURAL_MARK:
+            if kept and not any(previous[0].isdigit() for previous in canonical[-3:-1]):
+                canonical[-1] += _PLURAL_MARK
+        else:
+            kept = token not in _STOP_WORDS
+            if kept:
+                canonical.append(token)
+    return " ".join(canonical)
+
 def validate_email(email: str) -> bool:
     """
     Basic email validation
@@ -91,4 +243,40 @@ def create_response_metadata(
     if extra_data:
         metadata.update(extra_data)
     
-    return metadata
\ No newline at end of file
+    return metadata
+
+# --- Worker quote page cursors ---
+
+def encode_quote_cursor(total_quote: float, electrician_id: str) -> str:
+    """
+    Opaque cursor pointing just past a quote in cheapest-first order
+    
+    Args:
+        total_quote: Total of the last quote on the page
+        electrician_id: Worker of the last quote on the page (breaks ties)
+        
+    Returns:
+        str: URL-safe cursor string
+    """
+    payload = json.dumps([total_quote, electrician_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_quote_cursor(cursor: str) -> Tuple[float, str]:
+    """
+    Decode a cursor made by encode_quote_cursor
+    
+    Args:
+        cursor: Cursor string from a previous page
+        
+    Returns:
+        tuple: (total_quote, electrician_id)
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        total_quote, electrician_id = json.loads(payload)
+        return float(total_quote), str(electrician_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
@@ -0,0 +1,150 @@
+import json
+from typing import Any, List, Sequence
+
+_WHITESPACE = " \t\r\n"
+
+class JSONArrayStreamParser:
+    """
+    Incrementally extract the items of a JSON array from a text stream.
+
+    The array can be the top-level value (``[...]``) or the value of one of
+    ``keys`` in a top-level object (``{"data": [...]}``). Each item is parsed
+    with the C JSON decoder as soon as it is complete, and consumed text is
+    discarded, so memory stays proportional to one item rather than the
+    whole document.
+    """
+
+    def __init__(self, keys: Sequence[str] = ()):
+        self.keys = set(keys)
+        self.found = False  # True once the target array has been located
+        self.items_parsed = 0
+
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"  # start -> object -> array -> done
+        self._eof = False
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        Add more text and return any array items completed by it
+
+        Args:
+            text: Next chunk of the JSON document
+
+        Returns:
+            List[Any]: Newly completed items (possibly empty)
+        """
+        self._buf += text
+        items = self._parse()
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        return items
+
+    def close(self) -> List[Any]:
+        """
+        Signal end of input and return any remaining items
+
+        Raises:
+            ValueError: If the document ends in the middle of the array
+        """
+        self._eof = True
+        items = self._parse()
+        if self._state == "array":
+            raise ValueError("JSON array was not terminated")
+        return items
+
+    def _skip(self, chars: str) -> bool:
+        """Advance past chars; return False if the buffer ran out"""
+        while self._pos < len(self._buf) and self._buf[self._pos] in chars:
+            self._pos += 1
+        return self._pos < len(self._buf)
+
+    def _decode(self):
+        """
+        Decode the value at the current position
+
+        Returns:
+            (value, True) if complete, (None, False) if more input is needed
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if self._eof:
+                raise ValueError(f"Invalid JSON at offset {self._pos}")
+            return None, False
+
+        # A bare number or literal is only complete once a delimiter follows it
+        # ("2." or "1e" may be the start of a longer number in the next chunk)
+        if not self._eof and self._buf[end - 1] not in '}]"':
+            if end == len(self._buf) or self._buf[end] not in _WHITESPACE + ",]}":
+                return None, False
+
+        self._pos = end
+        return value, True
+
+    def _parse(self) -> List[Any]:
+        items = []
+        while True:
+            if self._state == "start":
+                if not self._skip(_WHITESPACE):
+                    return items
+                ch = self._buf[self._pos]
+                if ch == "[":
+                    self._state, self.found = "array", True
+                elif ch == "{":
+                    self._state = "object"
+                else:
+                    raise ValueError(f"Expected a JSON array or object, got {ch!r}")
+                self._pos += 1
+
+            elif self._state == "object":
+                # Read `"key": value` pairs until the target key's array is reached
+                if not self._skip(_WHITESPACE + ","):
+                    return items
+                if self._buf[self._pos] == "}":
+                    self._state = "done"
+                    continue
+
+                start = self._pos
+                key, complete = self._decode()
+                if not complete:
+                    return items
+                if not self._skip(_WHITESPACE):
+                    self._pos = start
+                    return items
+                if self._buf[self._pos] != ":":
+                    raise ValueError(f"Expected ':' after key {key!r}")
+                self._pos += 1
+                if not self._skip(_WHITESPACE):
+                    self._pos = start
+                    return items
+
+                if key in self.keys and self._buf[self._pos] == "[":
+                    self._pos += 1
+                    self._state, self.found = "array", True
+                    continue
+
+                _, complete = self._decode()
+                if not complete:
+                    self._pos = start
+                    return items
+
+            elif self._state == "array":
+                if not self._skip(_WHITESPACE + ","):
+                    return items
+                if self._buf[self._pos] == "]":
+                    self._pos += 1
+                    self._state = "done"
+                    continue
+
+                item, complete = self._decode()
+                if not complete:
+                    return items
+                items.append(item)
+                self.items_parsed += 1
+
+            else:  # done - ignore anything after the array
+                self._pos = len(self._buf)
+                return items
@@ -0,0 +1,50 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+from fastapi import Request
+from app.config import settings
+
+class RequestBudgetExceeded(Exception):
+    """Raised when too little of the request's time budget is left for an upstream call"""
+
+# Absolute time.monotonic() deadline for the current HTTP request (None outside requests)
+_request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+# Endpoint the current task is serving, for attributing upstream usage
+_request_endpoint: ContextVar[str] = ContextVar("request_endpoint", default="background")
+
+async def bind_request_context(request: Request):
+    """
+    Router dependency: start the time budget for the current request
+
+    Upstream calls made while handling the request derive their timeouts
+    from what is left of this budget, and are attributed to the endpoint
+    (route function name) serving it.
+    """
+    endpoint = request.scope.get("endpoint")
+    start_request_context(endpoint.__name__ if endpoint is not None else request.url.path)
+
+def start_request_context(endpoint: str):
+    """
+    Start a request time budget outside FastAPI (e.g. in benchmarks)
+
+    Args:
+        endpoint: Label that upstream usage is attributed to
+    """
+    _request_deadline.set(time.monotonic() + settings.request_budget_seconds)
+    _request_endpoint.set(endpoint)
+
+def current_endpoint() -> str:
+    """Endpoint the current task is serving ("background" outside requests)"""
+    return _request_endpoint.get()
+
+def remaining_request_budget() -> Optional[float]:
+    """
+    Seconds left before the current request's deadline
+
+    Returns:
+        Optional[float]: Remaining seconds, or None when not handling a request
+    """
+    deadline = _request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
@@ -0,0 +1,83 @@
+"""
+Bulk electrician lookup benchmark: one bounded-concurrency call vs one call per id.
+
+Looks up a batch of electricianIds against a local StubPricingServer the
+way a dispatch tool did before (/api/v1/electrician/{id} once per id, each
+call upstream as it is whenever the snapshot is stale) and through
+PricingService.get_raw_workers_by_ids, with every id missing from the
+snapshot (all fetched, at most PRICING_API_LOOKUP_CONCURRENCY at a time)
+and with a warm snapshot holding most of them.
+
+Usage:
+    python -m benchmarks.bench_bulk_lookup
+    python -m benchmarks.bench_bulk_lookup --ids 200 --latency-ms 40 --concurrency 20
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+from benchmarks.stub_pricing import StubPricingServer, generate_roster
+from app.config import settings
+from app.services.pricing_service import PricingService
+
+
+async def run(stub: StubPricingServer, ids: list, roster_size: int) -> dict:
+    settings.pricing_api_url = f"{stub.base_url}/all"
+    settings.roster_snapshot_path = ""
+    results = {}
+
+    service = PricingService()
+    requests = stub.requests
+    started = time.perf_counter()
+    for electrician_id in ids:
+        await service.get_raw_worker_by_id(electrician_id)  # no fresh snapshot: one upstream call per id
+    results["one call per id"] = (time.perf_counter() - started, stub.requests - requests)
+
+    async def no_snapshot():
+        return None
+
+    cold = PricingService()
+    cold.get_snapshot = no_snapshot  # roster not loaded: every id is a miss
+    started = time.perf_counter()
+    requests = stub.requests
+    found, _, _ = await cold.get_raw_workers_by_ids(ids)
+    results["bulk, all misses"] = (time.perf_counter() - started, stub.requests - requests)
+    assert len(found) == len(ids)
+    await cold.close_client()
+
+    await service.refresh()
+    for i in range(roster_size, roster_size + len(ids) // 10):
+        stub.by_id[f"{i:024x}"] = {"electricianId": f"{i:024x}", "name": f"New electrician {i}", "isActive": True}
+    warm_ids = ids[: len(ids) - len(ids) // 10] + [f"{i:024x}" for i in range(roster_size, roster_size + len(ids) // 10)]
+    started = time.perf_counter()
+    requests = stub.requests
+    found, _, _ = await service.get_raw_workers_by_ids(warm_ids)
+    results["bulk, 90% in snapshot"] = (time.perf_counter() - started, stub.requests - requests)
+    assert len(found) == len(warm_ids)
+
+    await service.close_client()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ids", type=int, default=200, help="Electrician ids per lookup")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Server delay per request")
+    parser.add_argument("--concurrency", type=int, default=settings.pricing_api_lookup_concurrency, help="Parallel fetches")
+    args = parser.parse_args()
+
+    settings.pricing_api_lookup_concurrency = args.concurrency
+    roster = generate_roster(2000)
+    ids = [worker["electricianId"] for worker in roster[:args.ids]]
+    with StubPricingServer(roster, latency_ms=args.latency_ms) as stub:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results = asyncio.run(run(stub, ids, len(roster)))
+
+    print(f"Ids per lookup: {args.ids}, server latency {args.latency_ms:.0f} ms, concurrency {args.concurrency}")
+    for name, (elapsed, requests) in results.items():
+        print(f"  {name:<22} {elapsed * 1000:8.1f} ms  {requests:4d} upstream requests")
+
+
+if __name__ == "__main__":
+    main()
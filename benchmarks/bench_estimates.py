@@ -0,0 +1,161 @@
+"""
+Offline end-to-end estimate benchmark.
+
+Drives AIService.analyze_job_description over a corpus with OpenAI replaced
+by the local FakeOpenAITransport, and reports throughput, latency
+percentiles, where answers came from (rule fast path, cache, LLM, local
+fallback), cache hit rate, token cost and estimate drift against a saved
+baseline run.
+
+Usage:
+    python -m benchmarks.bench_estimates
+    python -m benchmarks.bench_estimates --error-rate 0.2 --latency-ms 1500
+    python -m benchmarks.bench_estimates --save-baseline baseline.json
+    python -m benchmarks.bench_estimates --baseline baseline.json   # after a change
+    python -m benchmarks.bench_estimates --recordings recorded.jsonl
+    OPENAI_API_KEY=sk-... python -m benchmarks.bench_estimates --record-live recorded.jsonl --size 200
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import time
+from collections import Counter
+from benchmarks.corpus import generate_corpus, load_corpus
+from benchmarks.fake_openai import FakeOpenAITransport, RecordingTransport, fake_client, load_recordings, recorded_descriptions
+from app.config import settings
+from app.services.ai_service import AIService
+from app.services.cache_service import EstimateCacheService
+from app.utils.request_context import start_request_context
+
+
+def answer_source(result: dict) -> str:
+    """Classify an answer by its reasoning (cache hits and coalesced calls count as "openai")"""
+    reasoning = result.get("reasoning", "")
+    if reasoning.startswith("Matched UK electrician benchmark"):
+        return "rule"
+    if reasoning.startswith("Based on") and "similar jobs" in reasoning:
+        return "similar"
+    if "temporarily unavailable" in reasoning:
+        return "fallback"
+    return "openai"
+
+
+def percentile(sorted_values, p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+async def run(service: AIService, corpus, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    results = [None] * len(corpus)
+
+    async def one(i: int, description: str):
+        async with semaphore:
+            start_request_context("bench_estimates")
+            started = time.perf_counter()
+            result = await service.analyze_job_description(description, False)
+            latency = time.perf_counter() - started
+            source = answer_source(result)
+            results[i] = (description, result, latency, source)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i, d) for i, d in enumerate(corpus)))
+    return results, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="File with one job description per line (default: synthetic corpus)")
+    parser.add_argument("--size", type=int, default=2000, help="Synthetic corpus size")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent requests")
+    parser.add_argument("--recordings", help="Recorded completions (JSON lines) to replay")
+    parser.add_argument("--record-live", metavar="PATH", help="Call the live API and append completions to PATH")
+    parser.add_argument("--latency-ms", type=float, default=800, help="Median fake model latency")
+    parser.add_argument("--jitter", type=float, default=0.3, help="Log-normal latency sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake calls that fail")
+    parser.add_argument("--no-fast-path", action="store_true", help="Disable the rule fast path")
+    parser.add_argument("--batching", action="store_true", help="Enable estimate micro-batching")
+    parser.add_argument("--baseline", help="Baseline estimates JSON to measure drift against")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write this run's estimates as a baseline")
+    parser.add_argument("--verbose", action="store_true", help="Show the service's per-request log lines")
+    parser.add_argument("--input-price", type=float, default=0.15, help="USD per 1M prompt tokens")
+    parser.add_argument("--output-price", type=float, default=0.60, help="USD per 1M completion tokens")
+    args = parser.parse_args()
+
+    # Isolate the run: in-process cache only, no similar-quotes index
+    settings.estimate_cache_backend = "none"
+    settings.similarity_enabled = False
+    settings.rule_fast_path_enabled = not args.no_fast_path
+    settings.estimate_batching_enabled = args.batching
+
+    recordings = load_recordings(args.recordings) if args.recordings else {}
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    elif recordings:
+        corpus = recorded_descriptions(recordings)
+    else:
+        corpus = generate_corpus(args.size)
+
+    if args.record_live:
+        transport = RecordingTransport(args.record_live)
+        client = fake_client(transport, max_retries=settings.openai_max_retries, api_key=os.environ["OPENAI_API_KEY"])
+    else:
+        transport = FakeOpenAITransport(recordings, args.latency_ms, args.jitter, args.error_rate)
+        client = fake_client(transport, max_retries=settings.openai_max_retries)
+
+    service = AIService(client=client, cache=EstimateCacheService())
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(None if args.verbose else devnull):
+        results, elapsed = asyncio.run(run(service, corpus, args.concurrency))
+
+    latencies = sorted(latency for _, _, latency, _ in results)
+    sources = Counter(source for _, _, _, source in results)
+    print(f"Requests:          {len(results)} at concurrency {args.concurrency}")
+    print(f"Throughput:        {len(results) / elapsed:.1f} req/s")
+    print(f"Latency p50/95/99: {percentile(latencies, 0.5) * 1000:.1f} / {percentile(latencies, 0.95) * 1000:.1f} / {percentile(latencies, 0.99) * 1000:.1f} ms")
+    print("Answered by:       " + ", ".join(f"{name} {count / len(results):.1%}" for name, count in sources.most_common()))
+    print(f"Cache hit rate:    {service.get_cache_stats()['l1']['hitRate']:.1%}")
+    print(f"Coalesced:         {service.get_single_flight_stats()['coalescedRequests']} requests")
+    tiers = service.get_routing_stats()["tiers"]
+    print("Model tiers:       " + ", ".join(f"{tier} {entry['share']:.1%}" for tier, entry in tiers.items()))
+    breaker = service.get_circuit_breaker_stats()
+    print(f"Circuit breaker:   {breaker['state']}, transitions {breaker['transitions'] or 'none'}")
+
+    if isinstance(transport, FakeOpenAITransport):
+        stats = transport.stats()
+        cost = stats["promptTokens"] / 1e6 * args.input_price + stats["completionTokens"] / 1e6 * args.output_price
+        print(f"OpenAI calls:      {stats['calls']} ({stats['errors']} failed, {stats['replayed']} replayed, {stats['synthesised']} synthesised)")
+        print(f"Tokens / cost:     {stats['promptTokens']} in, {stats['completionTokens']} out, ${cost:.4f} (${cost / len(results) * 1000:.3f} per 1k requests)")
+
+    usage = service.get_llm_usage_stats()["total"]
+    if usage["calls"]:
+        print(f"Prompt share:      {usage['promptTokenShare']:.1%} of tokens, {usage['avgPromptTokens']:.0f} prompt / {usage['avgCompletionTokens']:.0f} completion per call")
+        print(f"Prompt cache:      {usage['promptCacheHitRate']:.1%} of calls hit, {usage['cachedPromptTokenShare']:.1%} of prompt tokens cached")
+        print(f"Model / queue:     {usage['avgModelMs']:.0f} / {usage['avgQueueMs']:.0f} ms avg, {usage['p95ModelMs']:.0f} / {usage['p95QueueMs']:.0f} ms p95")
+
+    # How far the local fallback is from the answers actually served
+    fallback_gap = [
+        abs(result["estimatedHours"] - service._get_fallback_estimate(description, False)["estimatedHours"])
+        for description, result, _, source in results if source == "openai"
+    ]
+    if fallback_gap:
+        print(f"Fallback gap:      {statistics.mean(fallback_gap):.2f}h mean abs vs LLM answers")
+
+    estimates = {description: result["estimatedHours"] for description, result, _, _ in results}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        shared = [d for d in estimates if d in baseline]
+        drift = [abs(estimates[d] - baseline[d]) for d in shared]
+        if drift:
+            changed = sum(1 for x in drift if x > 0.01)
+            print(f"Drift vs baseline: {statistics.mean(drift):.3f}h mean abs, {max(drift):.2f}h max, {changed}/{len(shared)} estimates changed")
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(estimates, f, indent=1, sort_keys=True)
+        print(f"Baseline written:  {args.save_baseline}")
+
+
+if __name__ == "__main__":
+    main()
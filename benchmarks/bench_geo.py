@@ -0,0 +1,111 @@
+"""
+Proximity search benchmark: grid index over worker locations vs a full scan.
+
+Gives a synthetic roster UK town / postcode locations (resolved against the
+bundled centroid table, as RosterSnapshot does at each refresh), then for
+random customer postcodes and radii compares GeoGridIndex.within with a
+haversine scan of every worker, checking both return the same workers.
+Also times the worker-quotes pricing and top-50 selection when only the
+workers in range are priced (RosterColumns.subset) against pricing the
+whole roster nationwide.
+
+Usage:
+    python -m benchmarks.bench_geo
+    python -m benchmarks.bench_geo --sizes 10000 100000 --queries 500
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+import numpy as np
+from benchmarks.stub_pricing import generate_roster
+from app.services.geo_service import geo_service, haversine_miles
+from app.services.pricing_service import PricingService, RosterColumns
+from app.services.quote_service import quote_service
+
+
+def worker_locations(size: int, codes: list, towns: list, seed: int = 11) -> list:
+    """Mix of "Town, UK", full addresses with postcodes, and text that won't resolve"""
+    rng = random.Random(seed)
+    locations = []
+    for _ in range(size):
+        kind = rng.random()
+        if kind < 0.6:
+            locations.append(f"{rng.choice(towns).title()}, UK")
+        elif kind < 0.95:
+            locations.append(f"{rng.randint(1, 200)} High Street, {rng.choice(codes)}{rng.randint(1, 20)} {rng.randint(1, 9)}AB")
+        else:
+            locations.append("Nationwide")
+    return locations
+
+
+def percentile(sorted_values, p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="Roster sizes")
+    parser.add_argument("--queries", type=int, default=300, help="Radius queries per roster")
+    parser.add_argument("--radii", type=float, nargs="+", default=[10, 25, 50], help="Search radii in miles")
+    args = parser.parse_args()
+
+    devnull = open(os.devnull, "w")
+    with contextlib.redirect_stdout(devnull):
+        codes = list(geo_service._load())
+    towns = list(geo_service._towns)
+    rng = random.Random(5)
+
+    for size in args.sizes:
+        locations = worker_locations(size, codes, towns)
+        started = time.perf_counter()
+        index = geo_service.build_index(locations)
+        build = time.perf_counter() - started
+        print(f"Workers: {size} ({len(index)} located), index built in {build * 1000:.1f} ms")
+
+        records = generate_roster(size)
+        for record, location in zip(records, locations):
+            record["location"] = location
+        workers = [PricingService._worker_from_item(record) for record in records]
+        columns = RosterColumns(workers)
+
+        for radius in args.radii:
+            grid, scan, priced, everyone, found = [], [], [], [], []
+            for _ in range(args.queries):
+                centre = geo_service.resolve_postcode(f"{rng.choice(codes)}1 1AA")
+
+                started = time.perf_counter()
+                rows, _ = index.within(*centre, radius)
+                grid.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                distances = haversine_miles(*centre, index.latitudes, index.longitudes)
+                expected = np.flatnonzero(distances <= radius)
+                scan.append(time.perf_counter() - started)
+                assert np.array_equal(rows, expected), "grid index and full scan disagree"
+                found.append(len(rows))
+
+                # Minimum-charge summary lines stay out of the report
+                with contextlib.redirect_stdout(devnull):
+                    started = time.perf_counter()
+                    nearby = columns.subset(rows)
+                    quote_service.select_cheapest(quote_service.calculate_quotes_bulk(nearby, 2.5, False), nearby, 50)
+                    priced.append(time.perf_counter() - started)
+
+                    started = time.perf_counter()
+                    quote_service.select_cheapest(quote_service.calculate_quotes_bulk(columns, 2.5, False), columns, 50)
+                    everyone.append(time.perf_counter() - started)
+
+            grid.sort()
+            scan.sort()
+            print(
+                f"  {radius:>5.0f} mi  ~{sum(found) / len(found):7.0f} workers  "
+                f"query p50 {percentile(grid, 0.5) * 1000:6.3f} ms / p95 {percentile(grid, 0.95) * 1000:6.3f} ms  "
+                f"(full scan p50 {percentile(scan, 0.5) * 1000:6.3f} ms)  "
+                f"top 50 in range {percentile(sorted(priced), 0.5) * 1000:6.2f} ms (nationwide {percentile(sorted(everyone), 0.5) * 1000:6.2f} ms)"
+            )
+
+
+if __name__ == "__main__":
+    main()
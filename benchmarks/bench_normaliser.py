@@ -0,0 +1,75 @@
+"""
+Estimate cache hit-rate benchmark for the job description normaliser.
+
+Replays a corpus through the old cache key (strip + lower) and the
+canonical key from normalize_job_description, assuming an unbounded cache,
+and reports the hit rate of each plus normaliser throughput. Also checks
+that descriptions asking for different quantities keep different keys.
+
+Usage:
+    python -m benchmarks.bench_normaliser
+    python -m benchmarks.bench_normaliser --corpus descriptions.txt
+"""
+import argparse
+import time
+from benchmarks.corpus import generate_corpus, load_corpus
+from app.utils.helpers import normalize_job_description
+
+# Descriptions the estimate prompt prices differently (one item vs several);
+# their keys must never collide
+DISTINCT_PAIRS = [
+    ("replace a socket", "replace sockets"),
+    ("replace a socket", "replace the sockets"),
+    ("Replace socket", "replace sockets"),
+    ("Replace socket", "replace the sockets"),
+    ("install a downlight", "install downlights"),
+    ("fit one light switch", "fit light switches"),
+    ("replace a single fuse box", "replace fuse boxes"),
+    ("replace socket in 3 bed house", "replace sockets in 3 bed house"),
+    ("fit light in flat 12", "fit lights in flat 12"),
+]
+
+
+def replay_hit_rate(corpus, key_fn) -> float:
+    seen = set()
+    hits = 0
+    for description in corpus:
+        key = key_fn(description)
+        if key in seen:
+            hits += 1
+        else:
+            seen.add(key)
+    return hits / len(corpus)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="File with one job description per line (default: synthetic corpus)")
+    parser.add_argument("--size", type=int, default=20000, help="Synthetic corpus size")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else generate_corpus(args.size)
+
+    baseline = replay_hit_rate(corpus, lambda d: d.strip().lower())
+    normalised = replay_hit_rate(corpus, normalize_job_description)
+
+    start = time.perf_counter()
+    for description in corpus:
+        normalize_job_description(description)
+    elapsed = time.perf_counter() - start
+
+    print(f"Descriptions replayed:   {len(corpus)}")
+    print(f"Hit rate (strip+lower):  {baseline:.1%}")
+    print(f"Hit rate (normalised):   {normalised:.1%}")
+    print(f"Hit rate gain:           {normalised - baseline:+.1%}")
+    print(f"Normaliser cost:         {elapsed / len(corpus) * 1e6:.1f} µs/description")
+
+    collisions = [(a, b) for a, b in DISTINCT_PAIRS if normalize_job_description(a) == normalize_job_description(b)]
+    print(f"Quantity collisions:     {len(collisions)} of {len(DISTINCT_PAIRS)} pairs")
+    for a, b in collisions:
+        print(f"  {a!r} == {b!r} -> {normalize_job_description(a)!r}")
+    assert not collisions, "descriptions with different quantities share a cache key"
+
+
+if __name__ == "__main__":
+    main()
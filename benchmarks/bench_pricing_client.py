@@ -0,0 +1,93 @@
+"""
+Pricing API client benchmark: pooled keep-alive client vs a client per call.
+
+Fetches single workers from a local StubPricingServer the way
+/api/v1/electrician/{id} does, once with a fresh httpx.AsyncClient per
+call (the previous behaviour) and once through PricingService's shared
+pool, sequentially and concurrently, and reports per-request latency and
+connections opened. Use --handshake-ms to charge each new connection what
+a TCP+TLS handshake to the real API costs (loopback is nearly free).
+
+Usage:
+    python -m benchmarks.bench_pricing_client
+    python -m benchmarks.bench_pricing_client --handshake-ms 40 --requests 200
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+import httpx
+from benchmarks.stub_pricing import StubPricingServer, generate_roster
+from app.config import settings
+from app.services.pricing_service import PricingService
+
+
+def percentile(sorted_values, p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+async def per_call_client(url: str):
+    async with httpx.AsyncClient(timeout=settings.pricing_api_timeout) as client:
+        response = await client.get(url)
+        response.raise_for_status()
+        return response.json()
+
+
+async def measure(fetch, ids, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(worker_id):
+        async with semaphore:
+            started = time.perf_counter()
+            await fetch(worker_id)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(worker_id) for worker_id in ids))
+    return sorted(latencies), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="Single-worker fetches per run")
+    parser.add_argument("--handshake-ms", type=float, default=0.0, help="Delay charged per new connection")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Server delay per request")
+    args = parser.parse_args()
+
+    roster = generate_roster(1000)
+    ids = [roster[i % len(roster)]["electricianId"] for i in range(args.requests)]
+
+    with StubPricingServer(roster, args.handshake_ms, args.latency_ms) as stub:
+        settings.pricing_api_url = f"{stub.base_url}/all"
+        service = PricingService()
+
+        async def run():
+            service.open_client()
+            runs = {}
+            for concurrency in (1, 16):
+                for name, fetch in (
+                    ("client per call", lambda worker_id: per_call_client(f"{stub.base_url}/{worker_id}")),
+                    ("pooled client", service.get_raw_worker_by_id)
+                ):
+                    connections = stub.connections
+                    latencies, elapsed = await measure(fetch, ids, concurrency)
+                    runs[(name, concurrency)] = (latencies, elapsed, stub.connections - connections)
+            await service.close_client()
+            return runs
+
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            runs = asyncio.run(run())
+
+    print(f"Requests per run: {args.requests}, handshake {args.handshake_ms:.0f} ms, server latency {args.latency_ms:.0f} ms")
+    for (name, concurrency), (latencies, elapsed, connections) in runs.items():
+        print(
+            f"{name:<16} x{concurrency:<3} p50 {percentile(latencies, 0.5) * 1000:6.2f} ms  "
+            f"p95 {percentile(latencies, 0.95) * 1000:6.2f} ms  "
+            f"{len(latencies) / elapsed:7.1f} req/s  {connections} connections"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Worker quote benchmark: vectorised bulk pricing vs the per-worker loop.
+
+Prices a synthetic roster the previous way (calculate_quote_for_worker for
+each worker, then a sort of the WorkerQuote list) and through
+QuoteService.calculate_quotes_bulk over the snapshot's pricing columns,
+reports the best time of each for the pricing step alone and for the whole
+/api/v1/worker-quotes step (pricing, selection, WorkerQuote models) when
+every quote is returned and when only the cheapest page is, and checks
+that every rounded field matches exactly across a range of estimated hours,
+standard and emergency.
+
+Usage:
+    python -m benchmarks.bench_quotes
+    python -m benchmarks.bench_quotes --sizes 10000 100000 --repeat 5
+"""
+import argparse
+import contextlib
+import os
+import time
+from benchmarks.stub_pricing import generate_roster
+from app.models import WorkerQuote
+from app.services.pricing_service import PricingService, RosterColumns
+from app.services.quote_service import quote_service
+
+HOURS = [0.5, 1.0, 1.5, 2.3, 2.5, 3.7, 4.0, 6.5, 12.0, 27.3]
+FIELDS = ("estimatedHours", "hourlyRate", "callOutFee", "labourCost", "emergencyUplift", "minimumCharge", "totalQuote")
+ANALYSIS = {"jobComplexity": "moderate", "matchScore": 85.0, "recommendedActions": ["Isolate the circuit"]}
+
+
+def scalar_quotes(workers, hours: float, is_emergency: bool) -> list:
+    return [quote_service.calculate_quote_for_worker(worker, hours, is_emergency) for worker in workers]
+
+
+def scalar_route(workers, hours: float, is_emergency: bool) -> list:
+    quotes = [WorkerQuote(**quote, **ANALYSIS) for quote in scalar_quotes(workers, hours, is_emergency)]
+    quotes.sort(key=lambda x: x.totalQuote)
+    return quotes
+
+
+def bulk_route(workers, columns, hours: float, is_emergency: bool, limit: int) -> list:
+    quotes = quote_service.calculate_quotes_bulk(columns, hours, is_emergency)
+    page, _, _ = quote_service.select_cheapest(quotes, columns, limit)
+    return [
+        WorkerQuote(
+            electricianId=workers[i].electricianId,
+            workerName=workers[i].name,
+            workerEmail=workers[i].email,
+            workerLocation=workers[i].location,
+            workerDescription=workers[i].description,
+            **row,
+            **ANALYSIS
+        )
+        for i, row in zip(page, quotes.rows(page))
+    ]
+
+
+def mismatches(workers, columns) -> int:
+    """Rounded fields where the bulk quote differs from the per-worker quote"""
+    bad = 0
+    for hours in HOURS:
+        for is_emergency in (False, True):
+            bulk = quote_service.calculate_quotes_bulk(columns, hours, is_emergency)
+            expected = scalar_quotes(workers, hours, is_emergency)
+            for quote, row in zip(expected, bulk.rows(range(len(bulk)))):
+                bad += sum(quote[field] != row[field] for field in FIELDS)
+    return bad
+
+
+def best_time(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="Roster sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per variant (best reported)")
+    parser.add_argument("--limit", type=int, default=50, help="Page size for the paged route step")
+    args = parser.parse_args()
+
+    results = []
+    # The per-worker path prints a line per minimum-charge worker; keep it out of the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for size in args.sizes:
+            workers = [PricingService._worker_from_item(item) for item in generate_roster(size) if item["isActive"]]
+            started = time.perf_counter()
+            columns = RosterColumns(workers)
+            build = time.perf_counter() - started
+            old_route = best_time(lambda: scalar_route(workers, 2.5, True), args.repeat)
+            results.append((len(workers), build, mismatches(workers, columns), {
+                "pricing": (
+                    best_time(lambda: scalar_quotes(workers, 2.5, True), args.repeat),
+                    best_time(lambda: quote_service.calculate_quotes_bulk(columns, 2.5, True), args.repeat)
+                ),
+                # The previous route always returned every quote
+                "all quotes": (old_route, best_time(lambda: bulk_route(workers, columns, 2.5, True, len(workers)), args.repeat)),
+                f"top {args.limit}": (old_route, best_time(lambda: bulk_route(workers, columns, 2.5, True, args.limit), args.repeat))
+            }))
+
+    for count, build, bad, timings in results:
+        print(f"Workers: {count} active (columns built in {build * 1000:.1f} ms, once per roster refresh)")
+        for name, (scalar, bulk) in timings.items():
+            print(f"  {name:<11} per-worker {scalar * 1000:8.1f} ms  bulk {bulk * 1000:8.1f} ms  ({scalar / bulk:.1f}x)")
+        print(f"  exactness   {bad} mismatched fields over {len(HOURS) * 2} hours/emergency combinations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Roster fetch + parse benchmark: streaming parser vs whole-body parse.
+
+Serves a synthetic roster from a local StubPricingServer and loads it in a
+fresh subprocess per run, either the previous way (response.text, then
+response.json(), then a WorkerDetails and three log lines per worker) or
+through PricingService._fetch_roster (incremental parse, batch validation,
+per-worker logging only at DEBUG), with log output piped to the parent
+as a container's stdout would be. Reports wall time, CPU time and peak RSS
+growth over the process baseline, plus (from a separate tracemalloc run)
+the peak Python heap during the load against what the loaded roster
+itself retains - the difference is the parse's transient overhead.
+
+Usage:
+    python -m benchmarks.bench_roster_parse
+    python -m benchmarks.bench_roster_parse --sizes 10000 100000 --repeat 3
+"""
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+import httpx
+from benchmarks.stub_pricing import StubPricingServer, generate_roster
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss survives exec on Linux (it would include this parent's roster), VmHWM does not
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def load_whole_body(url: str) -> list:
+    """The roster loader before streaming: whole body as text and JSON, a log line per step"""
+    from app.models import WorkerDetails
+    async with httpx.AsyncClient(timeout=60) as client:
+        response = await client.get(url)
+        response.raise_for_status()
+        raw_data = response.text
+        print(f"📦 Raw response preview: {raw_data[:200]}...")
+        data = response.json()
+        if isinstance(data, dict):
+            data = data.get("data", data.get("workers"))
+        workers = []
+        for idx, item in enumerate(data):
+            print(f"\n   📌 Item {idx + 1} type: {type(item)}")
+            print(f"   Worker: {item.get('name', 'Unknown')} - Active: {item.get('isActive', False)}")
+            if not item.get("isActive", False):
+                continue
+            print(f"   ✓ Adding worker: {item.get('name')} (ID: {item.get('electricianId')})")
+            workers.append(WorkerDetails(
+                electricianId=str(item.get("electricianId", "")),
+                name=item.get("name", "Unknown Worker"),
+                email=item.get("email", ""),
+                location=item.get("location", ""),
+                description=item.get("description", ""),
+                hourlyRate=float(item.get("hourlyRate", 100.0)),
+                callOutFee=float(item.get("callOutFee", 65.0)),
+                minimum_charge=float(item.get("minimumCharge") or item.get("callOutFee", 65.0)),
+                emergencyUplift=float(item.get("emergencyUplift", 150.0))
+            ))
+        return workers
+
+
+async def load_streaming(url: str) -> tuple:
+    from app.config import settings
+    from app.services.pricing_service import PricingService
+    settings.pricing_api_url = url
+    service = PricingService()
+    roster = await service._fetch_roster()
+    await service.close_client()
+    return roster
+
+
+def child(variant: str, url: str, trace: bool):
+    """Run one load in this (fresh) process and print its measurements as JSON"""
+    import app.services.pricing_service  # noqa: F401  (import cost is not part of the measurement)
+    loader = load_streaming if variant == "streaming" else load_whole_body
+    if trace:
+        tracemalloc.start()
+        roster = asyncio.run(loader(url))
+        retained, peak = tracemalloc.get_traced_memory()
+        print(json.dumps({"heapPeakMb": peak / 1e6, "heapRetainedMb": retained / 1e6}))
+        return
+
+    baseline = peak_rss_mb()
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    # Log lines go to the parent through a pipe, as a container's stdout does
+    roster = asyncio.run(loader(url))
+    print(json.dumps({
+        "workers": len(roster[1] if variant == "streaming" else roster),
+        "seconds": time.perf_counter() - started,
+        "cpuSeconds": time.process_time() - cpu_started,
+        "rssGrowthMb": peak_rss_mb() - baseline
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="Roster sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant (best time, max RSS reported)")
+    parser.add_argument("--child", nargs=2, metavar=("VARIANT", "URL"), help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child, args.trace)
+        return
+
+    def run_child(variant: str, url: str, trace: bool = False) -> dict:
+        command = [sys.executable, "-m", "benchmarks.bench_roster_parse", "--child", variant, url]
+        output = subprocess.run(command + (["--trace"] if trace else []), capture_output=True, text=True, check=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    for size in args.sizes:
+        roster = generate_roster(size)
+        with StubPricingServer(roster) as stub:
+            url = f"{stub.base_url}/all"
+            print(f"Roster: {size} workers, {len(stub.body) / 1e6:.1f} MB")
+            for variant in ("whole-body", "streaming"):
+                runs = [run_child(variant, url) for _ in range(args.repeat)]
+                best = min(runs, key=lambda run: run["seconds"])
+                heap = run_child(variant, url, trace=True)
+                print(
+                    f"  {variant:<11} {best['seconds'] * 1000:8.1f} ms wall  {best['cpuSeconds'] * 1000:8.1f} ms CPU  "
+                    f"peak RSS +{max(run['rssGrowthMb'] for run in runs):6.1f} MB  "
+                    f"heap peak {heap['heapPeakMb']:6.1f} MB / retained {heap['heapRetainedMb']:6.1f} MB  ({best['workers']} active)"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Roster startup benchmark: on-disk snapshot vs first fetch from the pricing API.
+
+Measures how long a fresh PricingService takes to have a servable roster,
+either by fetching it from a local StubPricingServer (what every pod did
+at boot) or by loading the persisted snapshot (PricingService.load_snapshot),
+and what persisting a new roster version costs: write time, file size and
+the longest event-loop stall while the write runs in its worker thread.
+
+Usage:
+    python -m benchmarks.bench_roster_startup
+    python -m benchmarks.bench_roster_startup --sizes 10000 100000 --latency-ms 300
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+from benchmarks.stub_pricing import StubPricingServer, generate_roster
+from app.config import settings
+from app.services.pricing_service import PricingService
+
+
+async def longest_stall(task: asyncio.Task, tick: float = 0.001) -> float:
+    """Longest gap between event-loop ticks while the task runs"""
+    worst = 0.0
+    last = time.perf_counter()
+    while not task.done():
+        await asyncio.sleep(tick)
+        now = time.perf_counter()
+        worst = max(worst, now - last - tick)
+        last = now
+    await task
+    return worst
+
+
+async def measure(url: str, path: str) -> dict:
+    settings.pricing_api_url = url
+    settings.roster_snapshot_path = ""  # persist explicitly below, not in the background
+
+    cold = PricingService()
+    started = time.perf_counter()
+    await cold.refresh()
+    fetch = time.perf_counter() - started
+    settings.roster_snapshot_path = path
+    stall = await longest_stall(asyncio.create_task(cold.persist_snapshot()))
+    await cold.close_client()
+
+    warm = PricingService()
+    started = time.perf_counter()
+    snapshot = await warm.load_snapshot()
+    load = time.perf_counter() - started
+    return {
+        "workers": len(snapshot.workers),
+        "fetch": fetch,
+        "load": load,
+        "write": cold.persisted["writeMs"] / 1000,
+        "bytes": cold.persisted["bytes"],
+        "stall": stall
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="Roster sizes")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Pricing API delay per request")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            roster = generate_roster(size)
+            with StubPricingServer(roster, latency_ms=args.latency_ms) as stub:
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    result = asyncio.run(measure(f"{stub.base_url}/all", os.path.join(directory, "roster.json.gz")))
+            print(
+                f"Roster: {size} workers ({result['workers']} active), {len(stub.body) / 1e6:.1f} MB JSON\n"
+                f"  first fetch from API   {result['fetch'] * 1000:8.1f} ms  (API latency {args.latency_ms:.0f} ms)\n"
+                f"  load from disk         {result['load'] * 1000:8.1f} ms\n"
+                f"  persist                {result['write'] * 1000:8.1f} ms in a thread, {result['bytes'] / 1e6:.1f} MB gzip, "
+                f"longest event-loop stall {result['stall'] * 1000:.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Similar-past-quotes index benchmark.
+
+Builds the hashed n-gram index from a synthetic history of accepted quotes
+(hours from the benchmark rules plus noise) and reports build time, memory
+footprint, query latency, and how often / how accurately held-out
+descriptions are answered without an LLM call.
+
+Usage:
+    python -m benchmarks.bench_similarity
+    python -m benchmarks.bench_similarity --quotes 250000 --unique-suffixes 5000
+"""
+import argparse
+import random
+import statistics
+import time
+from benchmarks.corpus import generate_corpus
+from app.config import settings
+from app.services.rule_estimator import rule_estimator
+from app.services.similarity_service import HashedNgramIndex, SimilarityService
+from app.utils.helpers import normalize_job_description
+
+_ROOMS = ["kitchen", "bathroom", "hallway", "bedroom", "loft", "garage", "landing", "study", "utility room", "porch"]
+
+
+def synthetic_history(size: int, unique_suffixes: int, seed: int):
+    """(quote_id, description, hours, complexity) with realistic spread of wording"""
+    rng = random.Random(seed)
+    for i, description in enumerate(generate_corpus(size, seed=seed)):
+        if unique_suffixes:
+            # Long-tail wording so most rows are distinct descriptions
+            description += f" {rng.choice(_ROOMS)} ref {rng.randrange(unique_suffixes)}"
+        # "True" hours: the benchmark rule for the canonical wording, plus noise
+        match = rule_estimator.evaluate(normalize_job_description(description))
+        hours = max(0.5, match["estimatedHours"] * rng.uniform(0.85, 1.15))
+        yield str(i), description, hours, match["jobComplexity"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quotes", type=int, default=100000, help="Accepted quotes in the history")
+    parser.add_argument("--unique-suffixes", type=int, default=20000, help="Distinct trailing references (0 for template wording only)")
+    parser.add_argument("--queries", type=int, default=2000, help="Held-out queries")
+    parser.add_argument("--dimensions", type=int, default=settings.similarity_dimensions)
+    args = parser.parse_args()
+
+    history = list(synthetic_history(args.quotes, args.unique_suffixes, seed=42))
+    queries = list(synthetic_history(args.queries, args.unique_suffixes, seed=7))
+
+    service = SimilarityService()
+    service.index = HashedNgramIndex(args.dimensions)
+
+    started = time.perf_counter()
+    service.add_quotes(history)
+    build_seconds = time.perf_counter() - started
+
+    latencies, errors, rule_errors = [], [], []
+    for _, description, hours, _ in queries:
+        started = time.perf_counter()
+        result = service.estimate(description)
+        latencies.append(time.perf_counter() - started)
+        if result is not None:
+            errors.append(abs(result["estimatedHours"] - hours))
+            rule_errors.append(abs(rule_estimator.evaluate(description)["estimatedHours"] - hours))
+
+    latencies.sort()
+    index = service.index
+    print(f"Quotes:            {index.quotes} ({index.rows} unique descriptions, {args.dimensions} dims)")
+    print(f"Build:             {build_seconds:.2f}s ({build_seconds / index.quotes * 1e6:.1f}us per quote)")
+    print(f"Memory:            {index.memory_bytes() / 1e6:.1f} MB")
+    print(f"Query p50 / p99:   {latencies[len(latencies) // 2] * 1000:.2f} ms / {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+    print(f"Answered locally:  {len(errors) / len(queries):.1%} (threshold {settings.similarity_threshold}, min quotes {settings.similarity_min_quotes})")
+    if errors:
+        print(f"Mean abs error:    {statistics.mean(errors):.2f}h (rule benchmark on same queries: {statistics.mean(rule_errors):.2f}h)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Synthetic job-description corpus for benchmarks.
+
+Each base job is rendered with the kind of variation real customers type:
+case, spacing, punctuation, number words, plurals, synonyms and filler words.
+"""
+import random
+from typing import List, Optional
+
+BASE_JOBS = [
+    "install {n} led downlights in kitchen",
+    "replace {n} sockets in living room",
+    "replace {n} light switches",
+    "install {n} outdoor security lights",
+    "replace consumer unit",
+    "rewire a {n} bed house",
+    "install ev charger on driveway",
+    "eicr inspection for {n} bed flat",
+    "fault finding, lights tripping the breaker",
+    "replace bathroom extractor fan",
+    "install new circuit for garage",
+    "replace {n} light fittings in hallway",
+]
+
+_NUMBER_WORDS = {1: "one", 2: "two", 3: "three", 4: "four", 5: "five", 6: "six", 8: "eight", 10: "ten", 12: "twelve"}
+
+_SYNONYM_VARIANTS = {
+    "downlights": ["downlights", "down-lights", "spotlights", "recessed lights", "down lights"],
+    "sockets": ["sockets", "plug sockets", "power points", "outlets", "plugs"],
+    "consumer unit": ["consumer unit", "fuse box", "fuse board", "fuseboard"],
+    "ev charger": ["ev charger", "car charger", "electric vehicle charger"],
+    "rewire": ["rewire", "re-wire", "full rewire of"],
+}
+
+_FILLERS = ["", "please ", "i need to ", "we want to ", "need someone to "]
+_ENDINGS = ["", ".", "!", " please", ", thanks", "."]
+
+
+def _vary(template: str, quantity: int, rng: random.Random) -> str:
+    text = template.replace("{n}", str(quantity))
+    if quantity in _NUMBER_WORDS and rng.random() < 0.4:
+        text = template.replace("{n}", _NUMBER_WORDS[quantity])
+    for canonical, variants in _SYNONYM_VARIANTS.items():
+        if canonical in text:
+            text = text.replace(canonical, rng.choice(variants))
+    if rng.random() < 0.3:
+        text = text.replace(" in ", " in the ")
+    text = rng.choice(_FILLERS) + text + rng.choice(_ENDINGS)
+    if rng.random() < 0.5:
+        text = text.capitalize()
+    if rng.random() < 0.3:
+        text = text.upper()
+    if rng.random() < 0.3:
+        text = text.replace(" ", "  ", rng.randint(1, 3))
+    return text
+
+
+def generate_corpus(size: int, seed: int = 42, quantities: Optional[List[int]] = None) -> List[str]:
+    """
+    Generate a replayable list of job descriptions
+
+    Args:
+        size: Number of descriptions to generate
+        seed: Random seed so runs are comparable
+        quantities: Quantities to draw from for templated jobs
+
+    Returns:
+        List[str]: Job descriptions, with repeats
+    """
+    rng = random.Random(seed)
+    quantities = quantities or [1, 2, 3, 4, 5, 6, 8, 10, 12]
+    return [_vary(rng.choice(BASE_JOBS), rng.choice(quantities), rng) for _ in range(size)]
+
+
+def load_corpus(path: str) -> List[str]:
+    """Load one job description per line from a file (blank lines skipped)"""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
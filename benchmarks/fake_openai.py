@@ -0,0 +1,207 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+FakeOpenAITransport plugs into httpx, so a real AsyncOpenAI client (and
+everything in AIService above it) runs unchanged. Estimate prompts are
+answered from recorded completions when available, otherwise from the
+benchmark rules with a deterministic per-description skew, after a
+configurable latency; a fraction of calls can be failed with 429 / 500 /
+timeout errors. Prompt caching is modelled on OpenAI's: a system prompt of
+1024+ tokens seen before is reported as cached in 128-token steps.
+
+Recordings are JSON lines of
+    {"job_description": ..., "is_emergency": false, "response": {...estimate...}}
+and can be captured from the live API with RecordingTransport.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+from typing import Dict, List, Optional, Tuple
+import httpx
+from openai import AsyncOpenAI
+from app.services.rule_estimator import rule_estimator
+
+_JOB_RE = re.compile(r"Job Description: (.*)\nEmergency Job: (Yes|No)")
+_BATCH_JOB_RE = re.compile(r"Job (\d+):\nJob Description: (.*)\nEmergency Job: (Yes|No)")
+
+RecordingKey = Tuple[str, bool]
+
+
+def load_recordings(path: str) -> Dict[RecordingKey, dict]:
+    """Load recorded estimate completions keyed by (job_description, is_emergency)"""
+    recordings = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                recordings[(record["job_description"], bool(record.get("is_emergency")))] = record["response"]
+    return recordings
+
+
+def synthetic_estimate(job_description: str) -> dict:
+    """Rule-based estimate skewed by up to +/-20%, stable per description"""
+    match = rule_estimator.evaluate(job_description)
+    skew = int(hashlib.md5(job_description.encode()).hexdigest()[:4], 16) / 0xFFFF * 0.4 - 0.2
+    return {
+        "estimatedHours": round(match["estimatedHours"] * (1 + skew), 2),
+        "jobComplexity": match["jobComplexity"],
+        "reasoning": f"{match['label']} (synthetic completion)",
+        "recommendedActions": match["recommendedActions"]
+    }
+
+
+class FakeOpenAITransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that answers chat completions locally
+
+    Args:
+        recordings: Recorded estimates by (job_description, is_emergency)
+        latency_ms: Median simulated model latency
+        jitter: Log-normal sigma applied to the latency (0 for constant)
+        error_rate: Fraction of calls that fail (0-1)
+        error_kinds: Failure types to draw from: "429", "500", "timeout"
+        seed: Random seed for latency and error injection
+    """
+
+    def __init__(
+        self,
+        recordings: Optional[Dict[RecordingKey, dict]] = None,
+        latency_ms: float = 800,
+        jitter: float = 0.3,
+        error_rate: float = 0.0,
+        error_kinds: Tuple[str, ...] = ("429", "500", "timeout"),
+        seed: int = 1
+    ):
+        self.recordings = recordings or {}
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_kinds = error_kinds
+        self._rng = random.Random(seed)
+
+        self.calls = 0
+        self.errors = 0
+        self.replayed = 0
+        self.synthesised = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self._seen_prefixes = set()
+
+    def _cached_tokens(self, messages: List[dict]) -> int:
+        system = messages[0]["content"] if messages and messages[0]["role"] == "system" else ""
+        tokens = len(system) // 4
+        if tokens < 1024:
+            return 0
+        if system not in self._seen_prefixes:
+            self._seen_prefixes.add(system)
+            return 0
+        return tokens // 128 * 128
+
+    def _answer(self, description: str, is_emergency: bool) -> dict:
+        recorded = self.recordings.get((description, is_emergency))
+        if recorded is not None:
+            self.replayed += 1
+            return recorded
+        self.synthesised += 1
+        return synthetic_estimate(description)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        body = json.loads(request.content)
+        latency = self.latency_ms / 1000 * self._rng.lognormvariate(0, self.jitter) if self.jitter else self.latency_ms / 1000
+
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            kind = self._rng.choice(self.error_kinds)
+            if kind == "timeout":
+                # Sleep past whatever timeout the client set, as a hung upstream would
+                timeout = (request.extensions.get("timeout") or {}).get("read") or latency
+                await asyncio.sleep(timeout)
+                raise httpx.ReadTimeout("Simulated upstream timeout", request=request)
+            await asyncio.sleep(latency / 4)
+            return httpx.Response(int(kind), json={"error": {"message": f"Simulated {kind}", "type": "server_error"}})
+
+        await asyncio.sleep(latency)
+
+        prompt = body["messages"][-1]["content"]
+        batch_jobs = _BATCH_JOB_RE.findall(prompt)
+        if batch_jobs:
+            content = {"estimates": [
+                {"index": int(index), **self._answer(description, emergency == "Yes")}
+                for index, description, emergency in batch_jobs
+            ]}
+        else:
+            job = _JOB_RE.search(prompt)
+            content = self._answer(job.group(1), job.group(2) == "Yes") if job else {}
+
+        text = json.dumps(content)
+        prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 4
+        completion_tokens = len(text) // 4
+        cached_tokens = self._cached_tokens(body["messages"])
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cached_tokens += cached_tokens
+
+        return httpx.Response(200, json={
+            "id": f"chatcmpl-fake-{self.calls}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens}
+            }
+        })
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "replayed": self.replayed,
+            "synthesised": self.synthesised,
+            "promptTokens": self.prompt_tokens,
+            "completionTokens": self.completion_tokens,
+            "cachedTokens": self.cached_tokens
+        }
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Pass requests to the live API and append single-job estimates to a recordings file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._inner = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._inner.handle_async_request(request)
+        await response.aread()
+
+        job = _JOB_RE.search(json.loads(request.content)["messages"][-1]["content"])
+        if job and response.status_code == 200 and not _BATCH_JOB_RE.search(job.string):
+            content = response.json()["choices"][0]["message"]["content"]
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({
+                    "job_description": job.group(1),
+                    "is_emergency": job.group(2) == "Yes",
+                    "response": json.loads(content)
+                }) + "\n")
+        return response
+
+    async def aclose(self):
+        await self._inner.aclose()
+
+
+def fake_client(transport: httpx.AsyncBaseTransport, max_retries: int = 0, api_key: str = "sk-fake") -> AsyncOpenAI:
+    """Build an AsyncOpenAI client that sends requests through the given transport"""
+    return AsyncOpenAI(api_key=api_key, max_retries=max_retries, http_client=httpx.AsyncClient(transport=transport))
+
+
+def recorded_descriptions(recordings: Dict[RecordingKey, dict]) -> List[str]:
+    """Descriptions present in a recordings file, for replaying as a corpus"""
+    return [description for description, _ in recordings]
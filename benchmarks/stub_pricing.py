@@ -0,0 +1,154 @@
+"""
+Local stand-in for the external pricing API.
+
+StubPricingServer serves a synthetic roster over real HTTP/1.1 keep-alive
+connections on 127.0.0.1:
+    GET /api/pricing/all   -> {"success": true, "data": [...workers...]}
+    GET /api/pricing/{id}  -> {"success": true, "data": {...worker...}}
+
+The roster endpoint honours If-None-Match (304 when unchanged) and
+?updatedSince=<ISO timestamp> (only workers changed by update_worker since).
+
+Loopback connections are nearly free, so `handshake_ms` can be set to
+charge each new connection what a TCP+TLS handshake to the real API costs.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+TOWNS = [
+    "London", "Manchester", "Birmingham", "Leeds", "Liverpool", "Bristol", "Sheffield", "Newcastle",
+    "Nottingham", "Leicester", "Cardiff", "Glasgow", "Edinburgh", "Southampton", "Brighton", "Reading",
+    "Oxford", "Cambridge", "York", "Norwich"
+]
+
+
+def generate_roster(size: int, seed: int = 7, inactive_rate: float = 0.05) -> List[dict]:
+    """Synthetic pricing API worker records"""
+    rng = random.Random(seed)
+    roster = []
+    for i in range(size):
+        call_out = round(rng.uniform(40, 95), 2)
+        roster.append({
+            "electricianId": f"{i:024x}",
+            "name": f"Electrician {i}",
+            "email": f"electrician{i}@example.co.uk",
+            "location": rng.choice(TOWNS),
+            "description": "NICEIC approved domestic and commercial electrician",
+            "hourlyRate": round(rng.uniform(40, 110), 2),
+            "callOutFee": call_out,
+            "minimumCharge": round(call_out + rng.choice([0, 0, 20, 45.5]), 2),
+            "emergencyUplift": round(rng.uniform(80, 200), 2),
+            "isActive": rng.random() >= inactive_rate
+        })
+    return roster
+
+
+class StubPricingServer:
+    """
+    Threaded HTTP server for a roster, usable as a context manager
+
+    Args:
+        roster: Worker records to serve
+        handshake_ms: Delay charged once per new connection
+        latency_ms: Delay charged per request
+    """
+
+    def __init__(self, roster: List[dict], handshake_ms: float = 0.0, latency_ms: float = 0.0):
+        self.roster = roster
+        self.by_id = {worker["electricianId"]: worker for worker in roster}
+        self.updated_at: Dict[str, datetime] = {}
+        self._publish()
+        self.handshake_ms = handshake_ms
+        self.latency_ms = latency_ms
+        self.connections = 0
+        self.requests = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def _publish(self):
+        self.body = json.dumps({"success": True, "data": self.roster}).encode()
+        self.etag = f'"{hashlib.md5(self.body).hexdigest()}"'
+
+    def update_worker(self, electrician_id: str, **fields):
+        """Change a worker's fields (e.g. isActive=False) as the upstream roster would"""
+        self.by_id[electrician_id].update(fields)
+        self.updated_at[electrician_id] = datetime.now(timezone.utc)
+        self._publish()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/api/pricing"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            wbufsize = -1  # one write per response (avoids Nagle / delayed-ACK stalls)
+
+            def setup(self):
+                super().setup()
+                stub.connections += 1
+                if stub.handshake_ms:
+                    time.sleep(stub.handshake_ms / 1000)
+
+            def do_GET(self):
+                stub.requests += 1
+                if stub.latency_ms:
+                    time.sleep(stub.latency_ms / 1000)
+                url = urlsplit(self.path)
+                worker_id = url.path.rstrip("/").rsplit("/", 1)[-1]
+                since = parse_qs(url.query).get("updatedSince")
+                if worker_id == "all" and since:
+                    since = datetime.fromisoformat(since[0])
+                    changed = [stub.by_id[i] for i, updated in stub.updated_at.items() if updated > since]
+                    self._send(200, json.dumps({"success": True, "data": changed}).encode())
+                elif worker_id == "all" and self.headers.get("If-None-Match") == stub.etag:
+                    self._send(304, b"", {"ETag": stub.etag})
+                elif worker_id == "all":
+                    self._send(200, stub.body, {"ETag": stub.etag})
+                elif worker_id in stub.by_id:
+                    self._send(200, json.dumps({"success": True, "data": stub.by_id[worker_id]}).encode())
+                else:
+                    self._send(404, b'{"success": false, "message": "Not found"}')
+
+            def _send(self, status: int, body: bytes, headers: Optional[dict] = None):
+                self.send_response(status)
+                if status != 304:
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubPricingServer":
+        # A deeper accept backlog than the default 5, so bursts of new connections aren't dropped (1s SYN retry)
+        server_class = type("StubHTTPServer", (ThreadingHTTPServer,), {"request_queue_size": 128})
+        self._server = server_class(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubPricingServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()